@@ -4,6 +4,7 @@
 from django.contrib import admin
 
 from example_project.app.models import Thing
+from subforms.admin import SubformsChangeMessageMixin, SubformsValidationMixin
 from subforms.fields import DynamicArrayField, NestedFormField
 
 
@@ -59,5 +60,5 @@ class Meta:
 
 
 @admin.register(Thing)
-class AdminThing(admin.ModelAdmin):
+class AdminThing(SubformsChangeMessageMixin, SubformsValidationMixin, admin.ModelAdmin):
     form = ThingForm
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import decimal
+import timeit
+from typing import TYPE_CHECKING, Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+
+from subforms.codec import get_codec
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    help = "Compare the speed of the installed JSON codecs on nested payloads."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--items", type=int, default=1000, help="Number of items in the top-level array.")
+        parser.add_argument("--number", type=int, default=20, help="Number of times to encode and decode.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        benchmark_codecs(self, items=options["items"], number=options["number"])
+
+
+def benchmark_codecs(command: BaseCommand, *, items: int, number: int) -> None:
+    payload = nested_payload(items)
+
+    for name in ("orjson", "msgspec", "json"):
+        try:
+            codec = get_codec(name)
+        except ImproperlyConfigured:
+            command.stdout.write(f"{name:<8} not installed")
+            continue
+
+        data = codec.dumps(payload)
+        dumps = min(timeit.repeat(lambda: codec.dumps(payload), number=number, repeat=3)) / number  # noqa: B023
+        loads = min(timeit.repeat(lambda: codec.loads(data), number=number, repeat=3)) / number  # noqa: B023
+
+        command.stdout.write(
+            f"{name:<8} dumps {dumps * 1000:8.2f} ms   loads {loads * 1000:8.2f} ms   ({len(data) / 1024:.0f} KiB)",
+        )
+
+
+def nested_payload(items: int) -> list[dict[str, Any]]:
+    """Payload shaped like the data for 'SubArrayForm' in the example app, with a few more field types."""
+    return [
+        {
+            "foo": index,
+            "name": f"Item number {index}",
+            "price": decimal.Decimal(index) / 100,
+            "bar": [
+                {
+                    "foo": sub_index,
+                    "tags": ["alpha", "beta", "gamma"][: sub_index % 3 + 1],
+                    "bar": [{"fizz": f"fizz-{index}-{sub_index}-{n}", "buzz": n} for n in range(4)],
+                }
+                for sub_index in range(5)
+            ],
+        }
+        for index in range(items)
+    ]
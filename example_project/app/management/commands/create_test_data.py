@@ -1,20 +1,36 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from django.contrib.auth.models import User
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
 
 class Command(BaseCommand):
     help = "Create test data."
 
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--things", type=int, default=0, help="Number of things to create.")
+        parser.add_argument("--invalid", type=float, default=0.0, help="Share of the things with an invalid value.")
+
     def handle(self, *args: Any, **options: Any) -> None:
-        create_test_data()
+        create_test_data(things=options["things"], invalid=options["invalid"])
 
 
-def create_test_data() -> None:
+def create_test_data(*, things: int = 0, invalid: float = 0.0) -> None:
     call_command("flush", "--noinput")
 
     User.objects.create_superuser("x", "x@admin.com", "x")
+
+    if things:
+        call_command(
+            "generate_subforms",
+            "example_project.app.admin.ThingForm",
+            rows=things,
+            invalid=invalid,
+            workers=1,
+        )
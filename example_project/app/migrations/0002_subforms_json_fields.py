@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:26
+
+from __future__ import annotations
+
+from django.db import migrations
+
+import subforms.encoders
+import subforms.model_fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="thing",
+            name="array",
+            field=subforms.model_fields.ArrayJSONField(default=list, encoder=subforms.encoders.SubformsJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name="thing",
+            name="dict",
+            field=subforms.model_fields.NestedJSONField(default=dict, encoder=subforms.encoders.SubformsJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name="thing",
+            name="nested",
+            field=subforms.model_fields.NestedJSONField(default=dict, encoder=subforms.encoders.SubformsJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name="thing",
+            name="required",
+            field=subforms.model_fields.ArrayJSONField(encoder=subforms.encoders.SubformsJSONEncoder),
+        ),
+    ]
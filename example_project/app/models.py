@@ -2,12 +2,15 @@
 
 from django.db import models
 
+from subforms.fields import NestedFormField
+from subforms.model_fields import ArrayJSONField, NestedJSONField
+
 
 class Thing(models.Model):
-    nested = models.JSONField(default=dict)
-    array = models.JSONField(default=list)
-    dict = models.JSONField(default=dict)
-    required = models.JSONField()
+    nested = NestedJSONField(subform="example_project.app.admin.ExampleForm", default=dict)
+    array = ArrayJSONField(subfield=NestedFormField(subform="example_project.app.admin.ExampleForm"), default=list)
+    dict = NestedJSONField(subform="example_project.app.admin.SubArrayForm", default=dict)
+    required = ArrayJSONField(subfield=NestedFormField(subform="example_project.app.admin.RequiredForm"))
 
     def __str__(self) -> str:
         return str(self.id)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from django.core.exceptions import PermissionDenied
+from django.urls import path, reverse
+from django.utils import translation
+from django.views.decorators.http import require_POST
+
+from .fields import DynamicArrayField, NestedFormField, changed_paths
+from .validation import format_path
+from .views import validation_response
+from .widgets import DynamicArrayWidget, NestedFormWidget
+
+if TYPE_CHECKING:
+    from django import forms
+    from django.contrib import admin
+    from django.http import HttpRequest, HttpResponse
+    from django.urls import URLPattern
+
+__all__ = [
+    "SubformsChangeMessageMixin",
+    "SubformsValidationMixin",
+    "changed_field_labels",
+]
+
+
+class SubformsValidationMixin:
+    """
+    Mixin for model admins, which validates array items of subforms fields on the server while they are edited.
+
+    Adds a 'validate-subforms/' URL to the admin, and sets it to the widgets of the subforms fields,
+    so that 'subforms.js' validates each array item when it's no longer focused, and shows the errors
+    of the item without submitting the whole form.
+    """
+
+    def get_urls(self: Any) -> list[URLPattern]:
+        view = self.admin_site.admin_view(require_POST(self.validate_subforms_view))
+        name = f"{self.opts.app_label}_{self.opts.model_name}_validate_subforms"
+        return [path("validate-subforms/", view, name=name), *super().get_urls()]
+
+    def validate_subforms_view(self: Any, request: HttpRequest) -> HttpResponse:
+        if not (self.has_add_permission(request) or self.has_change_permission(request)):
+            raise PermissionDenied
+        return validation_response(request, self.get_form(request)())
+
+    def render_change_form(
+        self: Any,
+        request: HttpRequest,
+        context: dict[str, Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        admin_site: admin.AdminSite = self.admin_site
+        url = reverse(f"{admin_site.name}:{self.opts.app_label}_{self.opts.model_name}_validate_subforms")
+        for field in context["adminform"].form.fields.values():
+            if isinstance(field.widget, (DynamicArrayWidget, NestedFormWidget)):
+                field.widget.validate_url = url
+        return super().render_change_form(request, context, *args, **kwargs)
+
+
+class SubformsChangeMessageMixin:
+    """
+    Mixin for model admins, which lists the changed nested values of subforms fields in the change history.
+
+    Instead of only the label of a changed subforms field, e.g. 'Array', the history lists
+    the path to each changed value in it, e.g. 'Array: 3.bar.fizz'.
+    """
+
+    def construct_change_message(
+        self: Any,
+        request: HttpRequest,
+        form: forms.Form,
+        formsets: Any,
+        add: bool = False,  # noqa: FBT001, FBT002
+    ) -> list[dict[str, Any]]:
+        change_message: list[dict[str, Any]] = super().construct_change_message(request, form, formsets, add)
+        for message in change_message:
+            # Messages for the objects in inline formsets name the object.
+            if "changed" in message and "name" not in message["changed"]:
+                message["changed"]["fields"] = changed_field_labels(form)
+        return change_message
+
+
+def changed_field_labels(form: forms.Form) -> list[str]:
+    """
+    Get the labels of the changed fields of a bound form, with the paths to the changed values of subforms fields.
+
+    :param form: The bound form.
+    :returns: Labels of the changed fields, e.g. '["Name", "Array: 3.bar.fizz", "Array: 4"]'.
+    """
+    labels: list[str] = []
+
+    # Labels are saved untranslated, like the change messages made by Django.
+    with translation.override(None):
+        for name in form.changed_data:
+            bound_field = form[name]
+            label = str(bound_field.label or name)
+            if not isinstance(bound_field.field, (DynamicArrayField, NestedFormField)):
+                labels.append(label)
+                continue
+
+            paths = changed_paths(bound_field.field, bound_field.initial, bound_field.data)
+            labels.extend(f"{label}: {format_path(path)}" if path else label for path in paths)
+
+    return labels
@@ -1,9 +1,33 @@
 from __future__ import annotations
 
+import logging
+import time
+
 from django.apps import AppConfig
+from django.core import checks
+
+from .settings import subforms_settings
+
+logger = logging.getLogger(__name__)
 
 
 class DjangoSubformsConfig(AppConfig):
     name = "subforms"
     verbose_name = "subforms"
     default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self) -> None:
+        from .checks import check_key_paths  # noqa: PLC0415
+
+        checks.register(check_key_paths, checks.Tags.models)
+
+        if subforms_settings.WARMUP:
+            self.warm_up()
+
+    def warm_up(self) -> None:
+        from .warmup import warm_up  # noqa: PLC0415
+
+        start = time.perf_counter()
+        count = warm_up()
+        duration = time.perf_counter() - start
+        logger.info(f"Subforms warm-up precompiled {count} fields in {duration:.3f}s.")
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from types import BuiltinFunctionType, FunctionType, MethodDescriptorType
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from django import forms
+from django.core.cache import caches
+from django.forms.renderers import get_default_renderer
+from django.utils.functional import Promise
+from django.utils.translation import get_language, override
+
+from .settings import subforms_settings
+from .utils import canonical_hash
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.core.cache.backends.base import BaseCache
+    from django.forms.renderers import BaseRenderer
+
+__all__ = [
+    "LRUCache",
+    "ResultCache",
+    "clean_cache",
+    "render_cache",
+    "uncacheable",
+]
+
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+# Types of field attributes that are options of the field, and are included in its signature.
+_OPTION_TYPES: tuple[type, ...] = (
+    str,
+    int,
+    float,
+    bool,
+    Decimal,
+    tuple,
+    list,
+    dict,
+    Promise,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodDescriptorType,
+    type(None),
+)
+
+# Fields that do I/O when cleaned, so their results cannot be cached.
+_UNCACHEABLE_FIELDS: tuple[type[forms.Field], ...] = (
+    forms.FileField,
+    forms.ModelChoiceField,
+)
+
+
+def uncacheable(obj: T) -> T:
+    """
+    Mark a field, validator or form class as uncacheable.
+
+    Fields using 'cache_results' skip the cache if the value they validate goes through
+    any uncacheable field, validator or form, e.g. because it has side effects or does I/O.
+    Can be used as a decorator.
+    """
+    obj.subforms_cacheable = False  # type: ignore[attr-defined]
+    return obj
+
+
+class LRUCache:
+    """Thread-safe in-memory cache that evicts the least recently used items when full."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.data: OrderedDict[str, Any] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self.lock:
+            try:
+                self.data.move_to_end(key)
+            except KeyError:
+                return default
+            return self.data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+
+
+class ResultCache:
+    """
+    Cache for results computed from subforms values.
+
+    Results are stored in an in-memory LRU cache, or in a Django cache if an alias
+    for one has been configured, so that they can be shared between processes.
+    """
+
+    def __init__(self, name: str, *, size_setting: str, alias_setting: str) -> None:
+        """
+        Create a new result cache.
+
+        :param name: Name of the cache, used to prefix keys in Django caches.
+        :param size_setting: Name of the setting for the in-memory cache size.
+        :param alias_setting: Name of the setting for the Django cache alias.
+        """
+        self.name = name
+        self.size_setting = size_setting
+        self.alias_setting = alias_setting
+        self.local = LRUCache(maxsize=getattr(subforms_settings, size_setting))
+
+    @property
+    def backend(self) -> BaseCache | None:
+        alias: str | None = getattr(subforms_settings, self.alias_setting)
+        return None if alias is None else caches[alias]
+
+    def get(self, key: str) -> Any:
+        """Get a result from the cache, or '_MISSING' if it's not cached."""
+        backend = self.backend
+        if backend is not None:
+            return backend.get(f"subforms:{self.name}:{key}", _MISSING)
+
+        self.local.maxsize = getattr(subforms_settings, self.size_setting)
+        return self.local.get(key, _MISSING)
+
+    def set(self, key: str, value: Any) -> None:
+        backend = self.backend
+        if backend is not None:
+            backend.set(f"subforms:{self.name}:{key}", value)
+            return
+
+        self.local.maxsize = getattr(subforms_settings, self.size_setting)
+        self.local.set(key, value)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def get_or_compute(self, key: str, compute: Callable[[], T]) -> T:
+        """
+        Get a result from the cache, or compute and cache it if it's not cached.
+
+        Results are copied going in and out of the cache, so that they can be modified freely.
+
+        :param key: Key for the result.
+        :param compute: Function that computes the result.
+        """
+        result = self.get(key)
+        if result is not _MISSING:
+            return copy.deepcopy(result)
+
+        result = compute()
+        self.set(key, copy.deepcopy(result))
+        return result
+
+
+clean_cache = ResultCache("clean", size_setting="CLEAN_CACHE_SIZE", alias_setting="CLEAN_CACHE_ALIAS")
+render_cache = ResultCache("render", size_setting="RENDER_CACHE_SIZE", alias_setting="RENDER_CACHE_ALIAS")
+
+
+def cached_clean(field: forms.Field, value: Any, clean: Callable[[Any], T], *, depth: int = 0) -> T:
+    """
+    Clean the given value, or get the cleaned result from the clean cache if the same value has been cleaned before.
+
+    :param field: The field cleaning the value.
+    :param value: The value to clean.
+    :param clean: Function that cleans the value.
+    :param depth: Nesting depth the value is cleaned at. Values nested deeper than the depth limit are invalid,
+                  so results are only reused at the same depth.
+    """
+    signature = field_signature(field)
+    if signature is None:
+        return clean(value)
+
+    key = f"{signature}:{depth}:{subforms_settings.MAX_DEPTH}:{canonical_hash(value)}"
+    return clean_cache.get_or_compute(key, lambda: clean(value))
+
+
+def field_signature(field: forms.Field) -> str | None:
+    """
+    Get a signature for the given subforms field, which changes if the field or its subfields change.
+
+    The signature includes the options of the fields, like their choices, validators and error messages.
+
+    :param field: The field to get the signature for.
+    :returns: The signature, or None if the field is uncacheable, e.g. because some of its options
+              can't be included in the signature.
+    """
+    if "_subforms_signature" in field.__dict__:
+        return field.__dict__["_subforms_signature"]
+
+    from .fields import DynamicArrayField, NestedFormField  # noqa: PLC0415
+
+    parts: list[str] = []
+    seen: set[type[forms.Form]] = set()
+    stack: list[forms.Field] = [field]
+    signature: str | None = None
+
+    while stack:
+        current = stack.pop()
+        if not is_cacheable(current):
+            break
+
+        try:
+            options = {
+                key: _signable(value)
+                for key, value in vars(current).items()
+                if not key.startswith("_") and isinstance(value, _OPTION_TYPES)
+            }
+            if hasattr(current, "choices"):
+                options["choices"] = _signable(list(current.choices))
+        except TypeError:
+            break
+        parts.append(f"{_path(type(current))}{canonical_hash(options)}")
+
+        if isinstance(current, DynamicArrayField):
+            stack.append(current.subfield)
+
+        elif isinstance(current, NestedFormField):
+            parts.append(_path(current.subform))
+            if current.subform in seen:
+                continue
+            if not is_cacheable(current.subform):
+                break
+            seen.add(current.subform)
+            stack.extend(current.subform.base_fields.values())
+
+    else:
+        signature = hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
+    field.__dict__["_subforms_signature"] = signature
+    return signature
+
+
+def render_cache_key(
+    widget: forms.Widget,
+    name: str,
+    value: Any,
+    attrs: dict[str, Any] | None,
+    renderer: BaseRenderer | None,
+    *,
+    constraints: str | None = None,
+) -> str | None:
+    """
+    Get the key for the rendered HTML of a subforms widget in the render cache.
+
+    :param widget: The widget being rendered.
+    :param name: HTML name of the widget.
+    :param value: The value being rendered.
+    :param attrs: HTML attributes for the widget.
+    :param renderer: Form renderer to render with, or None for the default renderer.
+    :param constraints: The constraints of the fields rendered with the widget, which change with the options
+                        of the fields, e.g. 'max_length', unlike the widgets.
+    :returns: The key, or None if the rendering of the widget can't be cached.
+    """
+    signature = widget_signature(widget)
+    if signature is None:
+        return None
+
+    parts = [
+        signature,
+        name,
+        canonical_hash(value),
+        canonical_hash(attrs or {}),
+        get_language() or "",
+        _path(type(renderer or get_default_renderer())),
+        str(getattr(widget, "validate_url", None)),
+        str(constraints),
+    ]
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def widget_signature(widget: forms.Widget) -> str | None:
+    """
+    Get a signature for the given subforms widget, which changes if the widget or its subwidgets change.
+
+    :param widget: The widget to get the signature for.
+    :returns: The signature, or None if the rendering of the widget can't be cached,
+              e.g. because it has a 'ModelChoiceField' inside it, which gets its choices from the database.
+    """
+    if "_subforms_signature" in widget.__dict__:
+        return widget.__dict__["_subforms_signature"]
+
+    from .widgets import DynamicArrayWidget, NestedFormWidget  # noqa: PLC0415
+
+    parts: list[str] = []
+    stack: list[forms.Widget] = [widget]
+    signature: str | None = None
+
+    while stack:
+        current = stack.pop()
+
+        options = {
+            key: value
+            for key, value in vars(current).items()
+            if not key.startswith("_") and isinstance(value, (str, int, float, bool, tuple, type(None)))
+        }
+        options["attrs"] = current.attrs
+        if hasattr(current, "choices"):
+            options["choices"] = list(current.choices)
+        if isinstance(current, (DynamicArrayWidget, NestedFormWidget)):
+            options["pack_data"] = current.pack_data
+        parts.append(f"{_path(type(current))}{canonical_hash(options)}")
+
+        if isinstance(current, DynamicArrayWidget):
+            stack.append(current.subwidget)
+
+        elif isinstance(current, NestedFormWidget):
+            fields = current.subform.fields.values()
+            if not getattr(current.form_class, "subforms_cacheable", True) or any(
+                isinstance(field, forms.ModelChoiceField) or not getattr(field, "subforms_cacheable", True)
+                for field in fields
+            ):
+                break
+
+            # Nested forms cut by the depth limit have no widgets, so the limit is part of the signature.
+            parts.append(f"{_path(current.form_class)}{list(current.widget_map)}")
+            stack.extend(reversed(current.widget_map.values()))
+
+    else:
+        signature = hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
+    widget.__dict__["_subforms_signature"] = signature
+    return signature
+
+
+def is_cacheable(obj: forms.Field | type[forms.Form]) -> bool:
+    if not getattr(obj, "subforms_cacheable", True):
+        return False
+    if isinstance(obj, _UNCACHEABLE_FIELDS):
+        return False
+    if isinstance(obj, forms.Field):
+        return all(getattr(validator, "subforms_cacheable", True) for validator in obj.validators)
+    return True
+
+
+def _path(obj: type | FunctionType) -> str:
+    return f"{obj.__module__}.{obj.__qualname__}"
+
+
+def _signable(value: Any) -> Any:
+    """
+    Convert an option of a field to a JSON-like value for the signature of the field.
+
+    Validators and other deconstructible objects are converted by their import path and arguments,
+    and functions by their import path.
+
+    :param value: The option to convert.
+    :raises TypeError: If the option can't be identified by its value, e.g. a function defined inside another one.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (Decimal, Promise)):
+        # Lazy translations are included untranslated, since the signature is computed only once.
+        with override(None):
+            return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_signable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _signable(item) for key, item in value.items()}
+    if isinstance(value, re.Pattern):
+        return [value.pattern, value.flags]
+    if isinstance(value, MethodDescriptorType):
+        return f"{_path(value.__objclass__)}.{value.__name__}"
+    if isinstance(value, (type, FunctionType, BuiltinFunctionType)):
+        if "<locals>" not in value.__qualname__:
+            # Lambdas have the same name as the other lambdas in the same scope.
+            code = getattr(value, "__code__", None)
+            return _path(value) if code is None else f"{_path(value)}:{code.co_firstlineno}"
+    elif hasattr(value, "deconstruct"):
+        path, args, kwargs = value.deconstruct()
+        return [path, _signable(args), _signable(kwargs)]
+
+    msg = f"Can't include {value!r} in a field signature."
+    raise TypeError(msg)
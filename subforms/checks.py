@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from django.apps import apps
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist
+
+from .fields import DynamicArrayField, NestedFormField
+from .indexes import SubformKeyIndex
+from .model_fields import ArrayJSONField, NestedJSONField
+
+if TYPE_CHECKING:
+    from django import forms
+    from django.apps import AppConfig
+    from django.db import models
+
+__all__ = [
+    "check_key_path",
+    "check_key_paths",
+    "check_model_key_paths",
+]
+
+
+def check_key_paths(app_configs: list[AppConfig] | None = None, **kwargs: Any) -> list[checks.CheckMessage]:
+    """Check that the key paths of subform key indexes and fields exist in the subforms of their JSON fields."""
+    errors: list[checks.CheckMessage] = []
+    configs = apps.get_app_configs() if app_configs is None else app_configs
+
+    for app_config in configs:
+        for model in app_config.get_models():
+            errors += check_model_key_paths(model)
+
+    return errors
+
+
+def check_model_key_paths(model: type[models.Model]) -> list[checks.CheckMessage]:
+    """Check that the key paths of the subform key indexes and fields of the given model exist."""
+    from .model_fields import SubformKeyField  # noqa: PLC0415
+
+    key_paths: list[tuple[str, str, str]] = [
+        (index.name, index.field_name, index.path)
+        for index in model._meta.indexes
+        if isinstance(index, SubformKeyIndex)
+    ]
+    key_paths += [
+        (field.name, field.field_name, field.path)
+        for field in model._meta.get_fields()
+        if isinstance(field, SubformKeyField)
+    ]
+
+    errors: list[checks.CheckMessage] = []
+    for name, field_name, path in key_paths:
+        error = check_key_path(model, name, field_name, path)
+        if error is not None:
+            errors.append(checks.Error(error, obj=model, id="subforms.E001"))
+
+    return errors
+
+
+def check_key_path(model: type[models.Model], name: str, field_name: str, path: str) -> str | None:
+    """
+    Check that the given key path exists in the subform of the given JSON field.
+
+    :param model: The model the JSON field is on.
+    :param name: Name of the index or field using the key path, for the error message.
+    :param field_name: Name of the JSON field.
+    :param path: Key path in the JSON value, with keys separated by '__'.
+    :returns: An error message, or None if the key path exists.
+    """
+    try:
+        model_field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return f"'{name}' refers to the nonexistent field '{field_name}'."
+
+    field: forms.Field | None
+    if isinstance(model_field, NestedJSONField) and model_field.subform is not None:
+        field = NestedFormField(subform=model_field.subform)
+    elif isinstance(model_field, ArrayJSONField) and model_field.subfield is not None:
+        field = DynamicArrayField(subfield=model_field.subfield)
+    else:
+        # Without a subform, there is nothing to check the path against.
+        return None
+
+    for key in path.split("__"):
+        if isinstance(field, NestedFormField):
+            field = field.subform.base_fields.get(key)
+        elif isinstance(field, DynamicArrayField) and key.isdigit():
+            field = field.subfield
+        else:
+            field = None
+
+        if field is None:
+            return f"'{name}' refers to the key path '{path}', which doesn't exist in '{field_name}'."
+
+    return None
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+import functools
+import json
+from typing import TYPE_CHECKING, Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .encoders import SubformsJSONEncoder
+from .settings import subforms_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+__all__ = [
+    "JSONCodec",
+    "canonical_dumps",
+    "dumps",
+    "get_codec",
+    "loads",
+]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class JSONCodec:
+    """Functions for encoding and decoding JSON with a specific JSON library."""
+
+    name: str
+    """Name of the JSON library."""
+
+    loads: Callable[[str | bytes], Any]
+    """Decode a JSON document."""
+
+    dumps: Callable[[Any], str]
+    """Encode a value as a JSON document."""
+
+    canonical: Callable[[Any], str]
+    """Encode a value as a JSON document with sorted keys, and values that can't be encoded as strings."""
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Decode a JSON document with the JSON codec set in the 'JSON_CODEC' setting.
+
+    :param data: The JSON document to decode.
+    :raises ValueError: If the document is not valid JSON.
+    """
+    return get_codec().loads(data)
+
+
+def dumps(value: Any) -> str:
+    """
+    Encode a value as a JSON document with the JSON codec set in the 'JSON_CODEC' setting.
+
+    Values that are not JSON types, like dataclasses, arrays and decimals, are encoded
+    the same way as with 'subforms.encoders.SubformsJSONEncoder', regardless of the codec.
+
+    :param value: The value to encode.
+    """
+    return get_codec().dumps(value)
+
+
+def canonical_dumps(value: Any) -> str:
+    """
+    Encode a value as a canonical JSON document for hashing, with the JSON codec set in the 'JSON_CODEC' setting.
+
+    Dictionary keys are sorted, so that equal values give the same document regardless of key order.
+    Values that can't be encoded, not even like with 'subforms.encoders.SubformsJSONEncoder',
+    are encoded by their string form.
+
+    :param value: The value to encode.
+    """
+    return get_codec().canonical(value)
+
+
+def get_codec(name: str | None = None) -> JSONCodec:
+    """
+    Get a JSON codec.
+
+    :param name: Name of the codec, defaults to the 'JSON_CODEC' setting.
+    :raises ImproperlyConfigured: If the codec doesn't exist or its library is not installed.
+    """
+    return _get_codec(subforms_settings.JSON_CODEC if name is None else name)
+
+
+@functools.cache
+def _get_codec(name: str) -> JSONCodec:
+    if name == "auto":
+        for factory in _CODECS.values():
+            try:
+                return factory()
+            except ImportError:
+                continue
+
+    factory = _CODECS.get(name)
+    if factory is None:
+        msg = f"Invalid JSON codec: '{name}'. Choose one of: 'auto', {', '.join(map(repr, _CODECS))}."
+        raise ImproperlyConfigured(msg)
+
+    try:
+        return factory()
+    except ImportError as error:
+        msg = f"JSON codec '{name}' requires the '{name}' package to be installed."
+        raise ImproperlyConfigured(msg) from error
+
+
+def _orjson_codec() -> JSONCodec:
+    import orjson  # noqa: PLC0415
+
+    default = SubformsJSONEncoder().default
+    fallback = _with_str_fallback(default)
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(value: Any) -> str:
+        # Datetimes are passed to the default encoder so that they are formatted the same way as by Django.
+        return orjson.dumps(value, default=default, option=options).decode()
+
+    def canonical(value: Any) -> str:
+        # Dataclasses are passed to the default encoder too, so that their fields are sorted like keys.
+        option = options | orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        return orjson.dumps(value, default=fallback, option=option).decode()
+
+    return JSONCodec(name="orjson", loads=orjson.loads, dumps=dumps, canonical=canonical)
+
+
+def _msgspec_codec() -> JSONCodec:
+    import msgspec  # noqa: PLC0415
+
+    default = SubformsJSONEncoder().default
+    fallback = _with_str_fallback(default)
+    encoder = msgspec.json.Encoder(enc_hook=default)
+    sorted_encoder = msgspec.json.Encoder(enc_hook=fallback, order="sorted")
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: str | bytes) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as error:
+            # Raise the same error as the other codecs.
+            raise ValueError(str(error)) from error
+
+    def dumps(value: Any) -> str:
+        # Datetimes are encoded natively by msgspec, so they are converted with the default
+        # encoder beforehand to be formatted the same way as by Django.
+        return encoder.encode(_convert_datetimes(value, default)).decode()
+
+    def canonical(value: Any) -> str:
+        # msgspec only sorts dictionaries with string keys.
+        return sorted_encoder.encode(_convert_datetimes(value, fallback, str_keys=True)).decode()
+
+    return JSONCodec(name="msgspec", loads=loads, dumps=dumps, canonical=canonical)
+
+
+def _convert_datetimes(value: Any, default: Callable[[Any], Any], *, str_keys: bool = False) -> Any:
+    """
+    Convert the datetimes, times and durations in the given value with the given function.
+
+    Dictionaries, lists, tuples and dataclasses containing them are copied, the rest of the value is left as is.
+    With 'str_keys', the keys of the dictionaries that are not strings are converted to strings.
+    """
+    root = [value]
+    stack: list[tuple[Any, Any]] = [(root, 0)]
+
+    while stack:
+        container, key = stack.pop()
+        item = container[key]
+
+        if isinstance(item, (dt.datetime, dt.time, dt.timedelta)):
+            container[key] = default(item)
+        elif isinstance(item, dict):
+            container[key] = copied = {str(k): v for k, v in item.items()} if str_keys else dict(item)
+            stack.extend((copied, item_key) for item_key in copied)
+        elif isinstance(item, (list, tuple)):
+            container[key] = copied = list(item)
+            stack.extend((copied, index) for index in range(len(copied)))
+        elif dataclasses.is_dataclass(item) and not isinstance(item, type):
+            container[key] = copied = default(item)
+            stack.extend((copied, item_key) for item_key in copied)
+
+    return root[0]
+
+
+def _with_str_fallback(default: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap the given default encoder to encode the values it can't encode by their string form."""
+
+    def fallback(value: Any) -> Any:
+        try:
+            return default(value)
+        except TypeError:
+            return str(value)
+
+    return fallback
+
+
+def _stdlib_codec() -> JSONCodec:
+    encoder = SubformsJSONEncoder(separators=(",", ":"))
+    sorted_encoder = SubformsJSONEncoder(separators=(",", ":"), sort_keys=True)
+    sorted_encoder.default = _with_str_fallback(sorted_encoder.default)
+    return JSONCodec(name="json", loads=json.loads, dumps=encoder.encode, canonical=sorted_encoder.encode)
+
+
+# Codecs in order of preference for 'auto'.
+_CODECS: dict[str, Callable[[], JSONCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from django import forms
+from django.core import validators
+
+from .fields import DynamicArrayField, NestedFormField
+from .widgets import DynamicArrayWidget, NestedFormWidget
+
+__all__ = [
+    "describe_constraints",
+    "describe_field",
+]
+
+
+_VALIDATOR_CODES: dict[type[validators.BaseValidator], str] = {
+    validators.MinValueValidator: "min_value",
+    validators.MaxValueValidator: "max_value",
+    validators.MinLengthValidator: "min_length",
+    validators.MaxLengthValidator: "max_length",
+}
+
+# Stand-in for the length of the value in the messages of length validators, which is only known in the browser.
+_SHOW_VALUE = 987_654_321
+
+
+def describe_constraints(widget: forms.Widget) -> dict[str, Any] | None:
+    """
+    Describe the constraints of the fields of a subforms widget, for validating the values in the browser.
+
+    Each field is described by its constraints, e.g. '{"required": "<message>", "max_length": [10, "<message>"]}'.
+    Arrays describe their items in 'array', and nested forms refer to the fields of their form in 'forms'
+    by the index of the form in 'form', so that each form is described only once, even if it's used
+    in several places, or refers to itself.
+
+    :param widget: The subforms widget of the field.
+    :returns: The fields of each form in 'forms', and the description of the field itself in 'root'.
+              None if the widget is not for a subforms field.
+    """
+    describer = _Describer()
+
+    if isinstance(widget, NestedFormWidget):
+        root = {"form": describer.form_id(widget.form_class, widget.subform)}
+    elif isinstance(widget, DynamicArrayWidget) and widget.array_field is not None:
+        root = describer.describe(widget.array_field)
+    else:
+        return None
+
+    while describer.pending:
+        form_id, form = describer.pending.pop()
+        describer.forms[form_id] = {name: describer.describe(field) for name, field in form.fields.items()}
+
+    return {"root": root, "forms": describer.forms}
+
+
+class _Describer:
+    def __init__(self) -> None:
+        self.forms: list[dict[str, Any]] = []
+        self.form_ids: dict[type[forms.Form], int] = {}
+        self.pending: list[tuple[int, forms.Form]] = []
+
+    def form_id(self, form_class: type[forms.Form], form: forms.Form | None = None) -> int:
+        if form_class not in self.form_ids:
+            self.form_ids[form_class] = len(self.forms)
+            self.forms.append({})
+            self.pending.append((self.form_ids[form_class], form or form_class()))
+        return self.form_ids[form_class]
+
+    def describe(self, field: forms.Field) -> dict[str, Any]:
+        if isinstance(field, NestedFormField):
+            widget = field.widget
+            form = widget.subform if isinstance(widget, NestedFormWidget) else None
+            node: dict[str, Any] = {"form": self.form_id(field.subform, form)}
+            if not field.required:
+                node["optional"] = True
+            return node
+
+        if isinstance(field, DynamicArrayField):
+            item = self.describe(field.subfield)
+            # Empty items are removed before the array is cleaned, so they don't need to be valid.
+            if field.remove_empty_items:
+                item.pop("required", None)
+                if "form" in item:
+                    item["optional"] = True
+
+            node = {"array": item}
+            if field.required:
+                node["required"] = str(field.error_messages["required"])
+            if field.max_length is not None:
+                message = field.error_messages["too_long"] % {"max_length": field.max_length, "items": "%(items)s"}
+                node["max_length"] = [field.max_length, str(message)]
+            return node
+
+        return describe_field(field)
+
+
+def describe_field(field: forms.Field) -> dict[str, Any]:
+    """Describe the constraints of a field that is not a subforms field."""
+    node: dict[str, Any] = {}
+    if field.disabled:
+        return node
+
+    if field.required:
+        node["required"] = str(field.error_messages["required"])
+    if isinstance(field, forms.CharField) and field.strip:
+        node["strip"] = True
+
+    if isinstance(field, (forms.FloatField, forms.DecimalField)):
+        node["number"] = str(field.error_messages["invalid"])
+    elif isinstance(field, forms.IntegerField):
+        node["integer"] = str(field.error_messages["invalid"])
+
+    # Choices of model choice fields would need to be queried from the database.
+    if isinstance(field, forms.ChoiceField) and not isinstance(field, forms.ModelChoiceField):
+        node["choices"] = [choice_values(field.choices), str(field.error_messages["invalid_choice"])]
+        if isinstance(field, forms.MultipleChoiceField):
+            node["multiple"] = True
+
+    for validator in field.validators:
+        code = _VALIDATOR_CODES.get(type(validator))
+        limit = getattr(validator, "limit_value", None)
+        if code is None or isinstance(limit, bool) or not isinstance(limit, (int, float, Decimal)):
+            continue
+
+        if code in {"min_length", "max_length"}:
+            message = str(validator.message % {"limit_value": limit, "show_value": _SHOW_VALUE})
+            message = message.replace(str(_SHOW_VALUE), "%(show_value)s")
+        else:
+            message = str(validator.message % {"limit_value": limit})
+
+        node[code] = [float(limit) if isinstance(limit, Decimal) else limit, message]
+
+    return node
+
+
+def choice_values(choices: Any) -> list[str]:
+    """Get the values of the given choices as strings, including the values in option groups, but not empty values."""
+    values: list[str] = []
+    for value, label in choices:
+        if isinstance(label, (list, tuple)):
+            values.extend(choice_values(label))
+        elif value not in validators.EMPTY_VALUES:
+            values.append(str(value))
+    return values
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import array
+import dataclasses
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+__all__ = [
+    "SubformsJSONEncoder",
+]
+
+
+class SubformsJSONEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder for values cleaned by subforms fields.
+
+    Encodes dataclasses, e.g. cleaned data from fields using 'as_dataclass', as JSON objects,
+    and arrays from fields using 'compact' as JSON arrays, so that they are saved the same way
+    as dictionaries and lists.
+    Use this as the 'encoder' for the model 'JSONField' the values are saved to.
+    """
+
+    def default(self, o: Any) -> Any:
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            return {field.name: getattr(o, field.name) for field in dataclasses.fields(o)}
+        if isinstance(o, array.array):
+            return o.tolist()
+        return super().default(o)
@@ -1,28 +1,66 @@
 from __future__ import annotations
 
+import array
 import copy
-import json
-from typing import Any
+import dataclasses
+import functools
+import math
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
 
 from django import forms
-from django.contrib.postgres.utils import prefix_validation_error
 from django.core.exceptions import ValidationError
 from django.forms.models import ALL_FIELDS
 from django.utils.translation import gettext_lazy
 
-from .widgets import DynamicArrayWidget, NestedFormWidget
+from . import codec
+from .cache import cached_clean
+from .settings import subforms_settings
+from .utils import (
+    canonical_hash,
+    form_dataclass,
+    has_data,
+    is_dataclass_field_name,
+    prefix_validation_error,
+    resolve_form_class,
+)
+from .widgets import DynamicArrayWidget, JSONHiddenInput, NestedFormWidget
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, MutableMapping
+
+    from .utils import FormClassReference
 
 __all__ = [
     "DynamicArrayField",
     "NestedFormField",
+    "changed_paths",
 ]
 
 
+# Marks array items that have been added or removed when finding changed values.
+_ADDED_OR_REMOVED = object()
+
+# Number of nested forms currently being cleaned.
+_clean_depth: ContextVar[int] = ContextVar("_clean_depth", default=0)
+
+# Results of nested forms cleaned ahead of time by 'clean_value', by the value and form class they were cleaned for.
+_clean_memo: ContextVar[dict[tuple[int, type[forms.Form]], tuple[Any, ValidationError | None]] | None] = ContextVar(
+    "_clean_memo",
+    default=None,
+)
+
+
 class DynamicArrayField(forms.Field):
     """From field that can wrap other form fields to expanded lists."""
 
+    hidden_widget = JSONHiddenInput
+
     default_error_messages = {
         "too_long": gettext_lazy("Ensure there are %(max_length)s or fewer items (currently %(items)s)."),
+        "unique": gettext_lazy("Item has the same %(fields)s as the item at index %(duplicate_of)s."),
+        "unique_key": gettext_lazy("Item is a duplicate of the item at index %(duplicate_of)s."),
+        "out_of_range": gettext_lazy("Ensure all items fit in a 64-bit integer."),
     }
 
     def __init__(
@@ -30,8 +68,28 @@ def __init__(
         subfield: type[forms.Field] | forms.Field = forms.CharField,
         *,
         remove_empty_items: bool = True,
+        deduplicate: bool = False,
+        unique_by: str | tuple[str, ...] | Callable[[Any], Any] | None = None,
+        cache_results: bool = False,
+        compact: bool = False,
         **kwargs: Any,
     ) -> None:
+        """
+        Create a new dynamic array field.
+
+        :param subfield: The field to use for the array items.
+        :param remove_empty_items: Remove empty items from the array before cleaning it.
+        :param deduplicate: Clean identical items only once, and reuse the result for their duplicates.
+                            Only use this if the subfield cleans identical items the same way.
+        :param unique_by: Require items to be unique by the given subform field, tuple of subform fields,
+                          or by the key returned by the given function for each cleaned item.
+        :param cache_results: Cache cleaned results by the content of the value, so that cleaning
+                              the same value again is skipped. Values going through uncacheable
+                              fields or validators (see 'subforms.cache.uncacheable') are not cached.
+        :param compact: Return the cleaned items as an 'array.array' instead of a list. Only for
+                        'IntegerField' and 'FloatField' subfields. Save these values with
+                        'subforms.encoders.SubformsJSONEncoder'.
+        """
         # Compatibility with 'django.contrib.postgres.fields.array.ArrayField'
         if "base_field" in kwargs:  # pragma: no cover
             subfield = kwargs.pop("base_field")
@@ -46,20 +104,59 @@ def __init__(
             else DynamicArrayWidget(subwidget=self.subfield.widget),
         )
         self.remove_empty_items = remove_empty_items
+        self.deduplicate = deduplicate
+        self.unique_by = (unique_by,) if isinstance(unique_by, str) else unique_by
+        self.cache_results = cache_results
+        self.compact = compact
         self.max_length = kwargs.pop("max_length", None)
         super().__init__(**kwargs)
 
+        if isinstance(self.widget, DynamicArrayWidget):
+            self.widget.array_field = self
+
+        if self.compact and self.typecode is None:
+            msg = "Compact arrays are only supported for 'IntegerField' and 'FloatField' subfields."
+            raise ValueError(msg)
+
+        if self.unique_by is not None and not callable(self.unique_by):
+            if not isinstance(self.subfield, NestedFormField):
+                msg = "Items can only be unique by fields for 'NestedFormField' subfields. Use a function instead."
+                raise ValueError(msg)
+            # Lazily referenced forms are checked when first cleaned, so they can still refer to themselves.
+            if isinstance(self.subfield._subform, type):  # noqa: SLF001
+                self.check_unique_by()
+
     def __deepcopy__(self, memo: dict[int, Any]) -> Any:
         obj = super().__deepcopy__(memo)
         obj.subfield = copy.deepcopy(self.subfield, memo)
+        if isinstance(obj.widget, DynamicArrayWidget):
+            obj.widget.array_field = obj
         return obj
 
-    def clean(self, value: list[Any]) -> list[Any]:
+    @property
+    def typecode(self) -> str | None:
+        """Type code of the 'array.array' for compact arrays of the subfield, if it has one."""
+        if isinstance(self.subfield, forms.DecimalField):
+            return None
+        if isinstance(self.subfield, forms.FloatField):
+            return "d"
+        if isinstance(self.subfield, forms.IntegerField):
+            return "q"
+        return None
+
+    def clean(self, value: list[Any]) -> list[Any] | array.array:
+        if self.cache_results:
+            return cached_clean(self, value, functools.partial(clean_value, self), depth=_clean_depth.get())
+        if _clean_memo.get() is None:
+            return clean_value(self, value)
+        return self._clean(value)
+
+    def _clean(self, value: list[Any]) -> list[Any] | array.array:
         cleaned_data: list[Any] = []
         errors: list[ValidationError] = []
 
         if self.remove_empty_items:
-            value = [item for item in value if item not in self.empty_values]
+            value = [item for item in value if not self.is_empty_item(item)]
 
         if self.max_length is not None and len(value) > self.max_length:
             error = ValidationError(
@@ -69,14 +166,33 @@ def clean(self, value: list[Any]) -> list[Any]:
             )
             errors.append(error)
 
-        for index, item in enumerate(value):
+        compact_data = self.clean_compact(value) if self.compact and not errors else None
+
+        # Cleaned items or errors by item key, when deduplicating.
+        results: dict[Any, tuple[Any, ValidationError | None]] = {}
+
+        for index, item in enumerate(value if compact_data is None else ()):
             try:
-                item_data = self.clean_item(index, item)
+                item_data = (
+                    self.clean_item_once(index, item, results) if self.deduplicate else self.clean_item(index, item)
+                )
             except ValidationError as error:
                 errors.append(error)
             else:
                 cleaned_data.append(item_data)
 
+        if self.compact and not errors and compact_data is None:
+            try:
+                compact_data = array.array(self.typecode, cleaned_data)
+            except OverflowError:
+                errors.append(ValidationError(message=self.error_messages["out_of_range"], code="out_of_range"))
+
+        if compact_data is not None:
+            cleaned_data = compact_data
+
+        if not errors and self.unique_by is not None:
+            errors.extend(self.validate_unique(cleaned_data))
+
         if errors:
             raise ValidationError(errors)
 
@@ -87,26 +203,163 @@ def clean(self, value: list[Any]) -> list[Any]:
         self.run_validators(cleaned_data)
         return cleaned_data
 
+    def clean_compact(self, value: list[Any]) -> array.array | None:
+        """
+        Clean the items of a compact array all at once.
+
+        Only done for plain integer and float subfields, which clean items simply by converting them.
+        Other subfields, and arrays with items that don't convert cleanly, are cleaned item by item instead.
+
+        :param value: The items to clean.
+        :returns: The cleaned items, or None if they need to be cleaned item by item.
+        """
+        if type(self.subfield) not in {forms.IntegerField, forms.FloatField}:
+            return None
+        if self.subfield.validators or self.subfield.localize:
+            return None
+
+        try:
+            if self.typecode == "d":
+                cleaned = array.array("d", (float(item) for item in value if type(item) in {int, float, str}))
+                if not all(math.isfinite(item) for item in cleaned):
+                    return None
+            else:
+                cleaned = array.array(
+                    "q", (item if type(item) is int else int(item) for item in value if type(item) in {int, str})
+                )
+        except (ValueError, OverflowError):
+            return None
+
+        # Some items were of types that need to be cleaned by the subfield.
+        if len(cleaned) != len(value):
+            return None
+        return cleaned
+
     def clean_item(self, index: int, item: Any) -> Any:
         try:
             return self.subfield.clean(item)
         except ValidationError as error:
-            raise prefix_validation_error(
-                error=error,
-                prefix=gettext_lazy("index %(index)s:"),
-                code="item_invalid",
-                params={"index": index},
-            ) from error
+            raise self.prefix_item_error(error, index) from error
+
+    def clean_item_once(self, index: int, item: Any, results: dict[Any, tuple[Any, ValidationError | None]]) -> Any:
+        """
+        Clean an array item, reusing the result of an identical item if one has already been cleaned.
+
+        :param index: Index of the item in the array.
+        :param item: The item to clean.
+        :param results: Cleaned items, or errors from cleaning them, by item key.
+        """
+        key = self.item_key(item)
+        result = results.get(key)
+        if result is None:
+            try:
+                cleaned = self.subfield.clean(item)
+            except ValidationError as error:
+                results[key] = (None, error)
+                raise self.prefix_item_error(error, index) from error
+
+            results[key] = (cleaned, None)
+            return cleaned
+
+        cleaned, error = result
+        if error is not None:
+            raise self.prefix_item_error(error, index) from error
+        return copy.deepcopy(cleaned)
+
+    @staticmethod
+    def item_key(item: Any) -> Any:
+        """Key for identifying identical items when deduplicating."""
+        # Include the type in the key, since e.g. 1 and True are equal.
+        if isinstance(item, (str, int, float, type(None))):
+            return type(item), item
+        return canonical_hash(item)
+
+    def validate_unique(self, cleaned_data: list[Any]) -> list[ValidationError]:
+        """
+        Check that the cleaned items are unique by the 'unique_by' key.
+
+        :param cleaned_data: The cleaned items.
+        :returns: Errors for all items that have the same key as an earlier item.
+        """
+        if not callable(self.unique_by):
+            self.check_unique_by()
+
+        errors: list[ValidationError] = []
+        first_index_by_key: dict[Any, int] = {}
+
+        for index, item in enumerate(cleaned_data):
+            if callable(self.unique_by):
+                key = self.unique_by(item)
+            elif isinstance(item, dict):
+                key = tuple(item[name] for name in self.unique_by)
+            else:
+                key = tuple(getattr(item, name) for name in self.unique_by)
+
+            try:
+                duplicate_of = first_index_by_key.setdefault(key, index)
+            except TypeError:
+                key = canonical_hash(key)
+                duplicate_of = first_index_by_key.setdefault(key, index)
+
+            if duplicate_of == index:
+                continue
+
+            if callable(self.unique_by):
+                error = ValidationError(
+                    message=self.error_messages["unique_key"],
+                    code="unique",
+                    params={"duplicate_of": duplicate_of},
+                )
+            else:
+                error = ValidationError(
+                    message=self.error_messages["unique"],
+                    code="unique",
+                    params={"fields": ", ".join(self.unique_by), "duplicate_of": duplicate_of},
+                )
+            errors.append(self.prefix_item_error(error, index))
+
+        return errors
+
+    def is_empty_item(self, item: Any) -> bool:
+        """
+        Check if the given item is empty, and is removed with 'remove_empty_items'.
+
+        Like optional nested forms, items of nested forms are empty if none of their values are filled.
+        """
+        if isinstance(self.subfield, NestedFormField):
+            return not has_data(item)
+        return item in self.empty_values
+
+    def check_unique_by(self) -> None:
+        """
+        Check that the subform declares the fields the items must be unique by.
+
+        :raises ValueError: If some of the fields are not in the subform.
+        """
+        subform = self.subfield.subform
+        missing = [name for name in self.unique_by if name not in subform.base_fields]
+        if missing:
+            names = ", ".join(f"'{name}'" for name in missing)
+            msg = f"Items can't be unique by {names}, since '{subform.__name__}' has no such fields."
+            raise ValueError(msg)
+
+    def prefix_item_error(self, error: ValidationError, index: int) -> ValidationError:
+        return prefix_validation_error(
+            error=error,
+            prefix=gettext_lazy("index %(index)s:"),
+            code="item_invalid",
+            params={"index": index},
+        )
 
     def validate(self, value: list) -> None:
         pass
 
-    def has_changed(self, initial: dict[str, Any], data: dict[str, Any]) -> bool:  # pragma: no cover
-        if not data and not initial:
-            return False
-        return super().has_changed(initial, data)
+    def has_changed(self, initial: list[Any] | None, data: list[Any] | None) -> bool:
+        return bool(changed_paths(self, initial, data, first_only=True))
 
     def prepare_value(self, value: list[Any] | str) -> list[Any]:
+        if isinstance(value, array.array):
+            return value.tolist()
         if not isinstance(value, str):
             return value
 
@@ -122,33 +375,111 @@ def prepare_value(self, value: list[Any] | str) -> list[Any]:
 class NestedFormField(forms.Field):
     """Form field that can wrap other forms as nested fields."""
 
-    def __init__(self, subform: type[forms.Form], **kwargs: Any) -> None:
-        self.subform: type[forms.Form] = subform
+    hidden_widget = JSONHiddenInput
+
+    default_error_messages = {
+        "max_depth": gettext_lazy("Ensure this value is nested at most %(max_depth)s levels deep."),
+    }
+
+    def __init__(
+        self,
+        subform: FormClassReference,
+        *,
+        max_depth: int | None = None,
+        cache_results: bool = False,
+        as_dataclass: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Create a new nested form field.
+
+        :param subform: The form class to wrap, a dotted import path to it, or a callable returning it.
+                        Use the latter two for forms that refer to themselves, e.g. for tree-shaped data.
+        :param max_depth: Maximum number of nested form levels. Defaults to the 'MAX_DEPTH' setting.
+        :param cache_results: Cache cleaned results by the content of the value, so that cleaning
+                              the same value again is skipped. Values going through uncacheable
+                              fields, validators or forms (see 'subforms.cache.uncacheable') are not cached.
+        :param as_dataclass: Return the cleaned data as an instance of a slotted dataclass generated
+                             for the subform, instead of a dictionary. Save these values with
+                             'subforms.encoders.SubformsJSONEncoder'.
+        """
+        self._subform = subform
+        self.max_depth = max_depth
+        self.cache_results = cache_results
+        self.as_dataclass = as_dataclass
         kwargs.setdefault(
             "widget",
-            self.widget(form_class=subform)
+            self.widget(form_class=subform, max_depth=max_depth)
             if issubclass(self.widget, NestedFormWidget)
-            else NestedFormWidget(form_class=subform),
+            else NestedFormWidget(form_class=subform, max_depth=max_depth),
         )
         super().__init__(**kwargs)
 
-    def __deepcopy__(self, memo: dict[int, Any]) -> Any:
-        obj = super().__deepcopy__(memo)
-        obj.subform = copy.deepcopy(self.subform, memo)
-        return obj
+    @property
+    def subform(self) -> type[forms.Form]:
+        if not isinstance(self._subform, type):
+            self._subform = resolve_form_class(self._subform)
+        return self._subform
+
+    def clean(self, value: dict[str, Any]) -> Any:
+        memo = _clean_memo.get()
+        if memo is not None and isinstance(value, dict):
+            result = memo.get((id(value), self.subform))
+            if result is not None:
+                cleaned, error = result
+                if error is not None:
+                    raise error
+                return cleaned
+
+        if self.cache_results:
+            return cached_clean(self, value, functools.partial(clean_value, self), depth=_clean_depth.get())
+        if memo is None:
+            return clean_value(self, value)
+        return self._clean(value)
+
+    def _clean(self, value: dict[str, Any]) -> Any:
+        if value in self.empty_values and not self.required:
+            return value
+        # Like for 'MultiValueField', optional nested forms are empty if none of their values are filled.
+        if not self.required and isinstance(value, dict) and not has_data(value):
+            return None
+
+        depth = _clean_depth.get()
+        max_depth = subforms_settings.MAX_DEPTH if self.max_depth is None else self.max_depth
+        if value and depth >= max_depth:
+            raise ValidationError(
+                message=self.error_messages["max_depth"],
+                code="max_depth",
+                params={"max_depth": max_depth},
+            )
+
+        token = _clean_depth.set(depth + 1)
+        try:
+            form = self.subform(data=value)
+            is_valid = form.is_valid()
+        finally:
+            _clean_depth.reset(token)
 
-    def clean(self, value: dict[str, Any]) -> dict[str, Any]:
-        form = self.subform(data=value)
-        if not form.is_valid():
+        if not is_valid:
             errors: list[str] = [
-                (f"{field_name}: {error.message}" if field_name != ALL_FIELDS else error.message)
+                (f"{field_name}: {message}" if field_name != ALL_FIELDS else message)
                 for field_name, error_data in form.errors.items()
                 for error in error_data.as_data()
+                for message in error
             ]
             raise ValidationError(errors)
 
+        if self.as_dataclass:
+            field_names = tuple(form.cleaned_data)
+            # Keys added in the form's 'clean' that can't be dataclass fields, e.g. 'extra-key', are
+            # returned in a dictionary. Form fields that can't be dataclass fields are a configuration error.
+            if all(is_dataclass_field_name(name) for name in field_names if name not in form.fields):
+                return form_dataclass(self.subform, field_names)(**form.cleaned_data)
         return form.cleaned_data
 
+    def has_changed(self, initial: dict[str, Any] | None, data: dict[str, Any] | None) -> bool:
+        return bool(changed_paths(self, initial, data, first_only=True))
+
     def prepare_value(self, value: dict[str, Any] | str) -> dict[str, Any]:
         if not isinstance(value, str):
             return value
@@ -159,7 +490,7 @@ def prepare_value(self, value: dict[str, Any] | str) -> dict[str, Any]:
         # so that the app can still work.
         parsed = value.replace("=>", ":").replace('\\"', '"').replace('""', '"')
         parsed = "{" + parsed + "}"
-        value = json.loads(parsed)
+        value = codec.loads(parsed)
 
         form = self.subform()
         for key, val in value.items():
@@ -167,3 +498,214 @@ def prepare_value(self, value: dict[str, Any] | str) -> dict[str, Any]:
             value[key] = form.fields[key].prepare_value(val)
 
         return value
+
+
+def clean_value(
+    field: DynamicArrayField | NestedFormField,
+    value: Any,
+    *,
+    memo: MutableMapping[tuple[int, type[forms.Form]], tuple[Any, ValidationError | None]] | None = None,
+) -> Any:
+    """
+    Clean the given value with the given subforms field.
+
+    Nested forms are cleaned from the deepest level up using an explicit stack instead of
+    recursion, so that deeply nested data doesn't need several stack frames for each level.
+    When a nested form is cleaned, the results of the nested forms inside it have already been
+    computed, so cleaning them again only looks up the results.
+
+    :param field: The field to clean the value with.
+    :param value: The value to clean.
+    :param memo: Results of nested forms that have already been cleaned, by the 'id()' of their value and
+                 their form class. Those nested forms are not cleaned again, and the results of the nested
+                 forms that are cleaned are added to it. The values must be kept alive as long as the memo is used.
+    """
+    depth = _clean_depth.get()
+    memo = {} if memo is None else memo
+    memo_token = _clean_memo.set(memo)
+    try:
+        for node_field, node_value, node_depth in reversed(collect_nested_values(field, value, depth=depth, memo=memo)):
+            depth_token = _clean_depth.set(node_depth)
+            try:
+                result = (node_field.clean(node_value), None)
+            except ValidationError as error:
+                result = (None, error)
+            finally:
+                _clean_depth.reset(depth_token)
+
+            memo[id(node_value), node_field.subform] = result
+
+        return field._clean(value)  # noqa: SLF001
+
+    finally:
+        _clean_memo.reset(memo_token)
+
+
+def collect_nested_values(
+    field: DynamicArrayField | NestedFormField,
+    value: Any,
+    *,
+    depth: int,
+    memo: Mapping[tuple[int, type[forms.Form]], Any] | None = None,
+) -> list[tuple[NestedFormField, dict[str, Any], int]]:
+    """
+    Collect all nested form values inside the given value, parents before their children.
+
+    Fields caching their results are collected, but not the values inside them,
+    since those only need to be cleaned if the result is not cached.
+
+    :param field: The field for the value.
+    :param value: The value to collect nested form values from.
+    :param depth: Nesting depth of the value.
+    :param memo: Results of nested forms that have already been cleaned. These are not collected,
+                 nor the values inside them.
+    :returns: Fields, values and nesting depths of the nested form values.
+    """
+    nodes: list[tuple[NestedFormField, dict[str, Any], int]] = []
+    stack: list[tuple[forms.Field, Any, int]] = [(field, value, depth)]
+
+    while stack:
+        current, current_value, current_depth = stack.pop()
+
+        if isinstance(current, NestedFormField):
+            if not isinstance(current_value, dict):
+                continue
+
+            if current is not field:
+                if memo is not None and (id(current_value), current.subform) in memo:
+                    continue
+                nodes.append((current, current_value, current_depth))
+                if current.cache_results:
+                    continue
+
+            for name, subfield in current.subform.base_fields.items():
+                if isinstance(subfield, (DynamicArrayField, NestedFormField)) and name in current_value:
+                    stack.append((subfield, current_value[name], current_depth + 1))
+
+        elif isinstance(current, DynamicArrayField):
+            if not isinstance(current_value, list) or (current is not field and current.cache_results):
+                continue
+
+            items = current_value
+            if current.remove_empty_items:
+                items = [item for item in items if not current.is_empty_item(item)]
+            if current.deduplicate:
+                items = list({current.item_key(item): item for item in reversed(items)}.values())
+
+            stack.extend((current.subfield, item, current_depth) for item in reversed(items))
+
+    return nodes
+
+
+def changed_paths(
+    field: forms.Field,
+    initial: Any,
+    data: Any,
+    *,
+    first_only: bool = False,
+) -> list[tuple[str | int, ...]]:
+    """
+    Compare the initial value of a field to its data, and find the paths to the nested values that have changed.
+
+    Nested forms and arrays are compared value by value, and the values in them with the 'has_changed'
+    of their own fields, so that e.g. '1' in the data is the same as 1 in the initial value of an 'IntegerField'.
+    Items added to or removed from an array are changed as a whole.
+
+    :param field: The field to compare with.
+    :param initial: The initial value of the field, e.g. from the database.
+    :param data: The data for the field, e.g. from the widget of the field.
+    :param first_only: Stop at the first changed value, when only knowing whether anything has changed is enough.
+    :returns: Paths from the value to the changed values, e.g. '("bar", 0, "fizz")' for the 'fizz' field
+              of the first item of 'bar', or '()' if the value changed as a whole. Empty if nothing has changed.
+    """
+    paths: list[tuple[str | int, ...]] = []
+    stack: list[tuple[forms.Field, Any, Any, tuple[str | int, ...]]] = [(field, initial, data, ())]
+
+    while stack and not (first_only and paths):
+        current, current_initial, current_data, path = stack.pop()
+
+        if current_initial is _ADDED_OR_REMOVED:
+            paths.append(path)
+            continue
+
+        if current.disabled:
+            continue
+
+        if isinstance(current, NestedFormField):
+            current_initial = (
+                {} if current_initial is None else _as_dict(_initial_value(current, current_initial, dict))
+            )
+            current_data = {} if current_data is None else current_data
+
+            if isinstance(current_initial, dict) and isinstance(current_data, dict):
+                stack.extend(
+                    (subfield, current_initial.get(name), current_data.get(name), (*path, name))
+                    for name, subfield in reversed(current.subform.base_fields.items())
+                )
+                continue
+
+        elif isinstance(current, DynamicArrayField):
+            current_initial = [] if current_initial is None else _initial_value(current, current_initial, list)
+            current_data = [] if current_data is None else current_data
+
+            if isinstance(current_initial, list) and isinstance(current_data, list):
+                if current.remove_empty_items:
+                    current_initial = [item for item in current_initial if not current.is_empty_item(item)]
+                    current_data = [item for item in current_data if not current.is_empty_item(item)]
+
+                # Arrays without items are shown with a single empty item, so that is the same as no items.
+                current_initial = current_initial or [None]
+                current_data = current_data or [None]
+
+                common = min(len(current_initial), len(current_data))
+                longest = max(len(current_initial), len(current_data))
+                stack.extend(
+                    (current, _ADDED_OR_REMOVED, _ADDED_OR_REMOVED, (*path, index))
+                    for index in reversed(range(common, longest))
+                )
+                stack.extend(
+                    (current.subfield, current_initial[index], current_data[index], (*path, index))
+                    for index in reversed(range(common))
+                )
+                continue
+
+        # Values that are not nested forms or arrays, or are not valid ones, are compared as usual.
+        if isinstance(current, (NestedFormField, DynamicArrayField)):
+            changed = forms.Field.has_changed(current, current_initial, current_data)
+        else:
+            changed = current.has_changed(current_initial, current_data)
+        if changed:
+            paths.append(path)
+
+    return paths
+
+
+def _initial_value(field: DynamicArrayField | NestedFormField, value: Any, value_type: type) -> Any:
+    """
+    Get the initial value of a subforms field for comparing it to the data.
+
+    Initial values can also be strings, e.g. JSON from the hidden initial input of fields
+    with 'show_hidden_initial', or values the database driver failed to convert.
+    Strings that can't be decoded are returned as is, so they are compared as a whole.
+    """
+    if not isinstance(value, str):
+        return field.prepare_value(value)
+
+    try:
+        decoded = codec.loads(value)
+    except ValueError:
+        pass
+    else:
+        if isinstance(decoded, value_type):
+            return decoded
+
+    try:
+        return field.prepare_value(value)
+    except (ValueError, KeyError):
+        return value
+
+
+def _as_dict(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {item.name: getattr(value, item.name) for item in dataclasses.fields(value)}
+    return value
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from django.db import models
+from django.db.backends.utils import names_digest
+
+from .model_fields import key_transform
+
+if TYPE_CHECKING:
+    from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+    from django.db.backends.ddl_references import Statement
+
+__all__ = [
+    "SubformKeyIndex",
+]
+
+
+class SubformKeyIndex(models.Index):
+    """
+    Index for the value at a key path in a 'NestedJSONField' or 'ArrayJSONField'.
+
+    On PostgreSQL, lookups on the key path, e.g. 'filter(nested__bar__fizz="x")' for
+    'SubformKeyIndex("nested", "bar__fizz")', can use the index instead of scanning the JSON values of the whole
+    table. Other databases, like SQLite, still scan the table for these lookups, since Django passes the key path
+    to the query as a parameter, so it doesn't match the indexed expression. Use a 'SubformKeyField' there instead.
+    The key path is checked against the subform of the field with the system checks.
+    If no name is given, one is generated like for other indexes.
+    """
+
+    def __init__(self, field_name: str, path: str, *, name: str = "", gin: bool = False, **kwargs: Any) -> None:
+        """
+        Create a new subform key index.
+
+        :param field_name: Name of the JSON field.
+        :param path: Key path in the JSON value, with keys separated by '__', e.g. 'bar__fizz' or 'items__0__name'.
+        :param name: Name of the index. Generated from the model, field and path if not given.
+        :param gin: Use a GIN index on PostgreSQL, for containment lookups on nested objects or arrays,
+                    e.g. 'filter(nested__bar__contains={"fizz": "x"})'. Other databases use a regular index.
+        """
+        self.field_name = field_name
+        self.path = path
+        self.gin = gin
+        # Expression indexes must be named, but the name can only be generated once the model is known.
+        super().__init__(key_transform(field_name, path), name=name or "__unnamed__", **kwargs)
+        self.name = name
+
+    @property
+    def suffix(self) -> str:  # type: ignore[override]
+        return "gin" if self.gin else "idx"
+
+    def set_name_with_model(self, model: type[models.Model]) -> None:
+        table_name = model._meta.db_table
+        digest = names_digest(table_name, self.field_name, self.path, length=6)
+        self.name = f"{table_name[:11]}_{self.field_name[:7]}_{digest}_{self.suffix}"
+
+    def create_sql(
+        self,
+        model: type[models.Model],
+        schema_editor: BaseDatabaseSchemaEditor,
+        using: str = "",
+        **kwargs: Any,
+    ) -> Statement:
+        if self.gin and schema_editor.connection.vendor == "postgresql":
+            using = " USING gin"
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def deconstruct(self) -> tuple[str, tuple[Any, ...], dict[str, Any]]:
+        _, _, kwargs = super().deconstruct()
+        if self.gin:
+            kwargs["gin"] = True
+        return f"{self.__class__.__module__}.{self.__class__.__name__}", (self.field_name, self.path), kwargs
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from subforms.management.utils import add_worker_arguments, import_model_form, insert
+from subforms.parallel import chunked, map_chunks
+from subforms.synthetic import SyntheticData
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert rows with synthetic data generated from the fields of a model form, in batches, "
+        "e.g. to load test changelists, change views and revalidation."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("form", help="Import path to the model form, e.g. 'app.forms.ThingForm'.")
+        parser.add_argument("--rows", type=int, default=1000, help="Number of rows to insert.")
+        add_worker_arguments(parser, chunk_size=1000, chunk_help="Number of rows to generate at a time.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of rows to insert at a time.")
+        parser.add_argument("--width", type=int, default=10, help="Number of items in the arrays in the form.")
+        parser.add_argument("--array-length", type=int, default=3, help="Number of items in nested arrays.")
+        parser.add_argument("--depth", type=int, default=3, help="Number of nested form levels.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data.")
+        parser.add_argument(
+            "--invalid",
+            type=float,
+            default=0.0,
+            help="Share of the rows, from 0 to 1, with an invalid value, e.g. for testing revalidation.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        form_path: str = options["form"]
+        form_class = import_model_form(form_path)
+        model = form_class._meta.model
+
+        if not 0 <= options["invalid"] <= 1:
+            msg = "'--invalid' must be between 0 and 1."
+            raise CommandError(msg)
+
+        # Only fields stored on the model can be inserted.
+        model_field_names = {field.name for field in model._meta.concrete_fields}
+        field_names = tuple(name for name in form_class.base_fields if name in model_field_names)
+
+        generate = functools.partial(
+            generate_rows,
+            form_path,
+            field_names,
+            {
+                "width": options["width"],
+                "array_length": options["array_length"],
+                "depth": options["depth"],
+                "seed": options["seed"],
+            },
+            options["invalid"],
+        )
+        results = map_chunks(generate, row_chunks(options["rows"], options["chunk_size"]), workers=options["workers"])
+
+        inserted = 0
+        for rows in results:
+            for batch in chunked(rows, options["batch_size"]):
+                insert(model, batch)
+                inserted += len(batch)
+
+        self.stderr.write(f"Inserted {inserted} rows to {model._meta.label}.")
+
+
+def row_chunks(rows: int, chunk_size: int) -> Generator[tuple[int, int], None, None]:
+    """Split the given number of rows into chunks, as the index and number of rows of each chunk."""
+    for index, start in enumerate(range(0, rows, chunk_size)):
+        yield index, min(chunk_size, rows - start)
+
+
+def generate_rows(
+    form_path: str,
+    field_names: tuple[str, ...],
+    options: dict[str, Any],
+    invalid: float,
+    chunk: tuple[int, int],
+) -> list[dict[str, Any]]:
+    """
+    Generate synthetic values for a chunk of rows of the given form. Run in the worker processes.
+
+    Each chunk is seeded from the seed and its index, so the same seed generates
+    the same rows regardless of the number of workers.
+
+    :param form_path: Import path to the model form.
+    :param field_names: Names of the fields to generate values for.
+    :param options: Width, array length, depth and seed of the generated values, see 'SyntheticData'.
+    :param invalid: Share of the rows with an invalid value.
+    :param chunk: Index and number of rows of the chunk.
+    """
+    index, count = chunk
+    form_class = import_model_form(form_path)
+    generator = SyntheticData(**{**options, "seed": f"{options['seed']}:{index}"})
+    return list(generator.rows(form_class, count, field_names=field_names, invalid=invalid))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import pathlib
+from typing import TYPE_CHECKING, Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from subforms import codec
+from subforms.management.utils import add_worker_arguments, form_fields, import_model_form, insert, open_output
+from subforms.parallel import chunked, map_chunks
+from subforms.validation import clean_fields
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Import records from a newline delimited JSON (NDJSON) file through the fields of a model form. "
+        "Valid records are inserted in batches, and invalid ones written to a rejects file with their errors."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("form", help="Import path to the model form, e.g. 'app.forms.ThingForm'.")
+        parser.add_argument("file", help="NDJSON file to import, with one JSON object per line.")
+        add_worker_arguments(parser, chunk_size=1000, chunk_help="Number of records to validate at a time.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of rows to insert at a time.")
+        parser.add_argument("--rejects", help="File to write the invalid records to, as JSON lines.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        form_path: str = options["form"]
+        form_class = import_model_form(form_path)
+        model = form_class._meta.model
+
+        # Only fields stored on the model can be imported.
+        model_field_names = {field.name for field in model._meta.concrete_fields}
+        field_names = tuple(name for name in form_class.base_fields if name in model_field_names)
+
+        path = pathlib.Path(options["file"])
+        if not path.is_file():
+            msg = f"File '{path}' does not exist."
+            raise CommandError(msg)
+
+        results = map_chunks(
+            functools.partial(clean_records, form_path, field_names),
+            chunked(read_lines(path), options["chunk_size"]),
+            workers=options["workers"],
+        )
+
+        imported = rejected = 0
+        with contextlib.ExitStack() as stack:
+            rejects = stack.enter_context(open_output(options["rejects"])) if options["rejects"] else None
+
+            for cleaned, invalid in results:
+                for batch in chunked(cleaned, options["batch_size"]):
+                    insert(model, batch)
+                    imported += len(batch)
+
+                rejected += len(invalid)
+                if rejects is not None:
+                    for line_number, line, errors in invalid:
+                        rejects.write(codec.dumps({"line": line_number, "record": line, "errors": errors}) + "\n")
+
+        self.stderr.write(f"Imported {imported} records to {model._meta.label}, rejected {rejected}.")
+
+
+def read_lines(path: pathlib.Path) -> Generator[tuple[int, bytes], None, None]:
+    """Read the non-empty lines of the given file with their line numbers, one line at a time."""
+    with path.open("rb") as file:
+        for line_number, line in enumerate(file, start=1):
+            stripped = line.strip()
+            if stripped:
+                yield line_number, stripped
+
+
+def clean_records(
+    form_path: str,
+    field_names: tuple[str, ...],
+    lines: list[tuple[int, bytes]],
+) -> tuple[list[dict[str, Any]], list[tuple[int, str, dict[str, list[str]]]]]:
+    """
+    Decode and clean the given records with the fields of the given form. Run in the worker processes.
+
+    :param form_path: Import path to the model form.
+    :param field_names: Names of the fields to clean.
+    :param lines: Line numbers and JSON documents of the records.
+    :returns: Cleaned data of the valid records, and the line numbers, lines and errors by path of the invalid ones.
+    """
+    fields = form_fields(form_path, field_names)
+
+    cleaned: list[dict[str, Any]] = []
+    invalid: list[tuple[int, str, dict[str, list[str]]]] = []
+
+    for line_number, line in lines:
+        try:
+            record = codec.loads(line)
+        except ValueError as error:
+            invalid.append((line_number, line.decode(errors="replace"), {"": [f"Invalid JSON: {error}"]}))
+            continue
+
+        if not isinstance(record, dict):
+            invalid.append((line_number, line.decode(errors="replace"), {"": ["Record must be a JSON object."]}))
+            continue
+
+        cleaned_data, errors = clean_fields(fields, record)
+        if errors:
+            invalid.append((line_number, line.decode(errors="replace"), errors))
+        else:
+            cleaned.append(cleaned_data)
+
+    return cleaned, invalid
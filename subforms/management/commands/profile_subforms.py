@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from django import forms
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from subforms.management.utils import profile_phases
+from subforms.synthetic import SyntheticData, form_data
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile instantiating, parsing, cleaning and rendering a form with synthetic data generated from its fields, "
+        "and print the hotspots and peak memory use of each phase."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("form", help="Import path to the form, e.g. 'app.forms.ThingForm'.")
+        parser.add_argument("--width", type=int, default=100, help="Number of items in the arrays in the form.")
+        parser.add_argument("--array-length", type=int, default=5, help="Number of items in nested arrays.")
+        parser.add_argument("--depth", type=int, default=3, help="Number of nested form levels.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data.")
+        parser.add_argument("--top", type=int, default=15, help="Number of hotspots to print for each phase.")
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=["cumulative", "tottime", "ncalls"],
+            help="Order of the hotspots.",
+        )
+        parser.add_argument(
+            "--phase",
+            action="append",
+            choices=["instantiate", "parse", "clean", "render"],
+            help="Phase to profile. Can be given several times. Defaults to all phases.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        form_path: str = options["form"]
+        try:
+            form_class = import_string(form_path)
+        except ImportError as error:
+            raise CommandError(str(error)) from error
+
+        if not isinstance(form_class, type) or not issubclass(form_class, forms.BaseForm):
+            msg = f"'{form_path}' is not a form."
+            raise CommandError(msg)
+
+        generator = SyntheticData(
+            width=options["width"],
+            array_length=options["array_length"],
+            depth=options["depth"],
+            seed=options["seed"],
+        )
+        values = generator.form_values(form_class)
+        data = form_data(form_class, values)
+        self.stdout.write(f"Profiling {form_path} with {len(data)} form data keys.")
+
+        phases = profile_phases(form_class, values, data)
+        for name in options["phase"] or list(phases):
+            wall_time, peak_memory, stats = run_phase(phases[name])
+
+            self.stdout.write(f"\n{name}: {wall_time * 1000:.2f} ms, peak memory {peak_memory / 1024:.1f} KiB")
+            stream = io.StringIO()
+            pstats.Stats(stats, stream=stream).strip_dirs().sort_stats(options["sort"]).print_stats(options["top"])
+            self.stdout.write(stream.getvalue().strip("\n"))
+
+
+def run_phase(phase: Callable[[], Any]) -> tuple[float, int, cProfile.Profile]:
+    """
+    Run a phase to measure its wall time, peak memory use and hotspots.
+
+    The phase is run once to warm up caches and load templates, and then separately for each
+    measurement, so that 'tracemalloc' and 'cProfile' don't slow down the timed run.
+
+    :param phase: Function running the phase.
+    :returns: Wall time in seconds, peak memory use in bytes, and the profile.
+    """
+    phase()
+
+    start = time.perf_counter()
+    phase()
+    wall_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        phase()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    profile = cProfile.Profile()
+    profile.runcall(phase)
+    return wall_time, peak_memory, profile
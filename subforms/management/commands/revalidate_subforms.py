@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+from typing import TYPE_CHECKING, Any
+
+from django.core.management.base import BaseCommand
+
+from subforms import codec
+from subforms.management.utils import (
+    add_worker_arguments,
+    form_fields,
+    import_model_form,
+    open_output,
+    subforms_model_field_names,
+)
+from subforms.model_fields import unwrap
+from subforms.parallel import chunked, map_chunks
+from subforms.validation import validate_fields
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Validate the stored values of the subforms fields of a model form, "
+        "and report the rows that are no longer valid, e.g. after changing a subform."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("form", help="Import path to the model form, e.g. 'app.forms.ThingForm'.")
+        add_worker_arguments(parser, chunk_size=2000, chunk_help="Number of rows to validate at a time.")
+        parser.add_argument("--output", help="File to write the report to, as JSON lines. Defaults to stdout.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        form_path: str = options["form"]
+        chunk_size: int = options["chunk_size"]
+
+        form_class = import_model_form(form_path)
+        field_names = subforms_model_field_names(form_class)
+        model = form_class._meta.model
+
+        rows = model._default_manager.order_by("pk").values_list("pk", *field_names).iterator(chunk_size=chunk_size)
+        results = map_chunks(
+            functools.partial(validate_rows, form_path, field_names),
+            chunked(rows, chunk_size),
+            workers=options["workers"],
+        )
+
+        checked = invalid = 0
+        with contextlib.ExitStack() as stack:
+            output = stack.enter_context(open_output(options["output"])) if options["output"] else self.stdout
+            for count, errors in results:
+                checked += count
+                for pk, row_errors in errors:
+                    invalid += 1
+                    output.write(codec.dumps({"pk": pk, "errors": row_errors}) + "\n")
+
+        self.stderr.write(f"Checked {checked} rows of {model._meta.label}, {invalid} invalid.")
+
+
+def validate_rows(
+    form_path: str,
+    field_names: list[str],
+    rows: list[tuple[Any, ...]],
+) -> tuple[int, list[tuple[Any, dict[str, list[str]]]]]:
+    """
+    Validate the given rows with the subforms fields of the given form. Run in the worker processes.
+
+    :param form_path: Import path to the model form.
+    :param field_names: Names of the fields in the rows, after the primary key.
+    :param rows: Primary keys and field values of the rows.
+    :returns: Number of validated rows, and the errors by path of the invalid rows.
+    """
+    fields = form_fields(form_path, tuple(field_names))
+
+    invalid: list[tuple[Any, dict[str, list[str]]]] = []
+    for pk, *values in rows:
+        errors = validate_fields(fields, {name: unwrap(value) for name, value in zip(field_names, values, strict=True)})
+        if errors:
+            invalid.append((pk, errors))
+
+    return len(rows), invalid
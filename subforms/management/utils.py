@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import functools
+import os
+import pathlib
+from typing import TYPE_CHECKING, Any, TextIO
+
+from django import forms
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from subforms.fields import DynamicArrayField, NestedFormField
+from subforms.validation import clean_fields
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.core.management.base import CommandParser
+    from django.db import models
+
+__all__ = [
+    "add_worker_arguments",
+    "form_fields",
+    "import_model_form",
+    "insert",
+    "open_output",
+    "profile_phases",
+    "subforms_model_field_names",
+]
+
+
+def import_model_form(form_path: str) -> type[forms.ModelForm]:
+    """
+    Import the model form from the given import path.
+
+    :param form_path: Import path to the model form, e.g. 'app.forms.ThingForm'.
+    :raises CommandError: If the form can't be imported or is not a model form.
+    """
+    try:
+        form_class = import_string(form_path)
+    except ImportError as error:
+        raise CommandError(str(error)) from error
+
+    if not isinstance(form_class, type) or not issubclass(form_class, forms.ModelForm):
+        msg = f"'{form_path}' is not a model form."
+        raise CommandError(msg)
+
+    return form_class
+
+
+def subforms_model_field_names(form_class: type[forms.ModelForm]) -> list[str]:
+    """
+    Get the names of the subforms fields of the given model form that are stored on its model.
+
+    :param form_class: The model form.
+    :raises CommandError: If the form has no stored subforms fields.
+    """
+    model_field_names = {field.name for field in form_class._meta.model._meta.concrete_fields}
+    field_names = [
+        name
+        for name, field in form_class.base_fields.items()
+        if isinstance(field, (NestedFormField, DynamicArrayField)) and name in model_field_names
+    ]
+    if not field_names:
+        msg = f"'{form_class.__module__}.{form_class.__qualname__}' has no subforms fields stored on its model."
+        raise CommandError(msg)
+
+    return field_names
+
+
+@functools.cache
+def form_fields(form_path: str, field_names: tuple[str, ...]) -> dict[str, forms.Field]:
+    """Get the given fields of the form at the given import path. Cached for the worker processes."""
+    form_class = import_string(form_path)
+    return {name: form_class.base_fields[name] for name in field_names}
+
+
+def insert(model: type[models.Model], batch: list[dict[str, Any]]) -> None:
+    """Insert a batch of rows with the given field values in a single transaction."""
+    with transaction.atomic():
+        model._default_manager.bulk_create([model(**data) for data in batch])
+
+
+def open_output(path: str) -> TextIO:
+    return pathlib.Path(path).open("w", encoding="utf-8")
+
+
+def add_worker_arguments(parser: CommandParser, *, chunk_size: int, chunk_help: str) -> None:
+    """Add the arguments for commands processing data in chunks on a pool of worker processes."""
+    parser.add_argument("--chunk-size", type=int, default=chunk_size, help=chunk_help)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes. Defaults to the number of CPUs.",
+    )
+
+
+def profile_phases(form_class: type[forms.BaseForm], values: dict[str, Any], data: Any) -> dict[str, Callable[[], Any]]:
+    """
+    Get the phases of handling the given form, for profiling or measuring them.
+
+    :param form_class: The form to profile.
+    :param values: Values for the fields of the form.
+    :param data: The values as form data.
+    :returns: Functions running each phase by name. 'instantiate' creates the form with the form data,
+              'parse' also parses the values of its fields, 'clean' cleans the values with the fields
+              of the form, and 'render' renders the form with the values as initial values.
+    """
+
+    def instantiate() -> forms.BaseForm:
+        return form_class(data=data)
+
+    def parse() -> dict[str, Any]:
+        form = form_class(data=data)
+        return {bound_field.name: bound_field.data for bound_field in form}
+
+    def clean() -> Any:
+        return clean_fields(form_class().fields, values)
+
+    def render() -> str:
+        return str(form_class(initial=values))
+
+    return {"instantiate": instantiate, "parse": parse, "clean": clean, "render": render}
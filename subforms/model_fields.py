@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import functools
+import json
+from typing import TYPE_CHECKING, Any
+
+from django.db import models
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+from django.db.models.functions import Cast
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import codec
+from .encoders import SubformsJSONEncoder
+from .fields import DynamicArrayField, NestedFormField
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django import forms
+    from django.db.backends.base.base import BaseDatabaseWrapper
+    from django.db.models.sql.compiler import SQLCompiler
+
+    from .utils import FormClassReference
+
+__all__ = [
+    "ArrayJSONField",
+    "JSONArrayLength",
+    "LazyJSON",
+    "NestedJSONField",
+    "SubformKeyField",
+    "key_transform",
+]
+
+
+class LazyJSON(SimpleLazyObject):
+    """
+    JSON document from the database that is only decoded when it's first used.
+
+    Behaves like the decoded value, e.g. 'isinstance(value, dict)' is true for JSON objects.
+    The undecoded JSON text is available in 'raw'.
+    """
+
+    def __init__(self, raw: str, loads: Callable[[str], Any]) -> None:
+        """
+        Create a new lazily decoded JSON value.
+
+        :param raw: The JSON text.
+        :param loads: Function for decoding the JSON text.
+        """
+        self.__dict__["raw"] = raw
+        self.__dict__["loads"] = loads
+        super().__init__(functools.partial(loads, raw))
+
+    def __copy__(self) -> Any:
+        if self._wrapped is empty:
+            return type(self)(self.raw, self.loads)
+        return super().__copy__()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Any:
+        if self._wrapped is empty:
+            result = type(self)(self.raw, self.loads)
+            memo[id(self)] = result
+            return result
+        return super().__deepcopy__(memo)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickle the JSON text if it hasn't been decoded, e.g. when sending it to worker processes.
+        if self._wrapped is empty:
+            return type(self), (self.raw, self.loads)
+        return super().__reduce__()
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._wrapped is not empty
+
+
+def unwrap(value: Any) -> Any:
+    """Get the decoded value of a 'LazyJSON' value, or the value itself for other values."""
+    if isinstance(value, LazyJSON):
+        if value._wrapped is empty:  # noqa: SLF001
+            value._setup()  # noqa: SLF001
+        return value._wrapped  # noqa: SLF001
+    return value
+
+
+class LazyJSONField(models.JSONField):
+    """
+    JSON model field that decodes values from the database lazily.
+
+    Values are loaded as 'LazyJSON' objects, which are decoded the first time they are used,
+    so querysets that don't use the JSON values, e.g. admin changelists, don't decode them.
+    Use lookups and transforms (e.g. 'values("array__0__name")' or 'JSONArrayLength("array")')
+    to read parts of a value in the database without loading the whole value.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("encoder", SubformsJSONEncoder)
+        super().__init__(*args, **kwargs)
+
+    def from_db_value(self, value: Any, expression: Any, connection: BaseDatabaseWrapper) -> Any:
+        if value is None or isinstance(expression, KeyTransform) or not isinstance(value, str):
+            return super().from_db_value(value, expression, connection)
+        return LazyJSON(value, self.loads)
+
+    def loads(self, value: str) -> Any:
+        if self.decoder is not None:
+            return json.loads(value, cls=self.decoder)
+        return codec.loads(value)
+
+    def get_prep_value(self, value: Any) -> Any:
+        return super().get_prep_value(unwrap(value))
+
+    def validate(self, value: Any, model_instance: models.Model | None) -> None:
+        super().validate(unwrap(value), model_instance)
+
+    def value_from_object(self, obj: models.Model) -> Any:
+        return unwrap(super().value_from_object(obj))
+
+
+class NestedJSONField(LazyJSONField):
+    """
+    JSON model field for values from a 'NestedFormField'.
+
+    Model forms don't render the initial value of a callable default, e.g. 'default=dict',
+    as a hidden input, since the subforms fields compare their values to the initial value
+    themselves, and can't parse it back from a single input.
+    """
+
+    def __init__(self, *args: Any, subform: FormClassReference | None = None, **kwargs: Any) -> None:
+        """
+        Create a new nested JSON field.
+
+        :param subform: Form class to use for the 'NestedFormField' of this field in model forms.
+                        Not included in migrations, since it doesn't affect the database.
+        """
+        self.subform = subform
+        super().__init__(*args, **kwargs)
+
+    def formfield(self, **kwargs: Any) -> forms.Field:
+        if self.subform is None:
+            return super().formfield(**kwargs)
+        return models.Field.formfield(
+            self,
+            **{"form_class": NestedFormField, "subform": self.subform, "show_hidden_initial": False, **kwargs},
+        )
+
+
+class ArrayJSONField(LazyJSONField):
+    """
+    JSON model field for values from a 'DynamicArrayField'.
+
+    Like for 'NestedJSONField', model forms don't render the initial value of a callable default as a hidden input.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        subfield: type[forms.Field] | forms.Field | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Create a new array JSON field.
+
+        :param subfield: Subfield to use for the 'DynamicArrayField' of this field in model forms.
+                         Not included in migrations, since it doesn't affect the database.
+        """
+        self.subfield = subfield
+        super().__init__(*args, **kwargs)
+
+    def formfield(self, **kwargs: Any) -> forms.Field:
+        if self.subfield is None:
+            return super().formfield(**kwargs)
+        return models.Field.formfield(
+            self,
+            **{"form_class": DynamicArrayField, "subfield": self.subfield, "show_hidden_initial": False, **kwargs},
+        )
+
+
+class JSONArrayLength(models.Func):
+    """Length of a JSON array, computed in the database without loading the array."""
+
+    function = "JSON_ARRAY_LENGTH"
+    output_field = models.IntegerField()
+
+    def as_postgresql(self, compiler: SQLCompiler, connection: BaseDatabaseWrapper, **extra_context: Any) -> Any:
+        return self.as_sql(compiler, connection, function="JSONB_ARRAY_LENGTH", **extra_context)
+
+    def as_mysql(self, compiler: SQLCompiler, connection: BaseDatabaseWrapper, **extra_context: Any) -> Any:
+        return self.as_sql(compiler, connection, function="JSON_LENGTH", **extra_context)
+
+
+def key_transform(field_name: str, path: str, *, text: bool = False) -> KeyTransform:
+    """
+    Expression for the value at the given key path in a JSON field.
+
+    The expression is the same one Django uses for lookups like 'filter(nested__bar__fizz="x")',
+    so it can be used for indexes and generated columns that those lookups can use.
+
+    :param field_name: Name of the JSON field.
+    :param path: Key path in the JSON value, with keys separated by '__', e.g. 'bar__fizz' or 'items__0__name'.
+    :param text: Get the value as text instead of JSON, like the 'KeyTextTransform' of the last key.
+    """
+    *keys, last_key = path.split("__")
+    expression: Any = field_name
+    for key in keys:
+        expression = KeyTransform(key, expression)
+    return KeyTextTransform(last_key, expression) if text else KeyTransform(last_key, expression)
+
+
+if hasattr(models, "GeneratedField"):  # Django 5.0+
+
+    class SubformKeyField(models.GeneratedField):
+        """
+        Generated column for the value at a key path in a 'NestedJSONField' or 'ArrayJSONField'.
+
+        The column can be indexed, filtered and ordered by like any other column, e.g. in admin
+        'list_filter', without decoding the JSON values. The key path is checked against the subform
+        of the JSON field with the system checks.
+        """
+
+        def __init__(
+            self,
+            field_name: str,
+            path: str,
+            *,
+            output_field: models.Field,
+            db_persist: bool = True,
+            **kwargs: Any,
+        ) -> None:
+            """
+            Create a new subform key field.
+
+            :param field_name: Name of the JSON field.
+            :param path: Key path in the JSON value, with keys separated by '__', e.g. 'bar__fizz'.
+            :param output_field: Model field for the type of the value.
+            :param db_persist: Store the value in the database, instead of computing it when read.
+            """
+            self.field_name = field_name
+            self.path = path
+
+            *keys, last_key = path.split("__")
+            expression: Any = KeyTextTransform(
+                last_key, key_transform(field_name, "__".join(keys)) if keys else field_name
+            )
+            if not isinstance(output_field, (models.CharField, models.TextField)):
+                expression = Cast(expression, output_field=output_field)
+
+            kwargs.pop("expression", None)
+            super().__init__(expression=expression, output_field=output_field, db_persist=db_persist, **kwargs)
+
+        def deconstruct(self) -> tuple[str, str, tuple[Any, ...], dict[str, Any]]:
+            name, path, _, kwargs = super().deconstruct()
+            kwargs.pop("expression", None)
+            kwargs["field_name"] = self.field_name
+            kwargs["path"] = self.path
+            return name, path, (), kwargs
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable
+
+__all__ = [
+    "chunked",
+    "map_chunks",
+]
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def chunked(items: Iterable[T], size: int) -> Generator[list[T], None, None]:
+    """
+    Split the given items into lists of the given size. The last list may be shorter.
+
+    :param items: Items to split. Consumed lazily, so only one chunk is in memory at a time.
+    :param size: Number of items in each list.
+    """
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def map_chunks(
+    func: Callable[[T], R],
+    chunks: Iterable[T],
+    *,
+    workers: int,
+    max_pending: int | None = None,
+) -> Generator[R, None, None]:
+    """
+    Apply the given function to the given chunks on a pool of worker processes.
+
+    Results are yielded in the same order as the chunks. Chunks are read lazily, and at most
+    'max_pending' chunks are sent to the workers before their results are yielded, so that
+    memory use stays bounded regardless of the number of chunks.
+
+    Workers are started fresh (not forked), and set up Django before running the function,
+    so they don't share database connections with the calling process.
+
+    :param func: Function to apply. Must be importable by the workers, e.g. a module level function.
+    :param chunks: Chunks to apply the function to. Must be picklable.
+    :param workers: Number of worker processes. With one worker or less, the chunks are processed in this process.
+    :param max_pending: Maximum number of chunks being processed at once. Defaults to twice the number of workers.
+    """
+    if workers <= 1:
+        yield from map(func, chunks)
+        return
+
+    max_pending = max_pending or workers * 2
+    pending: deque[Any] = deque()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=setup_worker,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE),),
+    ) as executor:
+        for chunk in chunks:
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def setup_worker(settings_module: str) -> None:
+    import django  # noqa: PLC0415
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import copy
+import re
+from collections import ChainMap
+from typing import TYPE_CHECKING, Any
+
+from .fields import DynamicArrayField, NestedFormField, clean_value
+from .model_fields import unwrap
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from django import forms
+    from django.core.exceptions import ValidationError
+
+__all__ = [
+    "SubformsDocument",
+    "apply_json_patch",
+    "apply_merge_patch",
+]
+
+
+_ARRAY_INDEX = re.compile(r"0|[1-9][0-9]*")
+
+# Marker for keys that don't exist in the patched value.
+_MISSING = object()
+
+
+class SubformsDocument:
+    """
+    Value of a subforms field that can be patched, re-validating only the parts that change.
+
+    The results of the nested forms in the value are kept between patches. Patches copy the
+    nested values they change, and the nested values around them, up to the top of the value,
+    instead of changing them in place. Only these copies are cleaned again, so their subform
+    'clean()' methods see the changes, while the results of all other nested forms are reused.
+    This way the cost of a patch depends on the size of the change, not on the size of the value.
+
+    >>> document = SubformsDocument(field=Thing._meta.get_field("nested").formfield(), value=thing.nested)
+    >>> thing.nested = document.patch([{"op": "replace", "path": "/bar/0/fizz", "value": "x"}])
+    """
+
+    def __init__(self, field: DynamicArrayField | NestedFormField, value: Any) -> None:
+        """
+        Create a new document.
+
+        :param field: The field to clean the value with.
+        :param value: The value, e.g. from the database. Not changed by patches.
+        """
+        self.field = field
+        self.value = unwrap(value)
+        self.cleaned_data: Any = None
+
+        # Results of the nested forms in the current value, by the 'id()' of their value and their form class.
+        self._memo: dict[tuple[int, type[forms.Form]], tuple[Any, ValidationError | None]] = {}
+
+    def clean(self) -> Any:
+        """
+        Clean the whole value. Results of the nested forms that have already been cleaned are reused.
+
+        :returns: The cleaned value.
+        :raises ValidationError: The value is invalid.
+        """
+        self.cleaned_data = clean_value(self.field, self.value, memo=self._memo)
+        return self.cleaned_data
+
+    def patch(self, operations: Iterable[dict[str, Any]]) -> Any:
+        """
+        Apply a JSON Patch (RFC 6902) to the value, and clean the changed parts.
+
+        :param operations: The patch operations, e.g. '[{"op": "remove", "path": "/bar/1"}]'.
+        :returns: The cleaned value. The patched value is available in 'value'.
+        :raises ValueError: The patch is malformed, refers to paths that don't exist, or a 'test' operation fails.
+                            The document is left unchanged.
+        :raises ValidationError: The patched value is invalid. The document is left unchanged.
+        """
+        patcher = _Patcher(self.field, self.value)
+        for operation in operations:
+            patcher.apply_operation(operation)
+        return self._commit(patcher)
+
+    def merge_patch(self, patch: Any) -> Any:
+        """
+        Apply a JSON Merge Patch (RFC 7386) to the value, and clean the changed parts.
+
+        :param patch: The merge patch, e.g. '{"bar": {"fizz": "x", "buzz": None}}'.
+        :returns: The cleaned value. The patched value is available in 'value'.
+        :raises ValidationError: The patched value is invalid. The document is left unchanged.
+        """
+        patcher = _Patcher(self.field, self.value)
+        patcher.apply_merge_patch(patch)
+        return self._commit(patcher)
+
+    def _commit(self, patcher: _Patcher) -> Any:
+        # Collect the new results separately, so that they can be dropped if the patched value is invalid.
+        new_results: dict[tuple[int, type[forms.Form]], tuple[Any, ValidationError | None]] = {}
+        cleaned_data = clean_value(self.field, patcher.value, memo=ChainMap(new_results, self._memo))
+
+        # Results are by 'id()', so they must be removed before the replaced values can be freed
+        # and their ids reused by new values.
+        for field, value in patcher.replaced:
+            if isinstance(field, NestedFormField) and isinstance(value, dict):
+                self._memo.pop((id(value), field.subform), None)
+        for field, value in patcher.removed:
+            _forget_results(self._memo, field, value)
+
+        self._memo.update(new_results)
+        self.value = patcher.value
+        self.cleaned_data = cleaned_data
+        return cleaned_data
+
+
+def apply_json_patch(value: Any, operations: Iterable[dict[str, Any]]) -> Any:
+    """
+    Apply a JSON Patch (RFC 6902) to the given value without validating it.
+
+    :param value: The value to patch. Not changed; the parts that don't change are shared with the result.
+    :param operations: The patch operations, e.g. '[{"op": "remove", "path": "/bar/1"}]'.
+    :returns: The patched value.
+    :raises ValueError: The patch is malformed, refers to paths that don't exist, or a 'test' operation fails.
+    """
+    patcher = _Patcher(None, unwrap(value))
+    for operation in operations:
+        patcher.apply_operation(operation)
+    return patcher.value
+
+
+def apply_merge_patch(value: Any, patch: Any) -> Any:
+    """
+    Apply a JSON Merge Patch (RFC 7386) to the given value without validating it.
+
+    :param value: The value to patch. Not changed; the parts that don't change are shared with the result.
+    :param patch: The merge patch, e.g. '{"bar": {"fizz": "x", "buzz": None}}'.
+    :returns: The patched value.
+    """
+    patcher = _Patcher(None, unwrap(value))
+    patcher.apply_merge_patch(patch)
+    return patcher.value
+
+
+class _Patcher:
+    """Applies patches to a value by copying the containers on the patched paths."""
+
+    def __init__(self, field: forms.Field | None, value: Any) -> None:
+        self.field = field
+        self.value = value
+        # Containers copied by this patcher, which can be changed in place.
+        self.copied: set[int] = set()
+        # Containers that have been replaced by their copies, with their fields.
+        self.replaced: list[tuple[forms.Field | None, Any]] = []
+        # Values removed or overwritten by the patch, with their fields.
+        self.removed: list[tuple[forms.Field | None, Any]] = []
+
+    def apply_operation(self, operation: dict[str, Any]) -> None:
+        op = operation.get("op")
+        path = _parse_pointer(operation.get("path"))
+
+        if op in {"add", "replace", "test"} and "value" not in operation:
+            msg = f"Patch operation '{op}' requires a 'value'."
+            raise ValueError(msg)
+
+        match op:
+            case "add":
+                self.add(path, copy.deepcopy(operation["value"]))
+            case "remove":
+                self.remove(path)
+            case "replace":
+                self.get(path)
+                self.add(path, copy.deepcopy(operation["value"]), replace=True)
+            case "move":
+                from_path = _parse_pointer(operation.get("from"))
+                if from_path == path:
+                    return
+                if path[: len(from_path)] == from_path:
+                    msg = f"Cannot move '{_format_pointer(from_path)}' inside itself."
+                    raise ValueError(msg)
+                # Moved values are copied, so that they are cleaned again in their new place.
+                value = copy.deepcopy(self.get(from_path))
+                self.remove(from_path)
+                self.add(path, value)
+            case "copy":
+                self.add(path, copy.deepcopy(self.get(_parse_pointer(operation.get("from")))))
+            case "test":
+                if self.get(path) != operation["value"]:
+                    msg = f"Test failed for '{_format_pointer(path)}'."
+                    raise ValueError(msg)
+            case _:
+                msg = f"Unknown patch operation: {op!r}."
+                raise ValueError(msg)
+
+    def apply_merge_patch(self, patch: Any) -> None:
+        self.value = self.merge(self.value, patch, self.field)
+
+    def merge(self, target: Any, patch: Any, field: forms.Field | None) -> Any:
+        if not isinstance(patch, dict):
+            if target is not _MISSING:
+                self.removed.append((field, target))
+            return copy.deepcopy(patch)
+
+        if isinstance(target, dict):
+            result = self.writable(target, field)
+        else:
+            if target is not _MISSING:
+                self.removed.append((field, target))
+            result = {}
+
+        for key, value in patch.items():
+            subfield = _subfield(field, key)
+            if value is None:
+                if key in result:
+                    self.removed.append((subfield, result.pop(key)))
+            else:
+                result[key] = self.merge(result.get(key, _MISSING), value, subfield)
+
+        return result
+
+    def get(self, path: list[str]) -> Any:
+        value = self.value
+        for token in path:
+            value = value[_key(value, token, path)]
+        return value
+
+    def add(self, path: list[str], value: Any, *, replace: bool = False) -> None:
+        if not path:
+            self.removed.append((self.field, self.value))
+            self.value = value
+            return
+
+        container, field = self.writable_parent(path)
+        key = _key(container, path[-1], path, insert=not replace)
+        if isinstance(container, list) and not replace:
+            container.insert(key, value)
+            return
+
+        if replace or key in container:
+            self.removed.append((_subfield(field, key), container[key]))
+        container[key] = value
+
+    def remove(self, path: list[str]) -> None:
+        if not path:
+            msg = "Cannot remove the whole value."
+            raise ValueError(msg)
+
+        container, field = self.writable_parent(path)
+        key = _key(container, path[-1], path)
+        self.removed.append((_subfield(field, key), container.pop(key)))
+
+    def writable_parent(self, path: list[str]) -> tuple[dict[str, Any] | list[Any], forms.Field | None]:
+        """Copy the containers on the given path, up to the parent of the last key, and return the parent."""
+        self.value = container = self.writable(self.value, self.field)
+        field = self.field
+
+        for token in path[:-1]:
+            key = _key(container, token, path)
+            subfield = _subfield(field, key)
+            container[key] = container = self.writable(container[key], subfield)
+            field = subfield
+
+        return container, field
+
+    def writable(self, value: Any, field: forms.Field | None) -> Any:
+        if id(value) in self.copied:
+            return value
+        if not isinstance(value, (dict, list)):
+            msg = f"Cannot patch inside a value of type '{type(value).__name__}'."
+            raise ValueError(msg)  # noqa: TRY004
+
+        result = value.copy()
+        self.copied.add(id(result))
+        self.replaced.append((field, value))
+        return result
+
+
+def _forget_results(memo: dict[tuple[int, type[forms.Form]], Any], field: forms.Field | None, value: Any) -> None:
+    """Remove the results of the nested forms in the given value from the memo."""
+    stack: list[tuple[forms.Field | None, Any]] = [(field, value)]
+    while stack:
+        current, current_value = stack.pop()
+        if isinstance(current, NestedFormField) and isinstance(current_value, dict):
+            memo.pop((id(current_value), current.subform), None)
+            stack.extend((_subfield(current, key), item) for key, item in current_value.items())
+        elif isinstance(current, DynamicArrayField) and isinstance(current_value, list):
+            stack.extend((current.subfield, item) for item in current_value)
+
+
+def _subfield(field: forms.Field | None, key: str | int) -> forms.Field | None:
+    """Get the field for the value at the given key of a value of the given field, if it's a known field."""
+    if isinstance(field, NestedFormField):
+        return field.subform.base_fields.get(key)
+    if isinstance(field, DynamicArrayField):
+        return field.subfield
+    return None
+
+
+def _key(container: Any, segment: str, path: list[str], *, insert: bool = False) -> Any:
+    """
+    Get the key for the given JSON Pointer reference token in the given container.
+
+    :param container: The dict or list the token refers into.
+    :param segment: The JSON Pointer reference token.
+    :param path: The whole path, for error messages.
+    :param insert: The key is for inserting a value. For lists, allows the index after the last item,
+                   or '-' for appending. For dicts, allows keys that don't exist.
+    """
+    if isinstance(container, dict):
+        if insert or segment in container:
+            return segment
+
+    elif isinstance(container, list):
+        if insert and segment == "-":
+            return len(container)
+        if _ARRAY_INDEX.fullmatch(segment):
+            index = int(segment)
+            if index < len(container) + insert:
+                return index
+
+    msg = f"Path '{_format_pointer(path)}' does not exist."
+    raise ValueError(msg)
+
+
+def _parse_pointer(pointer: Any) -> list[str]:
+    """Parse a JSON Pointer (RFC 6901) to its tokens, e.g. '/bar/0/fizz' to ['bar', '0', 'fizz']."""
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        msg = f"Invalid JSON Pointer: {pointer!r}."
+        raise ValueError(msg)
+    if not pointer:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _format_pointer(path: list[str]) -> str:
+    return "".join("/" + token.replace("~", "~0").replace("/", "~1") for token in path)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import Any
+
+from django.conf import settings
+
+__all__ = [
+    "subforms_settings",
+]
+
+
+SETTING_NAME = "SUBFORMS"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class DefaultSettings:
+    WARMUP: bool = False
+    """Precompile subforms fields of all imported forms when the app is ready."""
+
+    MAX_DEPTH: int = 32
+    """Maximum number of nested form levels, unless set separately for a 'NestedFormField'."""
+
+    CLEAN_CACHE_SIZE: int = 1024
+    """Maximum number of cleaned results kept in the in-memory cache for fields using 'cache_results'."""
+
+    CLEAN_CACHE_ALIAS: str | None = None
+    """Alias of a Django cache to store cleaned results in instead of the in-memory cache."""
+
+    RENDER_CACHE_SIZE: int = 256
+    """Maximum number of rendered values kept in the in-memory cache for widgets using 'cache_render'."""
+
+    RENDER_CACHE_ALIAS: str | None = None
+    """Alias of a Django cache to store rendered values in instead of the in-memory cache."""
+
+    JSON_CODEC: str = "auto"
+    """JSON library to use: 'orjson', 'msgspec', 'json', or 'auto' for the fastest one installed."""
+
+    CLIENT_VALIDATION: bool = False
+    """Describe the constraints of subforms fields to 'subforms.js', so that it can validate them in the browser."""
+
+    PACK_DATA: bool = False
+    """Send the data of each subforms field from the browser as a single JSON value, unless set for a widget."""
+
+
+_DEFAULTS = DefaultSettings()
+_SETTING_NAMES = frozenset(field.name for field in dataclasses.fields(DefaultSettings))
+
+
+class SubformsSettings:
+    """
+    Settings for subforms, read from the 'SUBFORMS' dictionary in the Django settings.
+
+    Values are looked up on every access, so that changes made with e.g. 'override_settings'
+    are picked up without having to reload anything.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in _SETTING_NAMES:
+            msg = f"Invalid subforms setting: '{name}'."
+            raise AttributeError(msg)
+
+        user_settings: dict[str, Any] = getattr(settings, SETTING_NAME, {})
+        return user_settings.get(name, getattr(_DEFAULTS, name))
+
+
+subforms_settings = SubformsSettings()
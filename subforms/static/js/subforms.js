@@ -1,38 +1,635 @@
-function addItem(element) {
-    console.log(element);
+// Array controls are handled with a single delegated listener for the whole document,
+// instead of a handler on each item, so that pages with large arrays stay fast to load.
+// The "add" links refer to their array by its id in "data-subforms-add", and the "remove"
+// links remove the closest array item, so this works for arrays nested in other arrays,
+// and for arrays added to the page later.
 
-    const common_id_part = element.getAttribute("id");
-    const common_name_part = common_id_part.replace(/^id_/, "");
+const SUBFORMS_RENAMED_ATTRIBUTES = ["id", "name", "for", "data-subforms-add", "data-subforms-packed"];
 
-    const items = parseInt(element.getAttribute("data-next"));
-    element.removeAttribute("data-next")
+function escapeRegExp(string) {
+    return string.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
+}
 
-    const initialElement = element.querySelector(":scope > ul > li");
-    const newElement = initialElement.cloneNode(true);
-    const subElements = newElement.querySelectorAll("input");
+function addItem(element) {
+    const items = parseInt(element.getAttribute("data-next"));
+    element.setAttribute("data-next", String(items + 1));
 
-    subElements.forEach(element => {
-        let element_id = element.getAttribute("id");
-        element_id = element_id.replace(common_id_part + "__", "")
-        element_id = element_id.replace(/\d+/, String(items))
-        element_id = common_id_part + "__" + element_id
-        element.setAttribute("id", element_id);
+    const state = virtualArrays.get(element);
+    if (state !== undefined) {
+        addVirtualItem(element, state, items);
+        return;
+    }
 
-        let element_name = element.getAttribute("name");
-        element_name = element_name.replace(common_name_part + "__", "")
-        element_name = element_name.replace(/\d+/, String(items))
-        element_name = common_name_part + "__" + element_name
-        element.setAttribute("name", element_name);
+    const list = element.querySelector(":scope > ul");
+    const newElement = list.querySelector(":scope > li.dynamic-array-item").cloneNode(true);
 
-        element.removeAttribute("value");
+    // Arrays inside the new item start with a single item. Arrays rendered without items,
+    // e.g. of recursive forms below their data, stay empty.
+    newElement.querySelectorAll(".dynamic-array").forEach(nestedArray => {
+        const nestedList = nestedArray.querySelector(":scope > ul");
+        const nestedState = virtualArrays.get(document.getElementById(nestedArray.getAttribute("id")));
+        const firstItem = nestedState !== undefined
+            ? nestedState.template.cloneNode(true)
+            : nestedList.querySelector(":scope > li.dynamic-array-item");
+        if (firstItem === null) {
+            return;
+        }
+        nestedList.replaceChildren(firstItem);
+        nestedArray.setAttribute("data-next", "1");
     })
 
-    initialElement.parentElement.appendChild(newElement);
-    element.setAttribute("data-next", String(items + 1))
+    renameItem(element, newElement, items);
+    newElement.querySelectorAll("input, select, textarea").forEach(clearValue);
+
+    list.appendChild(newElement);
+    newElement.querySelectorAll("[data-subforms-virtual]").forEach(initVirtualArray);
+}
+
+function renameItem(element, item, index) {
+    const commonIdPart = element.getAttribute("id");
+    const commonNamePart = commonIdPart.replace(/^id_/, "");
+
+    // Only the index of this array is changed, indices of arrays inside the item are kept.
+    const patterns = [
+        new RegExp("^(" + escapeRegExp(commonIdPart + "__") + ")\\d+"),
+        new RegExp("^(" + escapeRegExp(commonNamePart + "__") + ")\\d+"),
+    ];
+
+    item.querySelectorAll("*").forEach(subElement => {
+        SUBFORMS_RENAMED_ATTRIBUTES.forEach(attribute => {
+            const value = subElement.getAttribute(attribute);
+            if (value === null) {
+                return;
+            }
+            const renamed = patterns.reduce((result, pattern) => result.replace(pattern, "$1" + index), value);
+            subElement.setAttribute(attribute, renamed);
+        })
+    })
 }
 
 function removeItem(element) {
-    if (element.parentElement.childElementCount > 1) {
+    const array = element.closest(".dynamic-array");
+    const state = virtualArrays.get(array);
+    if (state !== undefined) {
+        removeVirtualItem(array, state, element);
+        return;
+    }
+
+    if (element.parentElement.querySelectorAll(":scope > li.dynamic-array-item").length > 1) {
         element.remove();
     }
 }
+
+function clearValue(element) {
+    if (element.type === "checkbox" || element.type === "radio") {
+        element.removeAttribute("checked");
+        element.checked = false;
+    } else if (element.tagName === "SELECT") {
+        element.querySelectorAll("option[selected]").forEach(option => option.removeAttribute("selected"));
+        element.selectedIndex = element.multiple ? -1 : 0;
+    } else if (element.tagName === "TEXTAREA") {
+        element.textContent = "";
+        element.value = "";
+    } else {
+        element.removeAttribute("value");
+        element.value = "";
+    }
+}
+
+document.addEventListener("click", event => {
+    if (!(event.target instanceof Element)) {
+        return;
+    }
+
+    const addLink = event.target.closest("[data-subforms-add]");
+    if (addLink !== null) {
+        event.preventDefault();
+        addItem(document.getElementById(addLink.getAttribute("data-subforms-add")));
+        return;
+    }
+
+    const removeLink = event.target.closest("[data-subforms-remove]");
+    if (removeLink !== null) {
+        event.preventDefault();
+        removeItem(removeLink.closest(".dynamic-array-item"));
+    }
+});
+
+// Arrays marked with "data-subforms-virtual" only keep the items that are scrolled into view
+// as elements in the page. The values of the other items are kept as plain data, and are
+// added to the form data when the form is submitted. Items are built from a copy of the first
+// item when they are scrolled into view, so arrays with arrays or file inputs inside their items
+// are not virtualised, since their items can't be rebuilt from the values alone.
+
+const SUBFORMS_VIRTUAL_OVERSCAN = 10;
+const SUBFORMS_VIRTUAL_DEFAULT_HEIGHT = 30;
+
+const virtualArrays = new WeakMap();
+
+function initVirtualArray(element) {
+    if (virtualArrays.has(element)) {
+        return;
+    }
+
+    const list = element.querySelector(":scope > ul");
+    const items = Array.from(list.querySelectorAll(":scope > li.dynamic-array-item"));
+    if (items.length === 0 || items.some(item => item.querySelector(".dynamic-array, input[type=file]") !== null)) {
+        return;
+    }
+
+    // Read all heights before changing anything, so that the page is laid out only once.
+    const heights = items.map(item => item.offsetHeight);
+    const template = items[0].cloneNode(true);
+    template.querySelectorAll("input, select, textarea").forEach(clearValue);
+
+    const state = {
+        list: list,
+        template: template,
+        rows: items.map((item, position) => ({
+            index: itemIndex(element, item, position),
+            height: heights[position] || SUBFORMS_VIRTUAL_DEFAULT_HEIGHT,
+            values: readValues(item),
+            element: null,
+        })),
+        top: document.createElement("li"),
+        bottom: document.createElement("li"),
+        scheduled: false,
+    };
+    state.top.className = "dynamic-array-spacer";
+    state.bottom.className = "dynamic-array-spacer";
+
+    items.forEach(item => item.remove());
+    list.prepend(state.top);
+    list.append(state.bottom);
+    list.addEventListener("scroll", () => scheduleRender(state), {passive: true});
+
+    virtualArrays.set(element, state);
+    renderVirtualArray(state);
+}
+
+function itemIndex(element, item, position) {
+    const prefix = element.getAttribute("id").replace(/^id_/, "") + "__";
+    const named = item.querySelector("[name^='" + CSS.escape(prefix) + "']");
+    const match = named === null ? null : named.getAttribute("name").slice(prefix.length).match(/^\d+/);
+    return match === null ? position : parseInt(match[0]);
+}
+
+function readValues(item) {
+    const values = [];
+    item.querySelectorAll("input, select, textarea").forEach(element => {
+        if (!element.name || element.disabled || ["button", "submit", "reset", "image"].includes(element.type)) {
+            return;
+        }
+        if (element.type === "checkbox" || element.type === "radio") {
+            if (element.checked) {
+                values.push([element.name, element.value]);
+            }
+        } else if (element.tagName === "SELECT") {
+            Array.from(element.selectedOptions).forEach(option => values.push([element.name, option.value]));
+        } else {
+            values.push([element.name, element.value]);
+        }
+    })
+    return values;
+}
+
+function writeValues(item, values) {
+    const valuesByName = new Map();
+    values.forEach(([name, value]) => valuesByName.set(name, [...(valuesByName.get(name) || []), value]));
+
+    item.querySelectorAll("input, select, textarea").forEach(element => {
+        const elementValues = valuesByName.get(element.name) || [];
+        if (element.type === "checkbox" || element.type === "radio") {
+            element.checked = elementValues.includes(element.value);
+        } else if (element.tagName === "SELECT") {
+            Array.from(element.options).forEach(option => option.selected = elementValues.includes(option.value));
+        } else if (!["button", "submit", "reset", "image"].includes(element.type)) {
+            element.value = elementValues.length > 0 ? elementValues[0] : "";
+        }
+    })
+}
+
+function scheduleRender(state) {
+    if (!state.scheduled) {
+        state.scheduled = true;
+        requestAnimationFrame(() => {
+            state.scheduled = false;
+            renderVirtualArray(state);
+        });
+    }
+}
+
+function renderVirtualArray(state) {
+    const rows = state.rows;
+    const scrollTop = state.list.scrollTop;
+    const viewportHeight = state.list.clientHeight || window.innerHeight;
+
+    let start = 0;
+    let offset = 0;
+    while (start < rows.length && offset + rows[start].height <= scrollTop) {
+        offset += rows[start].height;
+        start++;
+    }
+    let end = start;
+    while (end < rows.length && offset < scrollTop + viewportHeight) {
+        offset += rows[end].height;
+        end++;
+    }
+    start = Math.max(0, start - SUBFORMS_VIRTUAL_OVERSCAN);
+    end = Math.min(rows.length, end + SUBFORMS_VIRTUAL_OVERSCAN);
+
+    rows.forEach((row, position) => {
+        if (row.element !== null && (position < start || position >= end)) {
+            releaseRow(row);
+        }
+    });
+
+    let previous = state.top;
+    for (let position = start; position < end; position++) {
+        const row = rows[position];
+        if (row.element === null) {
+            row.element = state.template.cloneNode(true);
+            renameItem(state.list.parentElement, row.element, row.index);
+            writeValues(row.element, row.values);
+        }
+        if (previous.nextElementSibling !== row.element) {
+            previous.after(row.element);
+        }
+        previous = row.element;
+    }
+
+    const heightOf = part => part.reduce((total, row) => total + row.height, 0);
+    state.top.style.height = heightOf(rows.slice(0, start)) + "px";
+    state.bottom.style.height = heightOf(rows.slice(end)) + "px";
+}
+
+function releaseRow(row) {
+    row.values = readValues(row.element);
+    row.height = row.element.offsetHeight || row.height;
+    row.element.remove();
+    row.element = null;
+}
+
+function addVirtualItem(element, state, index) {
+    const height = state.rows.length > 0 ? state.rows[state.rows.length - 1].height : SUBFORMS_VIRTUAL_DEFAULT_HEIGHT;
+    state.rows.push({index: index, height: height, values: [], element: null});
+    state.list.scrollTop = state.list.scrollHeight;
+    renderVirtualArray(state);
+}
+
+function removeVirtualItem(element, state, item) {
+    if (state.rows.length > 1) {
+        state.rows = state.rows.filter(row => row.element !== item);
+        item.remove();
+        renderVirtualArray(state);
+    }
+}
+
+function addVirtualFormData(formData, element, state) {
+    const prefix = element.getAttribute("id").replace(/^id_/, "") + "__";
+    state.rows.forEach(row => row.element !== null && (row.values = readValues(row.element)));
+
+    // Replace the data of the items in view, so that the data of all items is in order.
+    new Set(Array.from(formData.keys()).filter(key => key.startsWith(prefix))).forEach(key => formData.delete(key));
+    state.rows.forEach(row => row.values.forEach(([name, value]) => formData.append(name, value)));
+}
+
+function initVirtualArrays() {
+    document.querySelectorAll("[data-subforms-virtual]").forEach(initVirtualArray);
+}
+
+if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", initVirtualArrays);
+} else {
+    initVirtualArrays();
+}
+
+// Subforms fields marked with "data-subforms-packed" are sent as a single JSON value,
+// instead of one form data key for each input, e.g. "nested:packed={"bar": {"0": {"fizz": "x"}}}"
+// instead of "nested__bar__0__fizz=x". The JSON nests the values by the parts of their keys.
+// Without JavaScript, or in browsers without the "formdata" event, the data is sent as usual.
+
+function packFormData(formData, name) {
+    const prefix = name + "__";
+    const packed = {};
+    const packedKeys = new Set();
+
+    for (const [key, value] of formData.entries()) {
+        // Files are sent as usual.
+        if (!key.startsWith(prefix) || typeof value !== "string") {
+            continue;
+        }
+        packedKeys.add(key);
+
+        const parts = key.slice(prefix.length).split("__");
+        const lastPart = parts.pop();
+        let container = packed;
+        for (const part of parts) {
+            if (typeof container[part] !== "object" || Array.isArray(container[part])) {
+                container[part] = {};
+            }
+            container = container[part];
+        }
+
+        // Keys with several values, e.g. from multiple selects, get a list of the values.
+        container[lastPart] = lastPart in container ? [].concat(container[lastPart], value) : value;
+    }
+
+    packedKeys.forEach(key => formData.delete(key));
+    formData.append(name + ":packed", JSON.stringify(packed));
+}
+
+document.addEventListener("formdata", event => {
+    // Values of virtualised items are added first, so that they are packed with the rest.
+    event.target.querySelectorAll("[data-subforms-virtual]").forEach(element => {
+        const state = virtualArrays.get(element);
+        if (state !== undefined) {
+            addVirtualFormData(event.formData, element, state);
+        }
+    });
+
+    event.target.querySelectorAll("[data-subforms-packed]").forEach(element => {
+        // Subforms fields inside other subforms fields are packed with them.
+        if (element.parentElement.closest("[data-subforms-packed]") === null) {
+            packFormData(event.formData, element.getAttribute("data-subforms-packed"));
+        }
+    });
+}, true);
+
+// Subforms fields marked with "data-subforms-constraints" are validated in the browser before
+// the form is submitted, so that simple mistakes are shown without a round trip to the server.
+// The constraints are described by the widget of the field: "root" describes the field itself,
+// and nested forms refer to the descriptions of their fields in "forms" by index. The server
+// still validates everything, so values that can't be checked here, e.g. the values of virtualised
+// items out of view, are left for it.
+
+const SUBFORMS_IGNORED_TYPES = ["button", "submit", "reset", "image", "hidden", "file"];
+
+const subformsConstraints = new WeakMap();
+
+function getConstraints(element) {
+    if (!subformsConstraints.has(element)) {
+        subformsConstraints.set(element, JSON.parse(element.getAttribute("data-subforms-constraints")));
+    }
+    return subformsConstraints.get(element);
+}
+
+function findConstraint(constraints, name, key) {
+    // Returns the description for the key, and the prefixes of the optional nested forms it's in.
+    let node = constraints.root;
+    const optional = [];
+    let prefix = name;
+    const parts = key === name ? [] : key.slice(name.length + 2).split("__");
+
+    for (const part of parts) {
+        if (node.optional) {
+            optional.push(prefix);
+        }
+        if ("array" in node && /^\d+$/.test(part)) {
+            node = node.array;
+        } else if ("form" in node && part in constraints.forms[node.form]) {
+            node = constraints.forms[node.form][part];
+        } else {
+            return null;
+        }
+        prefix += "__" + part;
+    }
+    return {node: node, optional: optional};
+}
+
+function formatMessage(message, params) {
+    return message.replace(/%\((\w+)\)s/g, (match, param) => param in params ? String(params[param]) : match);
+}
+
+function inputValues(inputs) {
+    const values = [];
+    inputs.forEach(input => {
+        if (input.type === "checkbox" || input.type === "radio") {
+            if (input.checked) {
+                values.push(input.value);
+            }
+        } else if (input.tagName === "SELECT") {
+            Array.from(input.selectedOptions).forEach(option => values.push(option.value));
+        } else {
+            values.push(input.value);
+        }
+    });
+    return values;
+}
+
+function isEmptyForm(container, prefix) {
+    const inputs = container.querySelectorAll("[name^='" + CSS.escape(prefix + "__") + "']");
+    return Array.from(inputs).every(input => {
+        if (SUBFORMS_IGNORED_TYPES.includes(input.type) || input.type === "checkbox" || input.type === "radio") {
+            return true;
+        }
+        return inputValues([input]).every(value => value.trim() === "");
+    });
+}
+
+function validateValues(node, values) {
+    const cleaned = values.map(value => node.strip ? value.trim() : value).filter(value => value !== "");
+    if (cleaned.length === 0) {
+        return node.required || null;
+    }
+
+    for (const value of cleaned) {
+        // Like Django's IntegerField, accept decimals that only have zeros after the point, e.g. "1.0".
+        if (node.integer !== undefined && !/^[+-]?\d+(\.0*)?$/.test(value.trim())) {
+            return node.integer;
+        }
+        if (node.number !== undefined && (value.trim() === "" || !isFinite(Number(value)))) {
+            return node.number;
+        }
+        if (node.choices !== undefined && !node.choices[0].includes(value)) {
+            return formatMessage(node.choices[1], {value: value});
+        }
+
+        const length = [...value].length;
+        const number = Number(value);
+        if (node.min_length !== undefined && length < node.min_length[0]) {
+            return formatMessage(node.min_length[1], {show_value: length});
+        }
+        if (node.max_length !== undefined && length > node.max_length[0]) {
+            return formatMessage(node.max_length[1], {show_value: length});
+        }
+        if (node.min_value !== undefined && number < node.min_value[0]) {
+            return node.min_value[1];
+        }
+        if (node.max_value !== undefined && number > node.max_value[0]) {
+            return node.max_value[1];
+        }
+    }
+    return null;
+}
+
+function validateArray(constraints, name, array) {
+    const found = findConstraint(constraints, name, array.getAttribute("id").replace(/^id_/, ""));
+    if (found === null || !("array" in found.node)) {
+        return null;
+    }
+
+    const state = virtualArrays.get(array);
+    const items = state !== undefined
+        ? state.rows.length
+        : array.querySelectorAll(":scope > ul > li.dynamic-array-item").length;
+
+    if (found.node.max_length !== undefined && items > found.node.max_length[0]) {
+        return formatMessage(found.node.max_length[1], {items: items});
+    }
+    // Arrays always have at least one item in the page, so only arrays of simple values can be empty.
+    if (found.node.required !== undefined && !("form" in found.node.array) && !("array" in found.node.array)) {
+        if (arrayValues(array, state).every(value => value.trim() === "")) {
+            return found.node.required;
+        }
+    }
+    return null;
+}
+
+function arrayValues(array, state) {
+    const itemValues = item => inputValues(Array.from(item.querySelectorAll("input, select, textarea")));
+    if (state === undefined) {
+        return Array.from(array.querySelectorAll(":scope > ul > li.dynamic-array-item")).flatMap(itemValues);
+    }
+    return state.rows.flatMap(row => {
+        return row.element !== null ? itemValues(row.element) : row.values.map(([, value]) => value);
+    });
+}
+
+function showError(element, message) {
+    const errorList = document.createElement("ul");
+    errorList.className = "errorlist subforms-errorlist";
+    const error = document.createElement("li");
+    error.textContent = message;
+    errorList.appendChild(error);
+    element.after(errorList);
+}
+
+function validateSubformsField(element) {
+    const constraints = getConstraints(element);
+    const name = element.getAttribute("data-subforms-name");
+    let firstInvalid = null;
+
+    const inputsByName = new Map();
+    element.querySelectorAll("input, select, textarea").forEach(input => {
+        if (input.name && !input.disabled && !SUBFORMS_IGNORED_TYPES.includes(input.type)) {
+            inputsByName.set(input.name, [...(inputsByName.get(input.name) || []), input]);
+        }
+    });
+
+    inputsByName.forEach((inputs, key) => {
+        const found = findConstraint(constraints, name, key);
+        if (found === null) {
+            return;
+        }
+        let node = found.node;
+        if (node.required !== undefined && found.optional.some(prefix => isEmptyForm(element, prefix))) {
+            node = {...node, required: undefined};
+        }
+        const message = validateValues(node, inputValues(inputs));
+        if (message !== null) {
+            showError(inputs[inputs.length - 1], message);
+            firstInvalid = firstInvalid || inputs[0];
+        }
+    });
+
+    const arrays = Array.from(element.querySelectorAll(".dynamic-array"));
+    if (element.classList.contains("dynamic-array")) {
+        arrays.unshift(element);
+    }
+    arrays.forEach(array => {
+        const message = validateArray(constraints, name, array);
+        if (message !== null) {
+            showError(array.querySelector(":scope > ul"), message);
+            firstInvalid = firstInvalid || array.querySelector("input, select, textarea");
+        }
+    });
+
+    return firstInvalid;
+}
+
+document.addEventListener("submit", event => {
+    // Forms with "novalidate", like the admin forms, are still validated, since that only applies
+    // to the validation built into the browser, but buttons with "formnovalidate" skip validation.
+    if (event.submitter?.formNoValidate) {
+        return;
+    }
+    event.target.querySelectorAll(".subforms-errorlist").forEach(errorList => errorList.remove());
+
+    let firstInvalid = null;
+    event.target.querySelectorAll("[data-subforms-constraints]").forEach(element => {
+        const invalid = validateSubformsField(element);
+        firstInvalid = firstInvalid || invalid;
+    });
+
+    if (firstInvalid !== null) {
+        event.preventDefault();
+        event.stopImmediatePropagation();
+        firstInvalid.focus();
+    }
+}, true);
+
+document.addEventListener("input", event => {
+    const errorList = event.target.nextElementSibling;
+    if (errorList !== null && errorList.classList.contains("subforms-errorlist")) {
+        errorList.remove();
+    }
+});
+
+// Subforms fields with "data-subforms-validate-url" validate each array item on the server when
+// the focus leaves the item, so that errors are shown while editing, without submitting the whole
+// form. Only the data of the item is sent, with its name in "subforms:path", e.g. "array__3".
+
+const subformsValidations = new WeakMap();
+
+function itemPath(item) {
+    const array = item.closest(".dynamic-array");
+    const position = Array.from(item.parentElement.querySelectorAll(":scope > li.dynamic-array-item")).indexOf(item);
+    return array.getAttribute("id").replace(/^id_/, "") + "__" + itemIndex(array, item, position);
+}
+
+function validateItem(element, item) {
+    const form = item.closest("form");
+    const path = itemPath(item);
+    const formData = new FormData();
+    readValues(item).forEach(([name, value]) => formData.append(name, value));
+    formData.append("subforms:path", path);
+
+    const csrfToken = form?.querySelector("input[name=csrfmiddlewaretoken]");
+    if (csrfToken) {
+        formData.append("csrfmiddlewaretoken", csrfToken.value);
+    }
+
+    // Only the response to the latest request for each item is shown.
+    const request = {};
+    subformsValidations.set(item, request);
+
+    const url = element.getAttribute("data-subforms-validate-url");
+    fetch(url, {method: "POST", body: formData, credentials: "same-origin"})
+        .then(response => response.ok ? response.json() : null)
+        .then(result => {
+            if (result === null || subformsValidations.get(item) !== request || !item.isConnected) {
+                return;
+            }
+            item.querySelectorAll(".subforms-errorlist").forEach(errorList => errorList.remove());
+            Object.entries(result.errors).forEach(([name, messages]) => {
+                // Errors of the whole item, or of a nested form in it, are shown at the start of the item.
+                const inputs = item.querySelectorAll("[name='" + CSS.escape(name) + "']");
+                const target = inputs.length > 0 ? inputs[inputs.length - 1] : item.firstElementChild;
+                showError(target, messages.join(" "));
+            });
+        })
+        .catch(() => {});
+}
+
+document.addEventListener("focusout", event => {
+    if (!(event.target instanceof Element)) {
+        return;
+    }
+    const item = event.target.closest("li.dynamic-array-item");
+    const element = item?.closest("[data-subforms-validate-url]");
+    if (!item || !element || (event.relatedTarget instanceof Node && item.contains(event.relatedTarget))) {
+        return;
+    }
+    validateItem(element, item);
+});
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import datetime as dt
+import decimal
+import math
+import random
+import string
+import uuid
+from typing import TYPE_CHECKING, Any
+
+from django import forms
+from django.utils.datastructures import MultiValueDict
+
+from .constraints import choice_values
+from .fields import DynamicArrayField, NestedFormField
+from .settings import subforms_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+
+__all__ = [
+    "SyntheticData",
+    "form_data",
+    "invalid_value",
+]
+
+
+_EPOCH = dt.datetime(2020, 1, 1, tzinfo=dt.UTC)
+
+_NO_INVALID_VALUE = object()
+
+
+class SyntheticData:
+    """
+    Generate synthetic values for forms from the types and constraints of their fields.
+
+    Values are walked from the fields of the form through its nested forms and arrays,
+    and each value is generated to be valid for its field, e.g. an integer between the
+    field's 'min_value' and 'max_value', or one of the choices of a choice field.
+    The same seed always generates the same values.
+    """
+
+    def __init__(self, *, width: int = 10, array_length: int = 3, depth: int = 3, seed: int | str = 0) -> None:
+        """
+        Create a new synthetic data generator.
+
+        :param width: Number of items in the arrays directly in the form.
+        :param array_length: Number of items in the arrays inside nested forms.
+        :param depth: Number of nested form levels. Optional nested forms deeper than this are left empty,
+                      and arrays deeper than this have as few items as they can.
+        :param seed: Seed for the random values.
+        """
+        self.width = width
+        self.array_length = array_length
+        self.depth = depth
+        self.random = random.Random(seed)  # noqa: S311
+        self.counter = 0
+
+    def form_values(
+        self,
+        form_class: type[forms.Form],
+        *,
+        field_names: Iterable[str] | None = None,
+        invalid: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Generate values for the fields of the given form, by field name.
+
+        :param form_class: The form to generate the values for.
+        :param field_names: Names of the fields to generate values for. Defaults to all fields of the form.
+        :param invalid: Make one of the values invalid for its field, e.g. too long for a 'CharField'.
+                        The values are left valid if none of their fields can be given an invalid value.
+        """
+        fields = form_class.base_fields
+        values = dict.fromkeys(fields if field_names is None else field_names)
+        leaves: list[tuple[forms.Field, dict[Any, Any] | list[Any], Any]] | None = [] if invalid else None
+
+        for name in values:
+            self.fill(fields[name], values, name, leaves)
+        if leaves:
+            self.invalidate(leaves)
+        return values
+
+    def value(self, field: forms.Field, *, invalid: bool = False) -> Any:
+        """
+        Generate a value for the given field.
+
+        :param field: The field to generate the value for. Nested forms get a dictionary,
+                      arrays a list, and other fields a value of the type of the field.
+        :param invalid: Make the value, or one of the values in it, invalid for its field.
+        """
+        root: dict[str, Any] = {}
+        leaves: list[tuple[forms.Field, dict[Any, Any] | list[Any], Any]] | None = [] if invalid else None
+
+        self.fill(field, root, "value", leaves)
+        if leaves:
+            self.invalidate(leaves)
+        return root["value"]
+
+    def rows(
+        self,
+        form_class: type[forms.Form],
+        count: int,
+        *,
+        field_names: Iterable[str] | None = None,
+        invalid: float = 0.0,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Generate values for the given number of rows of the given form, one row at a time.
+
+        :param form_class: The form to generate the rows for.
+        :param count: Number of rows to generate.
+        :param field_names: Names of the fields to generate values for. Defaults to all fields of the form.
+        :param invalid: Share of the rows, from 0 to 1, with an invalid value. See 'form_values'.
+        """
+        names = None if field_names is None else list(field_names)
+        for _ in range(count):
+            yield self.form_values(form_class, field_names=names, invalid=self.random.random() < invalid)
+
+    def fill(
+        self,
+        field: forms.Field,
+        container: dict[Any, Any] | list[Any],
+        key: Any,
+        leaves: list[tuple[forms.Field, dict[Any, Any] | list[Any], Any]] | None = None,
+    ) -> None:
+        """
+        Generate a value for the given field, and set it to the given key of the given container.
+
+        :param field: The field to generate the value for.
+        :param container: Dictionary or list to set the value to.
+        :param key: Key or index of the value in the container.
+        :param leaves: If given, the fields of the values that are not nested forms or arrays
+                       are added here, with the dictionary or list containing the value and its key.
+        """
+        stack: list[tuple[forms.Field, dict[Any, Any] | list[Any], Any, int]] = [(field, container, key, 0)]
+
+        while stack:
+            current, container, key, level = stack.pop()
+
+            if isinstance(current, NestedFormField):
+                max_depth = subforms_settings.MAX_DEPTH if current.max_depth is None else current.max_depth
+                if (level >= self.depth and not current.required) or level >= max_depth:
+                    container[key] = None
+                    continue
+
+                fields = current.subform.base_fields
+                container[key] = item = dict.fromkeys(fields)
+                stack.extend((subfield, item, name, level + 1) for name, subfield in reversed(fields.items()))
+
+            elif isinstance(current, DynamicArrayField):
+                # Arrays don't add a level of nesting, like in the widgets.
+                container[key] = items = [None] * self.items(current, level)
+                stack.extend((current.subfield, items, index, level) for index in reversed(range(len(items))))
+
+            else:
+                container[key] = self.leaf(current)
+                if leaves is not None:
+                    leaves.append((current, container, key))
+
+    def invalidate(self, leaves: list[tuple[forms.Field, dict[Any, Any] | list[Any], Any]]) -> None:
+        """Replace one of the given values with a value that is invalid for its field, if any of them can be."""
+        for field, container, key in self.random.sample(leaves, k=len(leaves)):
+            value = invalid_value(field)
+            if value is not _NO_INVALID_VALUE:
+                container[key] = value
+                return
+
+    def items(self, field: DynamicArrayField, level: int) -> int:
+        """Get the number of items to generate for the given array field at the given nesting level."""
+        if level >= self.depth:
+            count = 0
+        elif level == 0:
+            count = self.width
+        else:
+            count = self.array_length
+
+        if field.required:
+            count = max(count, 1)
+        if field.max_length is not None:
+            count = min(count, field.max_length)
+        return count
+
+    def leaf(self, field: forms.Field) -> Any:  # noqa: PLR0911, PLR0912, C901
+        """Generate a value for a field that is not a subforms field."""
+        self.counter += 1
+        number = self.counter
+
+        if isinstance(field, forms.ModelMultipleChoiceField):
+            return list(field.queryset.values_list("pk", flat=True)[:2])
+        if isinstance(field, forms.ModelChoiceField):
+            return field.queryset.values_list("pk", flat=True).first()
+        if isinstance(field, forms.MultipleChoiceField):
+            values = choice_values(field.choices)
+            return self.random.sample(values, k=min(len(values), 2))
+        if isinstance(field, forms.ChoiceField):
+            values = choice_values(field.choices)
+            return self.random.choice(values) if values else ""
+        if isinstance(field, forms.NullBooleanField):
+            return self.random.choice([True, False, None])
+        if isinstance(field, forms.BooleanField):
+            # Required boolean fields must be checked.
+            return field.required or self.random.random() < 0.5  # noqa: PLR2004
+
+        if isinstance(field, forms.DecimalField):
+            return self.decimal(field)
+        if isinstance(field, forms.FloatField):
+            low, high = self.bounds(field)
+            return round(self.random.uniform(low, high), 3)
+        if isinstance(field, forms.IntegerField):
+            low, high = self.bounds(field)
+            return self.random.randint(math.ceil(low), math.floor(high))
+
+        if isinstance(field, forms.DateTimeField):
+            return _EPOCH + dt.timedelta(seconds=self.random.randrange(5 * 365 * 24 * 3600))
+        if isinstance(field, forms.DateField):
+            return _EPOCH.date() + dt.timedelta(days=self.random.randrange(5 * 365))
+        if isinstance(field, forms.TimeField):
+            return dt.time(self.random.randrange(24), self.random.randrange(60))
+        if isinstance(field, forms.DurationField):
+            return dt.timedelta(seconds=self.random.randrange(24 * 3600))
+        if isinstance(field, forms.UUIDField):
+            return uuid.UUID(int=self.random.getrandbits(128), version=4)
+        if isinstance(field, forms.JSONField):
+            return {"number": number}
+        if isinstance(field, forms.GenericIPAddressField):
+            return f"10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}"
+
+        if isinstance(field, forms.EmailField):
+            return f"user{number}@example.com"
+        if isinstance(field, forms.URLField):
+            return f"https://example.com/{number}"
+        if isinstance(field, forms.SlugField):
+            return f"slug-{number}"
+        if isinstance(field, forms.CharField):
+            return self.text(field)
+
+        # Files and fields of unknown types are left empty.
+        return None
+
+    def bounds(self, field: forms.IntegerField) -> tuple[float, float]:
+        low = 0 if field.min_value is None else field.min_value
+        high = low + 1000 if field.max_value is None else field.max_value
+        return low, high
+
+    def decimal(self, field: forms.DecimalField) -> decimal.Decimal:
+        places = 2 if field.decimal_places is None else field.decimal_places
+        low, high = self.bounds(field)
+        if field.max_digits is not None:
+            largest = decimal.Decimal(10) ** (field.max_digits - places) - 1
+            high = min(high, largest)
+            low = max(low, -largest)
+
+        scale = 10**places
+        value = self.random.randint(math.ceil(low * scale), math.floor(high * scale))
+        return decimal.Decimal(value).scaleb(-places)
+
+    def text(self, field: forms.CharField) -> str:
+        min_length = 1 if field.min_length is None else max(field.min_length, 1)
+        max_length = max(min_length, 16 if field.max_length is None else min(field.max_length, 64))
+        length = self.random.randint(min_length, max_length)
+        return "".join(self.random.choices(string.ascii_letters, k=length))
+
+
+def invalid_value(field: forms.Field) -> Any:  # noqa: PLR0911
+    """
+    Get a value that is invalid for the given field, e.g. a string that is too long for a 'CharField'.
+
+    :param field: The field that is not a subforms field.
+    :returns: The invalid value, or '_NO_INVALID_VALUE' if every value is valid for the field.
+    """
+    if field.disabled:
+        return _NO_INVALID_VALUE
+    if isinstance(field, forms.ModelChoiceField):
+        return None if field.required else _NO_INVALID_VALUE
+    if isinstance(field, forms.MultipleChoiceField):
+        return ["not a choice"]
+    if isinstance(field, forms.ChoiceField):
+        return "not a choice"
+    if isinstance(field, forms.BooleanField) and not isinstance(field, forms.NullBooleanField):
+        return False if field.required else _NO_INVALID_VALUE
+    if isinstance(field, forms.IntegerField):
+        return "not a number" if field.max_value is None else field.max_value + 1
+    if isinstance(field, (forms.DateField, forms.DateTimeField, forms.TimeField, forms.DurationField)):
+        return "not a date"
+    if isinstance(field, (forms.UUIDField, forms.EmailField, forms.URLField, forms.GenericIPAddressField)):
+        return "not valid"
+    if isinstance(field, forms.CharField) and field.max_length is not None:
+        return "x" * (field.max_length + 1)
+    return None if field.required else _NO_INVALID_VALUE
+
+
+def form_data(form_class: type[forms.Form], values: dict[str, Any]) -> MultiValueDict:
+    """
+    Convert values for the given form to form data, as it would be submitted from the rendered form.
+
+    :param form_class: The form the values are for.
+    :param values: Values by field name, e.g. from 'SyntheticData.form_values'.
+    :returns: Form data, e.g. 'array__0__foo' for the 'foo' field of the first item of the 'array' field.
+    """
+    data = MultiValueDict()
+    stack: list[tuple[forms.Field, Any, str]] = [
+        (field, values.get(name), name) for name, field in reversed(form_class.base_fields.items())
+    ]
+
+    while stack:
+        field, value, key = stack.pop()
+
+        if isinstance(field, NestedFormField) and isinstance(value, dict):
+            fields: Iterable[tuple[str, forms.Field]] = reversed(field.subform.base_fields.items())
+            stack.extend((subfield, value.get(name), f"{key}__{name}") for name, subfield in fields)
+        elif isinstance(field, DynamicArrayField) and isinstance(value, list):
+            stack.extend((field.subfield, item, f"{key}__{index}") for index, item in reversed(list(enumerate(value))))
+        elif isinstance(value, list):
+            data.setlist(key, [_form_value(item) for item in value])
+        elif value is not None:
+            data[key] = _form_value(value)
+
+    return data
+
+
+def _form_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dt.date, dt.time)):
+        return value.isoformat()
+    return str(value)
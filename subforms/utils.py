@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import hashlib
+import keyword
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.validators import EMPTY_VALUES
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+from django.utils.text import format_lazy
+
+from . import codec
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django import forms
+
+    FormClassReference: TypeAlias = type[forms.Form] | str | Callable[[], type[forms.Form]]
+
+__all__ = [
+    "canonical_hash",
+    "form_dataclass",
+    "has_data",
+    "is_dataclass_field_name",
+    "prefix_validation_error",
+    "resolve_form_class",
+]
+
+
+def prefix_validation_error(error: ValidationError, prefix: str, code: str, params: dict[str, Any]) -> ValidationError:
+    """
+    Prefix a validation error message while maintaining the existing validation data structure.
+
+    Same as 'django.contrib.postgres.utils.prefix_validation_error', but without
+    having to import the postgres contrib package when it's not otherwise used.
+
+    :param error: The error to prefix.
+    :param prefix: The prefix to add. Can contain formatting placeholders for the given params.
+    :param code: Error code to use for the prefixed error.
+    :param params: Parameters for the prefix.
+    """
+    if error.error_list == [error]:
+        error_params = error.params or {}
+        return ValidationError(
+            # Messages can't be simply concatenated, since they might require their
+            # associated parameters to be expressed correctly (e.g. proxied ngettext calls).
+            message=format_lazy(
+                "{} {}",
+                SimpleLazyObject(lambda: prefix % params),
+                SimpleLazyObject(lambda: error.message % error_params),
+            ),
+            code=code,
+            params={**error_params, **params},
+        )
+
+    return ValidationError([prefix_validation_error(err, prefix, code, params) for err in error.error_list])
+
+
+def resolve_form_class(form_class: FormClassReference) -> type[forms.Form]:
+    """
+    Resolve a reference to a form class.
+
+    References can be given as a dotted import path or a callable returning the form class,
+    so that forms can refer to themselves or to forms defined later in the same module.
+
+    :param form_class: A form class, a dotted import path to one, or a callable returning one.
+    """
+    if isinstance(form_class, str):
+        return import_string(form_class)
+    if isinstance(form_class, type):
+        return form_class
+    return form_class()
+
+
+def canonical_hash(value: Any) -> str:
+    """
+    Hash the given JSON-like value so that equal values give the same hash regardless of dictionary key order.
+
+    The value is encoded with the JSON codec set in the 'JSON_CODEC' setting, see 'codec.canonical_dumps'.
+
+    :param value: The value to hash. Values that are not JSON serializable are hashed by their string form.
+    """
+    data = codec.canonical_dumps(value)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def has_data(value: Any) -> bool:
+    """Check if the given value, or any value nested in its dictionaries and lists, is not empty."""
+    stack: list[Any] = [value]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple)):
+            stack.extend(current)
+        elif current not in EMPTY_VALUES:
+            return True
+    return False
+
+
+@functools.cache
+def form_dataclass(form_class: type[forms.Form], field_names: tuple[str, ...]) -> type:
+    """
+    Get a slotted dataclass for holding the cleaned data of the given form class.
+
+    A class is generated once for each form class and set of cleaned data keys,
+    and reused for all cleaned values with the same keys.
+
+    :param form_class: The form class the cleaned data is from.
+    :param field_names: Keys of the cleaned data, in order.
+    :raises ImproperlyConfigured: If some of the keys can't be dataclass fields, e.g. 'from'.
+    """
+    invalid = [name for name in field_names if not is_dataclass_field_name(name)]
+    if invalid:
+        names = ", ".join(f"'{name}'" for name in invalid)
+        msg = (
+            f"Cleaned data of '{form_class.__module__}.{form_class.__qualname__}' can't be returned "
+            f"as a dataclass, since {names} can't be used as dataclass field names."
+        )
+        raise ImproperlyConfigured(msg)
+
+    return dataclasses.make_dataclass(
+        cls_name=f"{form_class.__name__}Data",
+        fields=field_names,
+        namespace={
+            "__module__": form_class.__module__,
+            # Generated classes can't be imported by name, so they are pickled
+            # by the form class and keys they are generated from instead.
+            "__reduce__": lambda self: (
+                _build_form_dataclass,
+                (form_class, field_names, tuple(getattr(self, name) for name in field_names)),
+            ),
+        },
+        slots=True,
+    )
+
+
+def is_dataclass_field_name(name: str) -> bool:
+    """Check if the given cleaned data key can be used as a field name of a generated dataclass."""
+    return isinstance(name, str) and name.isidentifier() and not keyword.iskeyword(name)
+
+
+def _build_form_dataclass(form_class: type[forms.Form], field_names: tuple[str, ...], values: tuple[Any, ...]) -> Any:
+    return form_dataclass(form_class, field_names)(*values)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+
+from .fields import DynamicArrayField, NestedFormField
+from .widgets import NestedFormWidget
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from django import forms
+    from django.utils.datastructures import MultiValueDict
+
+__all__ = [
+    "clean_fields",
+    "error_paths",
+    "format_path",
+    "validate_fields",
+    "validate_subtree",
+]
+
+
+def validate_fields(fields: dict[str, forms.Field], data: dict[str, Any]) -> dict[str, list[str]]:
+    """
+    Validate the given data with the given fields, and return the errors by path.
+
+    :param fields: Fields to validate with, by name.
+    :param data: Data to validate, by field name. Missing values are validated as None.
+    :returns: Error messages by the path of the invalid value, e.g. 'nested.bar.0.fizz'. Empty if the data is valid.
+    """
+    return clean_fields(fields, data)[1]
+
+
+def clean_fields(fields: dict[str, forms.Field], data: dict[str, Any]) -> tuple[dict[str, Any], dict[str, list[str]]]:
+    """
+    Clean the given data with the given fields.
+
+    :param fields: Fields to clean with, by name.
+    :param data: Data to clean, by field name. Missing values are cleaned as None.
+    :returns: Cleaned values of the valid fields, and error messages by the path of the invalid values.
+    """
+    cleaned_data: dict[str, Any] = {}
+    errors: dict[str, list[str]] = {}
+
+    for name, field in fields.items():
+        try:
+            cleaned_data[name] = field.clean(data.get(name))
+        except ValidationError:
+            for path, messages in error_paths(field, data.get(name)).items():
+                errors[format_path((name, *path))] = messages
+
+    return cleaned_data, errors
+
+
+def error_paths(field: forms.Field, value: Any) -> dict[tuple[str | int, ...], list[str]]:
+    """
+    Validate the given value with the given field, and return the errors by path.
+
+    Instead of the combined errors of a nested form or array, errors are given for each nested
+    value separately, e.g. '("bar", 0, "fizz")' for the 'fizz' field of the first item of 'bar'.
+    The value is first cleaned normally, and only if it's invalid, its nested values are cleaned
+    separately to find out where the errors are.
+
+    :param field: The field to validate with.
+    :param value: The value to validate.
+    :returns: Error messages by path from the value. Empty if the value is valid.
+    """
+    errors: defaultdict[tuple[str | int, ...], list[str]] = defaultdict(list)
+    stack: list[tuple[forms.Field, Any, tuple[str | int, ...]]] = [(field, value, ())]
+
+    while stack:
+        current, current_value, path = stack.pop()
+
+        try:
+            current.clean(current_value)
+        except ValidationError as error:
+            invalid = error
+        else:
+            continue
+
+        if isinstance(current, NestedFormField) and isinstance(current_value, dict):
+            form = current.subform(data=current_value)
+            if form.is_valid():
+                errors[path] += invalid.messages
+                continue
+
+            for name, error_list in reversed(form.errors.as_data().items()):
+                subfield = form.fields.get(name)
+                if isinstance(subfield, (NestedFormField, DynamicArrayField)):
+                    stack.append((subfield, current_value.get(name), (*path, name)))
+                    continue
+
+                sub_path = path if name == NON_FIELD_ERRORS else (*path, name)
+                errors[sub_path] += ValidationError(error_list).messages
+
+        elif isinstance(current, DynamicArrayField) and isinstance(current_value, list):
+            # Errors for the whole array, e.g. for too many items.
+            errors[path] += [
+                message for sub_error in invalid.error_list if sub_error.code != "item_invalid" for message in sub_error
+            ]
+            if not errors[path]:
+                del errors[path]
+
+            items = current_value
+            if current.remove_empty_items:
+                items = [item for item in items if not current.is_empty_item(item)]
+
+            stack.extend((current.subfield, item, (*path, index)) for index, item in reversed(list(enumerate(items))))
+
+        else:
+            errors[path] += invalid.messages
+
+    return dict(errors)
+
+
+def validate_subtree(
+    form: forms.Form,
+    name: str,
+    data: Mapping[str, Any],
+    files: MultiValueDict | None = None,
+) -> dict[str, list[str]]:
+    """
+    Validate a single part of the value of a subforms field from form data, e.g. a single item of an array.
+
+    :param form: The form with the subforms field. Doesn't need to be bound.
+    :param name: HTML name of the part to validate, e.g. 'array__3' for the fourth item of the 'array' field,
+                 or 'dict__bar__0' for the first item in the 'bar' field of the form nested in the 'dict' field.
+    :param data: Form data with the data of the part.
+    :param files: Files of the form data.
+    :returns: Error messages by the HTML name of the invalid value, e.g. 'array__3__foo'. Empty if the part is valid.
+    :raises ValueError: If the name doesn't refer to a part of a subforms field of the form.
+    """
+    field = subtree_field(form, name)
+    value = field.widget.value_from_datadict(data, files or {}, name)
+
+    return {
+        "".join((name, *(f"__{key}" for key in path))): messages for path, messages in error_paths(field, value).items()
+    }
+
+
+def subtree_field(form: forms.Form, name: str) -> forms.Field:
+    """
+    Find the field for the part of the value of a subforms field with the given HTML name.
+
+    :param form: The form with the subforms field.
+    :param name: HTML name of the part, e.g. 'dict__bar__0'.
+    :raises ValueError: If the name doesn't refer to a part of a subforms field of the form.
+    """
+    bound_field = next((bf for bf in form if name == bf.html_name or name.startswith(f"{bf.html_name}__")), None)
+    field = None if bound_field is None else bound_field.field
+    if bound_field is None or not isinstance(field, (NestedFormField, DynamicArrayField)) or field.disabled:
+        msg = f"Invalid subforms path: '{name}'."
+        raise ValueError(msg)
+
+    parts = name.removeprefix(bound_field.html_name).split("__")[1:]
+    for part in parts:
+        if isinstance(field, DynamicArrayField) and part.isdigit():
+            field = field.subfield
+            continue
+
+        if isinstance(field, NestedFormField):
+            widget = field.widget
+            fields = widget.subform.fields if isinstance(widget, NestedFormWidget) else field.subform().fields
+            if part in fields:
+                field = fields[part]
+                continue
+
+        msg = f"Invalid subforms path: '{name}'."
+        raise ValueError(msg)
+
+    return field
+
+
+def format_path(path: tuple[str | int, ...]) -> str:
+    """Format a path to a nested value as a string, e.g. 'nested.bar.0.fizz'."""
+    return ".".join(str(key) for key in path)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import JsonResponse
+from django.template.response import TemplateResponse
+from django.views import View
+
+from .validation import validate_subtree
+
+if TYPE_CHECKING:
+    from django import forms
+    from django.http import HttpRequest, HttpResponse
+
+__all__ = [
+    "SubformsValidationView",
+    "validation_response",
+]
+
+
+# Keys in the form data for the name of the part to validate, and for the format of the response.
+# These can't clash with the data of the form, since HTML names of subforms fields don't contain colons.
+PATH_KEY = "subforms:path"
+FORMAT_KEY = "subforms:format"
+
+
+class SubformsValidationView(View):
+    """
+    A view for validating single parts of the values of the subforms fields of a form, e.g. single array items.
+
+    Used by 'subforms.js' to validate array items when they are edited, without submitting the whole form.
+    Set the URL of the view to the 'validate_url' of the widgets of the fields to enable this.
+    """
+
+    form_class: type[forms.Form] | None = None
+    http_method_names = ["post"]
+
+    def get_form(self) -> forms.Form:
+        if self.form_class is None:
+            msg = f"'{type(self).__name__}' requires either 'form_class' or an implementation of 'get_form()'."
+            raise ImproperlyConfigured(msg)
+        return self.form_class()
+
+    def post(self, request: HttpRequest, *args: object, **kwargs: object) -> HttpResponse:
+        return validation_response(request, self.get_form())
+
+
+def validation_response(request: HttpRequest, form: forms.Form) -> HttpResponse:
+    """
+    Validate the part of a subforms field in the POST data of the request.
+
+    The HTML name of the part is read from 'subforms:path', e.g. 'array__3', and its data from
+    the rest of the POST data, e.g. 'array__3__foo'. The response is JSON with the errors by
+    the HTML name of the invalid values, or, if 'subforms:format' is 'html', the errors as HTML.
+
+    :param request: The request with the data of the part.
+    :param form: The form with the subforms field.
+    """
+    try:
+        errors = validate_subtree(form, request.POST.get(PATH_KEY, ""), request.POST, request.FILES)
+    except ValueError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+
+    if request.POST.get(FORMAT_KEY) == "html":
+        return TemplateResponse(request, "subforms/errors.html", {"errors": errors})
+    return JsonResponse({"valid": not errors, "errors": errors})
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django import forms
+from django.forms.renderers import get_default_renderer
+
+from .fields import DynamicArrayField, NestedFormField
+from .widgets import DynamicArrayWidget, NestedFormWidget
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from django.forms.renderers import BaseRenderer
+
+__all__ = [
+    "warm_up",
+]
+
+
+def warm_up() -> int:
+    """
+    Precompile the subforms fields of all imported form classes.
+
+    This builds the widget maps and media of all subforms widgets, and loads the templates
+    used to render them, so that the first request using a form doesn't have to.
+    Form classes defined in modules that haven't been imported yet (e.g. admin modules
+    before admin autodiscovery) are not found.
+
+    :returns: The number of subforms fields that were precompiled.
+    """
+    renderer = get_default_renderer()
+    templates: set[str] = set()
+    count: int = 0
+
+    for form_class in iter_form_classes():
+        base_fields: dict[str, forms.Field] = getattr(form_class, "base_fields", {})
+        for field in base_fields.values():
+            if isinstance(field, (NestedFormField, DynamicArrayField)):
+                warm_up_widget(field.widget, renderer=renderer, templates=templates)
+                count += 1
+
+    return count
+
+
+def warm_up_widget(widget: forms.Widget, *, renderer: BaseRenderer, templates: set[str]) -> None:
+    """
+    Precompile the given widget and all of its subwidgets.
+
+    :param widget: The widget to precompile.
+    :param renderer: Form renderer used to load the widget templates.
+    :param templates: Names of the templates that have already been loaded.
+    """
+    stack: list[forms.Widget] = [widget]
+    while stack:
+        current = stack.pop()
+
+        if current.template_name not in templates:
+            renderer.get_template(current.template_name)
+            templates.add(current.template_name)
+
+        if isinstance(current, DynamicArrayWidget):
+            current.media  # noqa: B018
+            stack.append(current.subwidget)
+
+        elif isinstance(current, NestedFormWidget):
+            current.media  # noqa: B018
+            stack.extend(current.widget_map.values())
+
+
+def iter_form_classes() -> Generator[type[forms.BaseForm], None, None]:
+    """Iterate all imported subclasses of 'django.forms.BaseForm'."""
+    seen: set[type[forms.BaseForm]] = set()
+    stack: list[type[forms.BaseForm]] = [forms.BaseForm]
+    while stack:
+        form_class = stack.pop()
+        for subclass in form_class.__subclasses__():
+            if subclass in seen:
+                continue
+            seen.add(subclass)
+            stack.append(subclass)
+            yield subclass
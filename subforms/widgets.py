@@ -1,19 +1,33 @@
 from __future__ import annotations
 
 import copy
+import dataclasses
 import re
 from collections import defaultdict
+from contextvars import ContextVar
+from functools import cached_property
 from typing import TYPE_CHECKING, Any
 
 from django import forms
+from django.utils.datastructures import MultiValueDict
+from django.utils.safestring import mark_safe
+
+from . import codec
+from .cache import render_cache, render_cache_key
+from .settings import subforms_settings
+from .utils import has_data, resolve_form_class
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Generator, Mapping
+
+    from django.forms.renderers import BaseRenderer
+    from django.utils.safestring import SafeString
 
-    from django.utils.datastructures import MultiValueDict
+    from .utils import FormClassReference
 
 __all__ = [
     "DynamicArrayWidget",
+    "JSONHiddenInput",
     "NestedFormWidget",
 ]
 
@@ -21,11 +35,63 @@
 _INDEX_PATTERN = re.compile(r"^\d+")
 
 
+_FINALIZE_ARRAY = object()
+
+# Suffix for the name of the form data key with the packed data of a subforms field.
+PACKED_SUFFIX = ":packed"
+
+# Form classes of the nested forms being rendered, from the outermost to the innermost.
+_rendered_forms: ContextVar[tuple[type[forms.Form], ...]] = ContextVar("_rendered_forms", default=())
+
+
+class SubwidgetFlag:
+    """
+    Widget flag that is computed lazily from the subwidgets of a subforms widget, unless set explicitly.
+
+    Computing the flag requires building the widget tree, which should not happen when the
+    widget is created, e.g., so that forms can refer to themselves or to forms defined later.
+    """
+
+    def __set_name__(self, owner: type[forms.Widget], name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: forms.Widget | None, owner: type[forms.Widget]) -> Any:
+        if instance is None:
+            return self
+        if self.name in instance.__dict__:
+            return instance.__dict__[self.name]
+        return any(getattr(widget, self.name) for widget in iter_leaf_widgets(instance))
+
+    def __set__(self, instance: forms.Widget, value: bool) -> None:  # noqa: FBT001
+        instance.__dict__[self.name] = value
+
+
+class JSONHiddenInput(forms.HiddenInput):
+    """
+    Hidden input for the whole value of a subforms field as JSON, e.g. for the initial value
+    of fields with 'show_hidden_initial', so that the value can be decoded back when posted.
+    """
+
+    def format_value(self, value: Any) -> str | None:
+        if value is None or isinstance(value, str):
+            return super().format_value(value)
+        return codec.dumps(value)
+
+
 class DynamicArrayWidget(forms.Widget):
     """A widget that wraps a widget into a field containing a dynamic array of that widget."""
 
     template_name = "subforms/array.html"
 
+    # The field using this widget, for describing the constraints of the array to the browser.
+    array_field: forms.Field | None = None
+    # URL for validating single items of the array on the server while they are edited.
+    validate_url: str | None = None
+
+    needs_multipart_form = SubwidgetFlag()
+    is_localized = SubwidgetFlag()
+    is_required = SubwidgetFlag()
+
     class Media:
         js = ["js/subforms.js"]
         css = {"all": ["css/subforms.css"]}
@@ -35,26 +101,56 @@ def __init__(
         subwidget: type[forms.Widget] | forms.Widget = forms.TextInput,
         template_name: str | None = None,
         attrs: dict[str, Any] | None = None,
+        *,
+        pack_data: bool | None = None,
+        virtualize: bool = False,
+        cache_render: bool = False,
     ) -> None:
+        """
+        Create a new dynamic array widget.
+
+        :param subwidget: The widget to use for the array items.
+        :param template_name: Template used to render the widget.
+        :param attrs: HTML attributes for the widget.
+        :param pack_data: Send the data of this widget from the browser as a single JSON value.
+                          Defaults to the 'PACK_DATA' setting.
+        :param virtualize: Only keep the items that are scrolled into view as elements in the page,
+                           for arrays with a lot of items. Not done for arrays with arrays
+                           or file inputs inside their items.
+        :param cache_render: Cache the rendered HTML by the content of the value, so that rendering
+                             an identical value again returns the cached HTML without rendering it.
+        """
         self.subwidget = subwidget() if isinstance(subwidget, type) else copy.deepcopy(subwidget)
         self.template_name = template_name or self.template_name
-
-        self.needs_multipart_form = self.subwidget.needs_multipart_form
-        self.is_localized = self.subwidget.is_localized
-        self.is_required = self.subwidget.is_required
-
+        self._pack_data = pack_data
+        self.virtualize = virtualize
+        self.cache_render = cache_render
         super().__init__(attrs=attrs)
 
     def __deepcopy__(self, memo: dict[int, Any]) -> Any:
         obj = super().__deepcopy__(memo)
-        obj.subwidget = copy.deepcopy(self.subwidget)
+        obj.subwidget = copy.deepcopy(self.subwidget, memo)
         return obj
 
+    @property
+    def depth(self) -> int:
+        return getattr(self.subwidget, "depth", 0)
+
+    @depth.setter
+    def depth(self, value: int) -> None:
+        # Arrays don't add a level of nesting, so the depth is the same as for the items.
+        if isinstance(self.subwidget, (DynamicArrayWidget, NestedFormWidget)):
+            self.subwidget.depth = value
+
     @property
     def is_hidden(self) -> bool:
         return self.subwidget.is_hidden
 
     @property
+    def pack_data(self) -> bool:
+        return subforms_settings.PACK_DATA if self._pack_data is None else self._pack_data
+
+    @cached_property
     def media(self) -> forms.Media:
         media = forms.Media(media=self.Media)
         media += self.subwidget.media
@@ -68,19 +164,35 @@ def value_from_datadict(self, data: Mapping[str, Any], files: MultiValueDict, na
         :param files: Files from the form.
         :param name: Name of this widget.
         """
-        # In some cases, this function can be hit with already processed data.
-        # If this happens, we can skip the rest of the data processing.
-        if name in data:
-            return data[name]
+        if self.pack_data and (packed := read_packed_data(data, name)) is not None:
+            return unpack_value(self, packed, files=files, name=name)
+        return parse_value(self, data=data, files=files, name=name)
+
+    def group_items(self, data: Mapping[str, Any], name: str) -> tuple[dict[int, Any], dict[int, dict[str, Any]]]:
+        """
+        Group the form data for this widget by array index.
 
+        :param data: Data from the form.
+        :param name: Name of this widget.
+        :returns: Values of items that are not nested by index, and form data of nested items by index.
+        """
         results: dict[int, Any] = {}
         nested_forms: dict[int, dict[str, Any]] = defaultdict(dict)
+        prefix = f"{name}__"
+
+        # Items of flat arrays, e.g. of numbers, are only ever posted as 'name__<index>',
+        # so they can be picked out without matching each key against the index pattern.
+        if not isinstance(self.subwidget, (DynamicArrayWidget, NestedFormWidget)):
+            for key, value in data.items():
+                if key.startswith(prefix) and (index := key.removeprefix(prefix)).isdecimal():
+                    results[int(index)] = value
+            return results, nested_forms
 
         for key, value in data.items():
-            if not key.startswith(f"{name}__"):
+            if not key.startswith(prefix):
                 continue
 
-            nested_key = key.removeprefix(f"{name}__")
+            nested_key = key.removeprefix(prefix)
             match = re.match(_INDEX_PATTERN, nested_key)
             if match is None:
                 continue
@@ -91,15 +203,13 @@ def value_from_datadict(self, data: Mapping[str, Any], files: MultiValueDict, na
                 results[index] = value
                 continue
 
-            # Gather nested form data
+            # Gather nested form data. Items packed on their own are read from the packed key of the item.
             nested_key = nested_key.removeprefix(f"{index}__")
+            if nested_key == f"{index}{PACKED_SUFFIX}":
+                nested_key = PACKED_SUFFIX
             nested_forms[index][nested_key] = value
 
-        # Process nested form data
-        for index, nested_form in nested_forms.items():
-            results[index] = self.subwidget.value_from_datadict(data=nested_form, files=files, name="")
-
-        return list(results.values())
+        return results, nested_forms
 
     def value_omitted_from_data(self, data: Mapping[str, Any], files: MultiValueDict, name: str) -> bool:
         return False
@@ -117,9 +227,34 @@ def get_context(self, name: str, value: list[Any] | None, attrs: dict[str, Any]
         sub_value = context["widget"]["value"]
 
         context["widget"]["subwidgets"] = self.get_subwidgets(name, sub_value, sub_attrs)
+        context["widget"]["pack_data"] = self.pack_data
+        context["widget"]["virtualize"] = self.virtualize
 
         return context
 
+    def get_empty_context(self, name: str, attrs: dict[str, Any]) -> dict[str, Any]:
+        """
+        Get the context for rendering this widget without items, instead of with a single empty item.
+
+        :param name: Name of this widget.
+        :param attrs: HTML attributes for the widget.
+        """
+        context = super().get_context(name, [], attrs)
+        context["widget"]["value"] = []
+        context["widget"]["subwidgets"] = []
+        context["widget"]["pack_data"] = self.pack_data
+        context["widget"]["virtualize"] = self.virtualize
+        return context
+
+    def render(
+        self,
+        name: str,
+        value: Any,
+        attrs: dict[str, Any] | None = None,
+        renderer: BaseRenderer | None = None,
+    ) -> SafeString:
+        return render_with_constraints(self, name, value, attrs, renderer)
+
     def get_subwidgets(self, name: str, value: Any, attrs: dict[str, Any]) -> list[dict[str, Any]]:
         subwidgets: list[dict[str, Any]] = []
 
@@ -141,45 +276,127 @@ class NestedFormWidget(forms.Widget):
     """A widget that wraps a form into a field."""
 
     template_name = "subforms/nested.html"
+    placeholder_template_name = "subforms/nested_placeholder.html"
     use_fieldset = True
 
+    # URL for validating the nested form, or items of arrays inside it, on the server while they are edited.
+    validate_url: str | None = None
+
+    needs_multipart_form = SubwidgetFlag()
+    is_localized = SubwidgetFlag()
+    is_required = SubwidgetFlag()
+
     class Media:
         js = ["js/subforms.js"]
         css = {"all": ["css/subforms.css"]}
 
     def __init__(
         self,
-        form_class: type[forms.Form],
+        form_class: FormClassReference,
         template_name: str | None = None,
         attrs: dict[str, Any] | None = None,
+        *,
+        max_depth: int | None = None,
+        pack_data: bool | None = None,
+        cache_render: bool = False,
     ) -> None:
-        self.subform = form_class()
+        """
+        Create a new nested form widget.
+
+        :param form_class: The form class to wrap, a dotted import path to it, or a callable returning it.
+                           The form is only created, and its widgets built, when they are first needed.
+        :param template_name: Template used to render the widget.
+        :param attrs: HTML attributes for the widget.
+        :param max_depth: Maximum number of nested form levels. Defaults to the 'MAX_DEPTH' setting.
+                          Forms nested deeper than this are not rendered or parsed.
+        :param pack_data: Send the data of this widget from the browser as a single JSON value.
+                          Defaults to the 'PACK_DATA' setting.
+        :param cache_render: Cache the rendered HTML by the content of the value, so that rendering
+                             an identical value again returns the cached HTML without rendering it.
+        """
+        self._form_class = form_class
+        self._depth: int = 0
+        self._pack_data = pack_data
+        self.max_depth = max_depth
+        self.cache_render = cache_render
         self.template_name = template_name or self.template_name
-        self.widget_map: dict[str, forms.Widget] = {
-            name: (bound_field.widget() if isinstance(bound_field.widget, type) else bound_field.widget)
-            for name, bound_field in self.subform.fields.items()
-        }
-
-        self.needs_multipart_form = any(widget.needs_multipart_form for widget in self.widget_map.values())
-        self.is_localized = any(widget.is_localized for widget in self.widget_map.values())
-        self.is_required = any(widget.is_required for widget in self.widget_map.values())
-
         super().__init__(attrs=attrs)
 
     def __deepcopy__(self, memo: dict[int, Any]) -> Any:
         obj = super().__deepcopy__(memo)
-        obj.subform = copy.deepcopy(self.subform)
-        obj.widget_map = copy.deepcopy(self.widget_map)
+        if "subform" in self.__dict__:
+            obj.subform = copy.deepcopy(self.subform, memo)
+        if "widget_map" in self.__dict__:
+            obj.widget_map = copy.deepcopy(self.widget_map, memo)
         return obj
 
+    @property
+    def form_class(self) -> type[forms.Form]:
+        if not isinstance(self._form_class, type):
+            self._form_class = resolve_form_class(self._form_class)
+        return self._form_class
+
+    @cached_property
+    def subform(self) -> forms.Form:
+        return self.form_class()
+
+    @cached_property
+    def widget_map(self) -> dict[str, forms.Widget]:
+        if self.depth_limit_reached:
+            return {}
+
+        widget_map: dict[str, forms.Widget] = {}
+        for name, field in self.subform.fields.items():
+            widget = field.widget() if isinstance(field.widget, type) else field.widget
+            if isinstance(widget, (DynamicArrayWidget, NestedFormWidget)):
+                widget.depth = self.depth + 1
+            widget_map[name] = widget
+
+        return widget_map
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    @depth.setter
+    def depth(self, value: int) -> None:
+        if value == self._depth:
+            return
+
+        was_limited = self.depth_limit_reached
+        self._depth = value
+
+        if "widget_map" not in self.__dict__:
+            return
+
+        # If the widget tree has already been built, it needs to be rebuilt if the depth limit
+        # now cuts it at a different place. Otherwise, the depth can be passed down to the subwidgets.
+        if was_limited or self.depth_limit_reached:
+            self.__dict__.pop("widget_map", None)
+            self.__dict__.pop("media", None)
+            return
+
+        for widget in self.widget_map.values():
+            if isinstance(widget, (DynamicArrayWidget, NestedFormWidget)):
+                widget.depth = value + 1
+
+    @property
+    def depth_limit_reached(self) -> bool:
+        max_depth = subforms_settings.MAX_DEPTH if self.max_depth is None else self.max_depth
+        return self.depth >= max_depth
+
     @property
     def is_hidden(self) -> bool:
-        return all(widget.is_hidden for widget in self.widget_map.values())
+        return all(widget.is_hidden for widget in iter_leaf_widgets(self))
 
     @property
+    def pack_data(self) -> bool:
+        return subforms_settings.PACK_DATA if self._pack_data is None else self._pack_data
+
+    @cached_property
     def media(self) -> forms.Media:
         media = forms.Media(media=self.Media)
-        for widget in self.widget_map.values():
+        for widget in iter_leaf_widgets(self):
             media += widget.media
         return media
 
@@ -191,20 +408,13 @@ def value_from_datadict(self, data: Mapping[str, Any], files: MultiValueDict, na
         :param files: Files from the form.
         :param name: Name of this widget.
         """
-        # In some cases, this function can be hit with already processed data.
-        # If this happens, we can skip the rest of the data processing.
-        if name in data:
-            return data[name]
-
-        results: dict[str, Any] = {}
-
-        for widget_name, widget in self.widget_map.items():
-            key = f"{name}__{widget_name}" if name else widget_name
-            results[widget_name] = widget.value_from_datadict(data=data, files=files, name=key)
-
-        return results
+        if self.pack_data and (packed := read_packed_data(data, name)) is not None:
+            return unpack_value(self, packed, files=files, name=name)
+        return parse_value(self, data=data, files=files, name=name)
 
     def value_omitted_from_data(self, data: Mapping[str, Any], files: MultiValueDict, name: Any) -> bool:
+        if self.pack_data and f"{name}{PACKED_SUFFIX}" in data:
+            return False
         return all(
             widget.value_omitted_from_data(data=data, files=files, name=f"{name}__{widget_name}")
             for widget_name, widget in self.widget_map.items()
@@ -213,7 +423,10 @@ def value_omitted_from_data(self, data: Mapping[str, Any], files: MultiValueDict
     def id_for_label(self, id_: Any) -> str:
         return ""
 
-    def format_value(self, value: dict[str, Any] | None) -> dict[str, Any]:
+    def format_value(self, value: Any) -> dict[str, Any]:
+        # Values cleaned with 'as_dataclass'
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
         return value or {}
 
     def get_context(self, name: str, value: dict[str, Any] | None, attrs: dict[str, Any] | None) -> dict[str, Any]:
@@ -223,22 +436,388 @@ def get_context(self, name: str, value: dict[str, Any] | None, attrs: dict[str,
         sub_value = context["widget"]["value"]
 
         context["widget"]["subwidgets"] = self.get_subwidgets(name, sub_value, sub_attrs)
+        context["widget"]["pack_data"] = self.pack_data
         return context
 
+    def render(
+        self,
+        name: str,
+        value: Any,
+        attrs: dict[str, Any] | None = None,
+        renderer: BaseRenderer | None = None,
+    ) -> SafeString:
+        return render_with_constraints(self, name, value, attrs, renderer)
+
+    def get_placeholder_context(self, name: str, attrs: dict[str, Any]) -> dict[str, Any]:
+        """
+        Get the context for rendering this widget as an empty placeholder instead of its inputs.
+
+        :param name: Name of this widget.
+        :param attrs: HTML attributes for the widget.
+        """
+        return {
+            "name": name,
+            "is_hidden": False,
+            "required": False,
+            "value": None,
+            "attrs": attrs,
+            "template_name": self.placeholder_template_name,
+        }
+
     def get_subwidgets(self, name: str, value: dict[str, Any], attrs: dict[str, Any]) -> list[dict[str, Any]]:
         subwidgets: list[dict[str, Any]] = []
+        # Optional nested forms without data are only rendered with their inputs if this form is filled,
+        # and arrays of this form, or of the forms around it, only with items if this form has data,
+        # so that recursive forms are rendered one level deeper than their data, not to the depth limit.
+        filled = has_data(value)
+        expand_optional = self.is_required or filled
+        rendered_forms = (*_rendered_forms.get(), self.form_class)
+
+        token = _rendered_forms.set(rendered_forms)
+        try:
+            for widget_name, widget in self.widget_map.items():
+                widget_attrs = copy.deepcopy(attrs)
+
+                item_name = f"{name}__{widget_name}"
+                if "id" in widget_attrs:
+                    widget_attrs["id"] += f"__{widget_name}"
+
+                item = value.get(widget_name)
+
+                if (
+                    isinstance(widget, NestedFormWidget)
+                    and not widget.is_required
+                    and not expand_optional
+                    and not has_data(item)
+                ):
+                    subwidget_attrs = {"widget": widget.get_placeholder_context(item_name, widget_attrs)}
+                elif (
+                    isinstance(widget, DynamicArrayWidget)
+                    and isinstance(widget.subwidget, NestedFormWidget)
+                    and widget.subwidget.form_class in rendered_forms
+                    and not filled
+                ):
+                    subwidget_attrs = widget.get_empty_context(item_name, widget_attrs)
+                else:
+                    subwidget_attrs = widget.get_context(item_name, item, widget_attrs)
+                subwidget_attrs["widget"]["label"] = widget_name.replace("_", " ").strip().title()
+                subwidgets.append(subwidget_attrs["widget"])
+        finally:
+            _rendered_forms.reset(token)
 
-        for widget_name, widget in self.widget_map.items():
-            widget_attrs = copy.deepcopy(attrs)
+        return subwidgets
 
-            item_name = f"{name}__{widget_name}"
-            if "id" in widget_attrs:
-                widget_attrs["id"] += f"__{widget_name}"
 
-            item = value.get(widget_name)
+def render_with_constraints(
+    widget: DynamicArrayWidget | NestedFormWidget,
+    name: str,
+    value: Any,
+    attrs: dict[str, Any] | None,
+    renderer: BaseRenderer | None,
+) -> SafeString:
+    """
+    Render a subforms widget of a form field, with the constraints of the field for validating it in the browser.
+
+    Only the widgets of form fields are rendered with 'render', the widgets nested inside them
+    are rendered as part of their template, so the constraints are included only once for each field.
+    Widgets using 'cache_render' get the HTML from the render cache if the same value has been rendered before.
+    """
+    constraints: str | None = None
+    if subforms_settings.CLIENT_VALIDATION:
+        from .constraints import describe_constraints  # noqa: PLC0415
+
+        described = describe_constraints(widget)
+        if described is not None:
+            constraints = codec.dumps(described)
+
+    if widget.cache_render:
+        key = render_cache_key(widget, name, value, attrs, renderer, constraints=constraints)
+        if key is not None:
+            html = render_cache.get_or_compute(
+                key,
+                lambda: str(_render(widget, name, value, attrs, renderer, constraints=constraints)),
+            )
+            return mark_safe(html)  # noqa: S308
+
+    return _render(widget, name, value, attrs, renderer, constraints=constraints)
+
+
+def _render(
+    widget: DynamicArrayWidget | NestedFormWidget,
+    name: str,
+    value: Any,
+    attrs: dict[str, Any] | None,
+    renderer: BaseRenderer | None,
+    *,
+    constraints: str | None,
+) -> SafeString:
+    context = widget.get_context(name, value, attrs)
+    context["widget"]["validate_url"] = widget.validate_url
+    context["widget"]["constraints"] = constraints
+    return widget._render(widget.template_name, context, renderer)  # noqa: SLF001
+
+
+def parse_value(widget: forms.Widget, data: Mapping[str, Any], files: MultiValueDict, name: str) -> Any:
+    """
+    Parse the value for the given subforms widget from the form data.
+
+    Nested subforms widgets are parsed using an explicit stack instead of recursion,
+    so that deeply nested data doesn't need a stack frame for each level.
+    Subclasses that override 'value_from_datadict' are still called as usual.
+
+    :param widget: The widget to parse the value for.
+    :param data: Data from the form.
+    :param files: Files from the form.
+    :param name: Name of the widget.
+    """
+    root: dict[Any, Any] = {}
+    # Each task sets 'container[key]' to the value parsed for 'widget' from 'data' with 'name'.
+    # Arrays add a finalizer task, which converts the parsed items to a list once they are all done.
+    stack: list[tuple[Any, Any, str, dict[Any, Any], Any]] = [(widget, data, name, root, None)]
+    # Trees of the form data keys with data, by the 'id()' of the form data, built when first needed.
+    # The form data is kept with its tree, so that its 'id()' is not reused during parsing.
+    data_trees: dict[int, tuple[Mapping[str, Any], dict[str, Any]]] = {}
+
+    while stack:
+        current, current_data, current_name, container, key = stack.pop()
+
+        if current is _FINALIZE_ARRAY:
+            container[key] = list(current_data.values())
+            continue
+
+        if not _parsed_iteratively(current):
+            container[key] = current.value_from_datadict(data=current_data, files=files, name=current_name)
+            continue
 
-            subwidget_attrs = widget.get_context(item_name, item, widget_attrs)
-            subwidget_attrs["widget"]["label"] = widget_name.replace("_", " ").strip().title()
-            subwidgets.append(subwidget_attrs["widget"])
+        # In some cases, this function can be hit with already processed data.
+        # If this happens, we can skip the rest of the data processing.
+        if current_name in current_data:
+            container[key] = current_data[current_name]
+            continue
+
+        # Subforms widgets inside a field that is not packed can still be packed on their own.
+        if current.pack_data and (packed := read_packed_data(current_data, current_name)) is not None:
+            container[key] = unpack_value(current, packed, files=files, name=current_name)
+            continue
+
+        if isinstance(current, NestedFormWidget):
+            # Optional nested forms inside the widget without any data are left empty, instead of
+            # parsing an empty value for each of their fields, so that recursive forms are only parsed
+            # as deep as their data. Array items are only parsed if they have data in the first place.
+            if container is not root and current_name and not current.is_required:
+                data_id = id(current_data)
+                if data_id not in data_trees:
+                    data_trees[data_id] = (current_data, _data_tree(current_data))
+                if not _has_data_under(data_trees[data_id][1], current_name):
+                    container[key] = None
+                    continue
+
+            results: dict[str, Any] = {}
+            container[key] = results
+            for widget_name, subwidget in current.widget_map.items():
+                sub_name = f"{current_name}__{widget_name}" if current_name else widget_name
+                results[widget_name] = None
+                stack.append((subwidget, current_data, sub_name, results, widget_name))
+            continue
+
+        items, nested_forms = current.group_items(current_data, current_name)
+        stack.append((_FINALIZE_ARRAY, items, "", container, key))
+        for index, nested_form in nested_forms.items():
+            items[index] = None
+            stack.append((current.subwidget, nested_form, "", items, index))
+
+    return root[None]
+
+
+def _data_tree(data: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Build a tree of the parts of the form data keys that have a non-empty value,
+    e.g. '{"child": {"name": {}}}' for 'child__name=x'.
+    """
+    tree: dict[str, Any] = {}
+    items = data.lists() if isinstance(data, MultiValueDict) else ((key, [value]) for key, value in data.items())
+    for key, values in items:
+        if not any(has_data(value) for value in values):
+            continue
+        node = tree
+        for part in str(key).split("__"):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _has_data_under(tree: dict[str, Any], name: str) -> bool:
+    """Check if the given form data key tree has non-empty values under the given widget name."""
+    node: dict[str, Any] | None = tree
+    for part in name.split("__"):
+        node = node.get(part)
+        if node is None:
+            return False
+    return bool(node)
+
+
+def read_packed_data(data: Mapping[str, Any], name: str) -> dict[str, Any] | None:
+    """
+    Read the packed data of a subforms field from the form data, if it was sent packed.
+
+    :param data: Data from the form.
+    :param name: Name of the subforms widget.
+    :returns: The packed data, or None if it wasn't sent or can't be read, in which case
+              the data should be parsed from the separate form data keys.
+    """
+    packed = data.get(f"{name}{PACKED_SUFFIX}")
+    if not isinstance(packed, str):
+        return None
+    try:
+        value = codec.loads(packed)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def unpack_value(widget: forms.Widget, packed: dict[str, Any], files: MultiValueDict, name: str) -> Any:
+    """
+    Get the value for the given subforms widget from its packed data.
+
+    The packed data is the form data of the widget as sent by 'subforms.js', nested by the
+    parts of the form data keys, e.g. '{"bar": {"0": {"fizz": "x"}}}' for 'nested__bar__0__fizz=x'.
+    Since the nesting already follows the widget tree, the value can be built in one pass,
+    instead of matching every form data key against the name of each subforms widget.
+    Widgets that are not subforms widgets parse their values from the keys of their nested form.
+
+    :param widget: The widget to get the value for.
+    :param packed: The packed data of the widget.
+    :param files: Files from the form. These are never packed.
+    :param name: Name of the widget.
+    """
+    root: dict[Any, Any] = {}
+    stack: list[tuple[Any, Any, str, dict[Any, Any], Any]] = [(widget, packed, name, root, None)]
+
+    while stack:
+        current, current_value, current_name, container, key = stack.pop()
+
+        if current is _FINALIZE_ARRAY:
+            container[key] = [current_value[index] for index in sorted(current_value)]
+            continue
+
+        if not _parsed_iteratively(current):
+            data = flatten_packed_data(current_value, current_name)
+            container[key] = current.value_from_datadict(data=data, files=files, name=current_name)
+            continue
+
+        if isinstance(current, NestedFormWidget):
+            stack.extend(_unpack_nested_form(current, current_value, current_name, container, key, files=files))
+        else:
+            stack.extend(_unpack_array(current, current_value, current_name, container, key))
+
+    return root[None]
+
+
+def _unpack_nested_form(
+    widget: NestedFormWidget,
+    packed: Any,
+    name: str,
+    container: dict[Any, Any],
+    key: Any,
+    *,
+    files: MultiValueDict,
+) -> list[tuple[Any, Any, str, dict[Any, Any], Any]]:
+    """Set the values of the leaf widgets of a nested form, and return the tasks for its subforms widgets."""
+    if not isinstance(packed, dict):
+        packed = {}
+    if not packed and not widget.is_required:
+        container[key] = None
+        return []
+
+    # Leaf widgets read their values from the leaf keys of the form, like they would from the form data,
+    # since some of them use several keys, e.g. 'MultiWidget' subclasses.
+    leaf_data = MultiValueDict({
+        f"{name}__{data_key}": value if isinstance(value, list) else [value]
+        for data_key, value in packed.items()
+        if not isinstance(value, dict)
+    })
+
+    tasks: list[tuple[Any, Any, str, dict[Any, Any], Any]] = []
+    results: dict[str, Any] = {}
+    container[key] = results
+    for widget_name, subwidget in widget.widget_map.items():
+        sub_name = f"{name}__{widget_name}"
+        if isinstance(subwidget, (DynamicArrayWidget, NestedFormWidget)):
+            results[widget_name] = None
+            tasks.append((subwidget, packed.get(widget_name), sub_name, results, widget_name))
+        else:
+            results[widget_name] = subwidget.value_from_datadict(data=leaf_data, files=files, name=sub_name)
+    return tasks
+
+
+def _unpack_array(
+    widget: DynamicArrayWidget,
+    packed: Any,
+    name: str,
+    container: dict[Any, Any],
+    key: Any,
+) -> list[tuple[Any, Any, str, dict[Any, Any], Any]]:
+    """Set the values of the flat items of an array, and return the tasks for its nested items."""
+    if not isinstance(packed, dict):
+        packed = {}
+
+    items: dict[int, Any] = {}
+    tasks: list[tuple[Any, Any, str, dict[Any, Any], Any]] = [(_FINALIZE_ARRAY, items, "", container, key)]
+
+    # Like when parsing the form data, items of flat arrays are used as is.
+    if not isinstance(widget.subwidget, (DynamicArrayWidget, NestedFormWidget)):
+        for index, value in packed.items():
+            if index.isdecimal():
+                items[int(index)] = value[-1] if isinstance(value, list) else value
+        return tasks
+
+    for index, value in packed.items():
+        if index.isdecimal():
+            items[int(index)] = None
+            tasks.append((widget.subwidget, value, f"{name}__{index}", items, int(index)))
+    return tasks
+
+
+def flatten_packed_data(packed: Any, name: str) -> MultiValueDict:
+    """Convert packed data back to form data keys, for widgets that parse their values from the form data."""
+    data = MultiValueDict()
+    stack: list[tuple[Any, str]] = [(packed, name)]
+    while stack:
+        value, key = stack.pop()
+        if isinstance(value, dict):
+            stack.extend((sub_value, f"{key}__{sub_key}") for sub_key, sub_value in value.items())
+        else:
+            data.setlist(key, value if isinstance(value, list) else [value])
+    return data
+
+
+def _parsed_iteratively(widget: forms.Widget) -> bool:
+    value_from_datadict = getattr(type(widget), "value_from_datadict", None)
+    return value_from_datadict in {DynamicArrayWidget.value_from_datadict, NestedFormWidget.value_from_datadict}
+
+
+def iter_leaf_widgets(widget: forms.Widget) -> Generator[forms.Widget, None, None]:
+    """
+    Iterate all widgets in the given subforms widget's tree that are not subforms widgets themselves.
+
+    Each form class is visited only once, so that recursive forms don't build their whole
+    widget tree up to the maximum depth. A form referring to itself cannot add new widgets.
+
+    :param widget: The subforms widget whose tree to iterate.
+    """
+    seen: set[type[forms.Form]] = set()
+    stack: list[forms.Widget] = [widget]
+    while stack:
+        current = stack.pop()
+
+        if isinstance(current, DynamicArrayWidget):
+            stack.append(current.subwidget)
+            continue
+
+        if isinstance(current, NestedFormWidget):
+            if current.form_class in seen:
+                continue
+            seen.add(current.form_class)
+            stack.extend(reversed(current.widget_map.values()))
+            continue
 
-        return subwidgets
+        yield current
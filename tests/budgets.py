@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import cProfile
+import dataclasses
+import gc
+import pstats
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from subforms.management.utils import profile_phases
+from subforms.synthetic import SyntheticData, form_data
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django import forms
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Measurement:
+    """Resources used by one run of a phase."""
+
+    calls: int
+    """Number of Python function calls, counted with 'cProfile'. Unlike wall time, this doesn't depend on the machine."""
+    peak_memory: int
+    """Peak memory use in bytes, traced with 'tracemalloc'."""
+    objects: int
+    """Number of objects tracked by the garbage collector that are still alive after the phase, including its result."""
+    queries: int
+    """Number of database queries."""
+
+
+def measure(phase: Callable[[], Any]) -> Measurement:
+    """
+    Measure the resources used by the given phase.
+
+    The phase is run once to warm up caches and load templates, and then separately for each
+    measurement, so that 'cProfile' and 'tracemalloc' don't affect the other measurements.
+
+    :param phase: Function running the phase.
+    """
+    phase()
+
+    profile = cProfile.Profile()
+    profile.runcall(phase)
+    calls = pstats.Stats(profile).total_calls
+
+    gc.collect()
+    before = len(gc.get_objects())
+    with CaptureQueriesContext(connection) as queries:
+        result = phase()
+    gc.collect()
+    objects = len(gc.get_objects()) - before
+    del result
+
+    tracemalloc.start()
+    try:
+        phase()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(calls=calls, peak_memory=peak_memory, objects=objects, queries=len(queries))
+
+
+def measure_phases(form_class: type[forms.BaseForm], **options: Any) -> dict[str, Measurement]:
+    """
+    Measure instantiating, parsing, cleaning and rendering the given form with synthetic data.
+
+    :param form_class: The form to measure.
+    :param options: Options for the synthetic data, see 'SyntheticData'.
+    :returns: Measurements by phase, see 'profile_phases'.
+    """
+    values = SyntheticData(**options).form_values(form_class)
+    data = form_data(form_class, values)
+    return {name: measure(phase) for name, phase in profile_phases(form_class, values, data).items()}
+
+
+def assert_scales(
+    small: Measurement,
+    large: Measurement,
+    *,
+    factor: float,
+    degree: int = 1,
+    slack: float = 1.5,
+) -> None:
+    """
+    Assert that the resources used by a phase grow at most polynomially with the size of its input.
+
+    E.g. with 'degree=1', the phase must use at most 'factor' times the resources for an input
+    'factor' times larger, O(n), and with 'degree=0' the same resources, O(1).
+    Database queries are compared exactly, and the other measurements with the given slack for caches
+    and other constant overhead.
+
+    :param small: Measurement with the smaller input.
+    :param large: Measurement with the larger input.
+    :param factor: How many times larger the larger input is.
+    :param degree: Degree of the allowed growth.
+    :param slack: Allowed ratio over the budget for function calls, memory use and objects.
+    """
+    growth = factor**degree
+    # Constant overhead is counted in the budget too, so it can only make the assertions looser.
+    assert large.queries <= small.queries * growth, f"Queries: {small.queries} -> {large.queries}"
+    assert large.calls <= small.calls * growth * slack, f"Calls: {small.calls} -> {large.calls}"
+    assert large.objects <= max(small.objects, 1) * growth * slack, f"Objects: {small.objects} -> {large.objects}"
+    assert large.peak_memory <= small.peak_memory * growth * slack, (
+        f"Peak memory: {small.peak_memory} -> {large.peak_memory}"
+    )
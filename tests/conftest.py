@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import pytest
 from django.contrib.auth.models import User
 from django.test import Client
 
+from tests.budgets import measure_phases
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from tests.budgets import Measurement
+
 
 @pytest.fixture(scope="session")
 def superuser(django_db_setup, django_db_blocker) -> User:
@@ -26,3 +35,9 @@ def django_client(django_db_blocker, superuser: User) -> Client:
     with django_db_blocker.unblock():
         client.force_login(superuser)
     return client
+
+
+@pytest.fixture
+def measure_form(db) -> Callable[..., dict[str, Measurement]]:
+    """Measure the phases of a form with synthetic data, see 'measure_phases'."""
+    return measure_phases
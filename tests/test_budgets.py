@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import pytest
+from django import forms
+from django.contrib.auth.models import User
+
+from example_project.app.admin import ExampleForm, ThingForm
+from subforms.fields import DynamicArrayField, NestedFormField
+from tests.budgets import Measurement, assert_scales
+
+PHASES = ["instantiate", "parse", "clean", "render"]
+
+
+class UsersForm(forms.Form):
+    users = DynamicArrayField(subfield=forms.ModelChoiceField(queryset=User.objects.all()))
+
+
+class NestedArraysForm(forms.Form):
+    items = DynamicArrayField(subfield=NestedFormField(subform=ExampleForm))
+    nested = NestedFormField(subform=ExampleForm, required=False)
+
+
+def test_budget__thing_form__scales_with_items(measure_form):
+    small = measure_form(ThingForm, width=10)
+    large = measure_form(ThingForm, width=40)
+
+    # Only the values of the fields depend on the number of items, not creating the form.
+    for phase in PHASES:
+        assert_scales(small[phase], large[phase], factor=4, degree=0 if phase == "instantiate" else 1)
+        assert large[phase].queries == 0
+
+
+def test_budget__thing_form__scales_with_nested_items(measure_form):
+    small = measure_form(ThingForm, width=1, array_length=4)
+    large = measure_form(ThingForm, width=1, array_length=16)
+
+    # Arrays are nested two levels deep in 'dict', so it has up to 'array_length' squared items.
+    for phase in PHASES:
+        assert_scales(small[phase], large[phase], factor=4, degree=0 if phase == "instantiate" else 2)
+
+
+def test_budget__nested_arrays__scales_with_items(measure_form):
+    small = measure_form(NestedArraysForm, width=25)
+    large = measure_form(NestedArraysForm, width=100)
+
+    for phase in PHASES:
+        assert_scales(small[phase], large[phase], factor=4, degree=0 if phase == "instantiate" else 1)
+
+
+@pytest.mark.xfail(
+    reason="Known N+1: each item of an array of 'ModelChoiceField' is cleaned and rendered with its own query.",
+    strict=True,
+)
+def test_budget__model_choices__constant_queries(measure_form):
+    User.objects.create_user("user")
+
+    small = measure_form(UsersForm, width=5)
+    large = measure_form(UsersForm, width=20)
+
+    for phase in PHASES:
+        assert_scales(small[phase], large[phase], factor=4, degree=0)
+
+
+def test_budget__instantiate(measure_form):
+    measurement = measure_form(ThingForm, width=10)["instantiate"]
+
+    # Instantiating copies the fields of the form, but not the whole nested form tree.
+    assert measurement.queries == 0
+    assert measurement.objects < 200
+
+
+def test_assert_scales__over_budget():
+    small = Measurement(calls=100, peak_memory=1000, objects=10, queries=1)
+    linear = Measurement(calls=400, peak_memory=4000, objects=40, queries=4)
+    quadratic = Measurement(calls=1600, peak_memory=16000, objects=160, queries=16)
+
+    assert_scales(small, linear, factor=4)
+    assert_scales(small, quadratic, factor=4, degree=2)
+    with pytest.raises(AssertionError, match="Queries: 1 -> 16"):
+        assert_scales(small, quadratic, factor=4)
+    with pytest.raises(AssertionError, match="Queries: 1 -> 4"):
+        assert_scales(small, linear, factor=4, degree=0)
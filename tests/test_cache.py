@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import pytest
+from django import forms
+from django.core.cache import caches
+from django.core.validators import MinLengthValidator
+from django.test import override_settings
+from django.utils import translation
+
+from subforms import widgets
+from subforms.cache import LRUCache, clean_cache, field_signature, render_cache, uncacheable, widget_signature
+from subforms.fields import DynamicArrayField, NestedFormField
+from subforms.widgets import DynamicArrayWidget, NestedFormWidget
+
+CALLS: list[dict] = []
+
+
+class CountingForm(forms.Form):
+    fizz = forms.CharField()
+    buzz = forms.IntegerField()
+
+    def clean(self):
+        CALLS.append(self.cleaned_data)
+        return self.cleaned_data
+
+
+@uncacheable
+def check_remote(value):
+    CALLS.append(value)
+
+
+class RemoteForm(forms.Form):
+    fizz = forms.CharField(validators=[check_remote])
+
+
+class CachedTreeForm(forms.Form):
+    name = forms.CharField()
+    child = NestedFormField(subform="tests.test_cache.CachedTreeForm", required=False, cache_results=True, max_depth=2)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    CALLS.clear()
+    clean_cache.clear()
+    render_cache.clear()
+    caches["default"].clear()
+
+
+@pytest.fixture
+def renders(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    render = widgets._render
+
+    def counting_render(widget, name, *args, **kwargs):
+        calls.append(name)
+        return render(widget, name, *args, **kwargs)
+
+    monkeypatch.setattr(widgets, "_render", counting_render)
+    return calls
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_cache_results__nested():
+    field = NestedFormField(subform=CountingForm, cache_results=True)
+
+    assert field.clean({"fizz": "1", "buzz": "2"}) == {"fizz": "1", "buzz": 2}
+    assert field.clean({"buzz": "2", "fizz": "1"}) == {"fizz": "1", "buzz": 2}
+    assert len(CALLS) == 1
+
+    assert field.clean({"fizz": "1", "buzz": "3"}) == {"fizz": "1", "buzz": 3}
+    assert len(CALLS) == 2
+
+
+def test_cache_results__array():
+    field = DynamicArrayField(subfield=NestedFormField(subform=CountingForm), cache_results=True)
+
+    value = [{"fizz": "1", "buzz": "2"}, {"fizz": "3", "buzz": "4"}]
+    assert field.clean(value) == [{"fizz": "1", "buzz": 2}, {"fizz": "3", "buzz": 4}]
+    assert len(CALLS) == 2
+
+    result = field.clean(value)
+    assert result == [{"fizz": "1", "buzz": 2}, {"fizz": "3", "buzz": 4}]
+    assert len(CALLS) == 2
+
+    # Results can be modified without affecting the cache.
+    result[0]["fizz"] = "foo"
+    assert field.clean(value)[0]["fizz"] == "1"
+
+
+def test_cache_results__errors_not_cached():
+    field = NestedFormField(subform=CountingForm, cache_results=True)
+
+    for _ in range(2):
+        with pytest.raises(forms.ValidationError):
+            field.clean({"fizz": "1", "buzz": "foo"})
+
+    assert len(clean_cache.local) == 0
+
+
+def test_cache_results__uncacheable():
+    field = NestedFormField(subform=RemoteForm, cache_results=True)
+    assert field_signature(field) is None
+
+    field.clean({"fizz": "1"})
+    field.clean({"fizz": "1"})
+
+    assert CALLS == ["1", "1"]
+
+
+def test_cache_results__model_choice_field():
+    from django.contrib.auth.models import User
+
+    class UserForm(forms.Form):
+        user = forms.ModelChoiceField(queryset=User.objects.all())
+
+    field = DynamicArrayField(subfield=NestedFormField(subform=UserForm), cache_results=True)
+    assert field_signature(field) is None
+
+
+def test_cache_results__signature_changes_with_options():
+    field_1 = NestedFormField(subform=CountingForm, cache_results=True)
+    field_2 = NestedFormField(subform=CountingForm, cache_results=True, required=False)
+
+    assert field_signature(field_1) != field_signature(field_2)
+
+
+def test_cache_results__choices():
+    field_1 = DynamicArrayField(subfield=forms.ChoiceField(choices=[("x", "x")]), cache_results=True)
+    field_2 = DynamicArrayField(subfield=forms.ChoiceField(choices=[("y", "y")]), cache_results=True)
+
+    assert field_1.clean(["x"]) == ["x"]
+    with pytest.raises(forms.ValidationError):
+        field_2.clean(["x"])
+
+
+def test_cache_results__validators():
+    field_1 = DynamicArrayField(subfield=forms.CharField(validators=[MinLengthValidator(1)]), cache_results=True)
+    field_2 = DynamicArrayField(subfield=forms.CharField(validators=[MinLengthValidator(5)]), cache_results=True)
+
+    assert field_1.clean(["ab"]) == ["ab"]
+    with pytest.raises(forms.ValidationError):
+        field_2.clean(["ab"])
+
+
+def test_cache_results__signature_changes_with_error_messages():
+    field_1 = DynamicArrayField(subfield=forms.CharField(), cache_results=True)
+    field_2 = DynamicArrayField(subfield=forms.CharField(error_messages={"required": "Fill this."}), cache_results=True)
+
+    assert field_signature(field_1) != field_signature(field_2)
+
+
+def test_cache_results__local_function_validator():
+    def check(value):
+        CALLS.append(value)
+
+    field = DynamicArrayField(subfield=forms.CharField(validators=[check]), cache_results=True)
+    assert field_signature(field) is None
+
+
+def test_cache_results__depth():
+    field = NestedFormField(subform=CachedTreeForm, max_depth=2, cache_results=True)
+
+    field.clean({"name": "a", "child": {"name": "c"}})
+
+    # The same child value is cached at a shallower depth, but is past the depth limit here.
+    with pytest.raises(forms.ValidationError, match="at most 2 levels deep"):
+        field.clean({"name": "a", "child": {"name": "b", "child": {"name": "c"}}})
+
+
+def test_cache_results__django_cache():
+    field = NestedFormField(subform=CountingForm, cache_results=True)
+
+    with override_settings(SUBFORMS={"CLEAN_CACHE_ALIAS": "default"}):
+        field.clean({"fizz": "1", "buzz": "2"})
+        field.clean({"fizz": "1", "buzz": "2"})
+
+    assert len(CALLS) == 1
+    assert len(clean_cache.local) == 0
+
+
+def test_cache_render__nested(renders):
+    widget = NestedFormWidget(form_class=CountingForm, cache_render=True)
+
+    html_1 = widget.render("foo", {"fizz": "1", "buzz": 2})
+    html_2 = widget.render("foo", {"buzz": 2, "fizz": "1"})
+    html_3 = widget.render("foo", {"fizz": "2", "buzz": 2})
+
+    assert html_1 == html_2
+    assert html_1 != html_3
+    assert renders == ["foo", "foo"]
+
+
+def test_cache_render__array(renders):
+    field = DynamicArrayField(
+        subfield=NestedFormField(subform=CountingForm),
+        widget=DynamicArrayWidget(subwidget=NestedFormWidget(form_class=CountingForm), cache_render=True),
+    )
+
+    html_1 = field.widget.render("foo", [{"fizz": "1", "buzz": 2}], attrs={"id": "id_foo"})
+    html_2 = field.widget.render("foo", [{"fizz": "1", "buzz": 2}], attrs={"id": "id_foo"})
+    html_3 = field.widget.render("bar", [{"fizz": "1", "buzz": 2}], attrs={"id": "id_bar"})
+
+    assert html_1 == html_2
+    assert 'name="bar__0__fizz"' in html_3
+    assert renders == ["foo", "bar"]
+
+
+def test_cache_render__not_enabled(renders):
+    widget = NestedFormWidget(form_class=CountingForm)
+
+    widget.render("foo", {"fizz": "1", "buzz": 2})
+    widget.render("foo", {"fizz": "1", "buzz": 2})
+
+    assert renders == ["foo", "foo"]
+
+
+def test_cache_render__language(renders):
+    widget = NestedFormWidget(form_class=CountingForm, cache_render=True)
+
+    with translation.override("en"):
+        widget.render("foo", {"fizz": "1", "buzz": 2})
+    with translation.override("fi"):
+        widget.render("foo", {"fizz": "1", "buzz": 2})
+
+    assert renders == ["foo", "foo"]
+
+
+@override_settings(SUBFORMS={"CLIENT_VALIDATION": True})
+def test_cache_render__field_options(renders):
+    field_1 = DynamicArrayField(subfield=forms.CharField(), widget=DynamicArrayWidget(cache_render=True))
+    field_2 = DynamicArrayField(subfield=forms.CharField(), widget=DynamicArrayWidget(cache_render=True), max_length=2)
+
+    # The constraints of the fields are rendered for validating them in the browser.
+    field_1.widget.render("foo", ["x"])
+    field_2.widget.render("foo", ["x"])
+
+    assert renders == ["foo", "foo"]
+
+
+@pytest.mark.django_db
+def test_cache_render__model_choice_field(renders):
+    from django.contrib.auth.models import User
+
+    class UserForm(forms.Form):
+        user = forms.ModelChoiceField(queryset=User.objects.all())
+
+    widget = NestedFormWidget(form_class=UserForm, cache_render=True)
+    widget.render("foo", {})
+    widget.render("foo", {})
+
+    assert widget_signature(widget) is None
+    assert renders == ["foo", "foo"]
+
+
+def test_cache_render__signature_changes_with_widgets():
+    widget_1 = DynamicArrayWidget(subwidget=forms.TextInput)
+    widget_2 = DynamicArrayWidget(subwidget=forms.Textarea)
+    widget_3 = DynamicArrayWidget(subwidget=forms.TextInput(attrs={"class": "wide"}))
+    widget_4 = DynamicArrayWidget(subwidget=forms.Select(choices=[("a", "A")]))
+    widget_5 = DynamicArrayWidget(subwidget=forms.Select(choices=[("b", "B")]))
+
+    signatures = {widget_signature(widget) for widget in [widget_1, widget_2, widget_3, widget_4, widget_5]}
+
+    assert len(signatures) == 5
+
+
+def test_cache_render__django_cache(renders):
+    widget = NestedFormWidget(form_class=CountingForm, cache_render=True)
+
+    with override_settings(SUBFORMS={"RENDER_CACHE_ALIAS": "default"}):
+        widget.render("foo", {"fizz": "1", "buzz": 2})
+        widget.render("foo", {"fizz": "1", "buzz": 2})
+
+    assert renders == ["foo"]
+    assert len(render_cache.local) == 0
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import array
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+from django import forms
+from django.forms import modelform_factory
+from django.contrib.admin.models import LogEntry
+from django.http import QueryDict
+
+from example_project.app.admin import ThingForm
+from example_project.app.models import Thing
+from subforms.admin import changed_field_labels
+from subforms.fields import DynamicArrayField, NestedFormField, changed_paths
+
+if TYPE_CHECKING:
+    from django.test import Client
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+class ItemForm(forms.Form):
+    name = forms.CharField()
+    amount = forms.IntegerField(required=False)
+
+
+class OrderForm(forms.Form):
+    note = forms.CharField(required=False)
+    items = DynamicArrayField(subfield=NestedFormField(subform=ItemForm))
+
+
+INITIAL = {
+    "note": "",
+    "items": [
+        {"name": "a", "amount": 1},
+        {"name": "b", "amount": 2},
+    ],
+}
+
+
+def test_changed_paths__unchanged():
+    field = NestedFormField(subform=OrderForm)
+    data = {"note": "", "items": [{"name": "a", "amount": "1"}, {"name": "b", "amount": "2"}]}
+
+    # Values are compared with the 'has_changed' of their fields, so '1' is the same as 1 for an 'IntegerField'.
+    assert changed_paths(field, INITIAL, data) == []
+    assert field.has_changed(INITIAL, data) is False
+
+
+def test_changed_paths__changed_values():
+    field = NestedFormField(subform=OrderForm)
+    data = {"note": "x", "items": [{"name": "a", "amount": "1"}, {"name": "c", "amount": "3"}]}
+
+    assert changed_paths(field, INITIAL, data) == [("note",), ("items", 1, "name"), ("items", 1, "amount")]
+    assert changed_paths(field, INITIAL, data, first_only=True) == [("note",)]
+    assert field.has_changed(INITIAL, data) is True
+
+
+def test_changed_paths__added_and_removed_items():
+    field = DynamicArrayField(subfield=NestedFormField(subform=ItemForm))
+
+    added = [{"name": "a", "amount": "1"}, {"name": "b", "amount": "2"}, {"name": "c", "amount": "3"}]
+    removed = [{"name": "b", "amount": "2"}]
+    # Items without values are removed, so adding one is not a change.
+    empty = [{"name": "a", "amount": "1"}, {"name": "b", "amount": "2"}, {"name": "", "amount": ""}]
+
+    assert changed_paths(field, INITIAL["items"], added) == [(2,)]
+    assert changed_paths(field, INITIAL["items"], empty) == []
+    assert changed_paths(field, INITIAL["items"], removed) == [(0, "name"), (0, "amount"), (1,)]
+
+
+def test_changed_paths__empty_array():
+    field = DynamicArrayField(subfield=NestedFormField(subform=ItemForm))
+
+    # Arrays without items are shown with a single empty item.
+    assert changed_paths(field, [], [{"name": "", "amount": ""}]) == []
+    assert changed_paths(field, None, [{"name": "x", "amount": ""}]) == [(0, "name")]
+    assert changed_paths(field, [{"name": "x", "amount": None}], []) == [(0, "name")]
+
+
+def test_changed_paths__remove_empty_items():
+    field = DynamicArrayField(subfield=forms.CharField(), remove_empty_items=True)
+
+    assert changed_paths(field, ["a"], ["", "a", ""]) == []
+    assert changed_paths(field, ["a"], ["", "b"]) == [(0,)]
+
+
+def test_changed_paths__compact_array():
+    field = DynamicArrayField(subfield=forms.IntegerField(), compact=True)
+
+    assert changed_paths(field, array.array("q", [1, 2]), ["1", "2"]) == []
+    assert changed_paths(field, array.array("q", [1, 2]), ["1", "3"]) == [(1,)]
+
+
+def test_changed_paths__disabled():
+    class Form(forms.Form):
+        name = forms.CharField(disabled=True)
+
+    field = NestedFormField(subform=Form)
+
+    assert changed_paths(field, {"name": "a"}, {"name": "b"}) == []
+
+
+def test_changed_paths__not_nested_data():
+    field = NestedFormField(subform=ItemForm)
+
+    assert changed_paths(field, {"name": "a"}, "not a dict") == [()]
+
+
+def test_changed_field_labels():
+    thing = Thing(
+        nested={"foo": "1", "bar": {"fizz": "2", "buzz": 3}},
+        array=[{"foo": "4", "bar": {"fizz": "5", "buzz": 6}}],
+        dict={"foo": 7, "bar": [{"foo": 8, "bar": [{"fizz": "9", "buzz": 10}]}]},
+        required=[{"fizz": "11", "buzz": "12"}],
+    )
+    data = QueryDict(
+        "nested__foo=1&nested__bar__fizz=2&nested__bar__buzz=3"
+        "&array__0__foo=4&array__0__bar__fizz=5&array__0__bar__buzz=7"
+        "&array__1__foo=x&array__1__bar__fizz=y&array__1__bar__buzz=1"
+        "&dict__foo=7&dict__bar__0__foo=8&dict__bar__0__bar__0__fizz=changed&dict__bar__0__bar__0__buzz=10"
+        "&required__0__fizz=11&required__0__buzz=12",
+    )
+
+    form = ThingForm(data=data, instance=thing)
+
+    assert form.changed_data == ["array", "dict"]
+    assert changed_field_labels(form) == ["Array: 0.bar.buzz", "Array: 1", "Dict: bar.0.bar.0.fizz"]
+
+
+def test_admin_change_message(django_client: Client):
+    thing = Thing.objects.create(
+        nested={"foo": "1", "bar": {"fizz": "2", "buzz": 3}},
+        array=[{"foo": "4", "bar": {"fizz": "5", "buzz": 6}}],
+        dict={"foo": 7, "bar": [{"foo": 8, "bar": [{"fizz": "9", "buzz": 10}]}]},
+        required=[{"fizz": "11", "buzz": "12"}],
+    )
+    data = {
+        "nested__foo": "changed",
+        "nested__bar__fizz": "2",
+        "nested__bar__buzz": "3",
+        "array__0__foo": "4",
+        "array__0__bar__fizz": "5",
+        "array__0__bar__buzz": "6",
+        "dict__foo": "7",
+        "dict__bar__0__foo": "8",
+        "dict__bar__0__bar__0__fizz": "9",
+        "dict__bar__0__bar__0__buzz": "10",
+        "required__0__fizz": "11",
+        "required__0__buzz": "12",
+    }
+
+    response = django_client.post(f"/admin/app/thing/{thing.id}/change/", data=data)
+
+    assert response.status_code == 302
+    entry = LogEntry.objects.get(object_id=str(thing.id))
+    assert entry.get_change_message() == "Changed Nested: foo."
+
+
+def test_changed_paths__string_initial():
+    field = NestedFormField(subform=OrderForm)
+    array_field = DynamicArrayField(subfield=NestedFormField(subform=ItemForm))
+    data = {"note": "", "items": [{"name": "a", "amount": "1"}, {"name": "b", "amount": "2"}]}
+
+    # E.g. from a hidden initial input.
+    initial = '{"note": "", "items": [{"name": "a", "amount": 1}, {"name": "b", "amount": 2}]}'
+    assert changed_paths(field, initial, data) == []
+    assert changed_paths(field, "{}", data) == [("items", 0, "name"), ("items", 0, "amount"), ("items", 1)]
+    assert changed_paths(array_field, "[]", []) == []
+    assert changed_paths(array_field, "{}", []) == []
+    assert changed_paths(field, "not json", data) == [()]
+
+
+def test_changed_data__hidden_initial():
+    form_class = modelform_factory(
+        Thing,
+        fields=["nested", "array", "dict", "required"],
+        formfield_callback=lambda model_field, **kwargs: model_field.formfield(show_hidden_initial=True, **kwargs),
+    )
+    thing = Thing.objects.create(
+        nested={"foo": "1", "bar": {"fizz": "2", "buzz": 3}},
+        array=[{"foo": "4", "bar": {"fizz": "5", "buzz": 6}}],
+        dict={"foo": 7, "bar": [{"foo": 8, "bar": [{"fizz": "9", "buzz": 10}]}]},
+        required=[{"fizz": "a", "buzz": "b"}],
+    )
+
+    soup = BeautifulSoup(str(form_class(instance=thing)), features="html.parser")
+    data = {element["name"]: element.get("value", "") for element in soup.find_all("input")}
+    assert data["initial-array"] == '[{"foo":"4","bar":{"fizz":"5","buzz":6}}]'
+
+    # The initial values are taken from the hidden inputs, not from the instance.
+    assert form_class(data=data).changed_data == []
+    assert form_class(data={**data, "array__0__bar__fizz": "x"}).changed_data == ["array"]
+
+    # Callable defaults, e.g. 'default=dict', are rendered as JSON too.
+    soup = BeautifulSoup(str(form_class()), features="html.parser")
+    assert soup.find(attrs={"name": "initial-nested"})["value"] == "{}"
+    assert form_class(data={"initial-nested": "{}", "nested__foo": "1"}).changed_data == ["nested"]
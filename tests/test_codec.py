@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import array
+import datetime
+import decimal
+import json
+import sys
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from subforms import codec
+from subforms.encoders import SubformsJSONEncoder
+from subforms.utils import form_dataclass
+from tests.test_form import TreeForm
+
+VALUE = {
+    "name": "foo",
+    "items": [{"count": 1, "price": decimal.Decimal("1.50")}, {"count": 2, "price": None}],
+    "series": array.array("q", [1, 2, 3]),
+    "node": form_dataclass(TreeForm, ("name", "child"))("bar", None),
+    "created": datetime.datetime(2024, 1, 1, 12, 30, 0, 123456, tzinfo=datetime.UTC),
+    "times": [datetime.time(12, 30, 0, 123456), datetime.timedelta(days=1, seconds=5)],
+}
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgspec"])
+def test_codec(name):
+    pytest.importorskip(name)
+
+    with override_settings(SUBFORMS={"JSON_CODEC": name}):
+        assert codec.get_codec().name == name
+        data = codec.dumps(VALUE)
+
+    # Same JSON as with the encoder used for model fields, apart from whitespace.
+    assert data == json.dumps(VALUE, cls=SubformsJSONEncoder, separators=(",", ":"))
+    assert json.loads(data)["created"] == "2024-01-01T12:30:00.123Z"
+
+    with override_settings(SUBFORMS={"JSON_CODEC": name}):
+        assert codec.loads(data) == json.loads(data)
+        assert codec.loads(data.encode()) == json.loads(data)
+
+
+class Opaque:
+    def __str__(self):
+        return "opaque"
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgspec"])
+def test_codec__canonical_dumps(name):
+    pytest.importorskip(name)
+
+    value = {"b": [Opaque(), 1.5], "a": {"d": VALUE["node"], "c": decimal.Decimal("2.0")}, "e": {2: 1, 1: 2}}
+    reordered = {"e": {1: 2, 2: 1}, "a": {"c": decimal.Decimal("2.0"), "d": VALUE["node"]}, "b": [Opaque(), 1.5]}
+
+    with override_settings(SUBFORMS={"JSON_CODEC": name}):
+        data = codec.canonical_dumps(value)
+        assert codec.canonical_dumps(reordered) == data
+
+    # Keys are sorted, and values that can't be encoded are encoded by their string form.
+    assert data == '{"a":{"c":"2.0","d":{"child":null,"name":"bar"}},"b":["opaque",1.5],"e":{"1":2,"2":1}}'
+
+
+def test_codec__auto():
+    expected = "json"
+    for name in ("orjson", "msgspec"):
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        expected = name
+        break
+
+    assert codec.get_codec().name == expected
+
+
+def test_codec__auto__nothing_installed(monkeypatch):
+    codec._get_codec.cache_clear()
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+
+    try:
+        assert codec.get_codec().name == "json"
+    finally:
+        codec._get_codec.cache_clear()
+
+
+def test_codec__not_installed(monkeypatch):
+    codec._get_codec.cache_clear()
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+
+    try:
+        with override_settings(SUBFORMS={"JSON_CODEC": "msgspec"}), pytest.raises(ImproperlyConfigured):
+            codec.get_codec()
+    finally:
+        codec._get_codec.cache_clear()
+
+
+def test_codec__invalid():
+    with override_settings(SUBFORMS={"JSON_CODEC": "foo"}), pytest.raises(ImproperlyConfigured):
+        codec.get_codec()
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import pickle
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from example_project.app.models import Thing
+from subforms.model_fields import LazyJSON
+from subforms.validation import clean_fields, error_paths
+from example_project.app.admin import ExampleForm, ThingForm
+from subforms.fields import DynamicArrayField, NestedFormField
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+VALID = {
+    "nested": {"foo": "1", "bar": {"fizz": "2", "buzz": 3}},
+    "array": [{"foo": "4", "bar": {"fizz": "5", "buzz": 6}}],
+    "dict": {"foo": 1, "bar": [{"foo": 2, "bar": [{"fizz": "x", "buzz": 1}]}]},
+    "required": [{"fizz": "a", "buzz": "b"}],
+}
+
+
+def test_error_paths():
+    field = DynamicArrayField(subfield=NestedFormField(subform=ExampleForm), max_length=2)
+    value = [
+        {"foo": "1", "bar": {"fizz": "2", "buzz": 3}},
+        {"foo": "", "bar": {"fizz": "2", "buzz": "x"}},
+        {"foo": "3", "bar": {"fizz": "", "buzz": 3}},
+    ]
+
+    assert error_paths(field, value) == {
+        (): ["Ensure there are 2 or fewer items (currently 3)."],
+        (1, "foo"): ["This field is required."],
+        (1, "bar", "buzz"): ["Enter a whole number."],
+        (2, "bar", "fizz"): ["This field is required."],
+    }
+    assert error_paths(field, value[:1]) == {}
+
+
+def test_lazy_json__pickle():
+    Thing.objects.create(**VALID)
+
+    thing = Thing.objects.get()
+    value = pickle.loads(pickle.dumps(thing.nested))
+    assert isinstance(value, LazyJSON)
+    assert not value.is_decoded
+    assert value == VALID["nested"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_revalidate_subforms(tmp_path, capsys, workers):
+    valid = Thing.objects.create(**VALID)
+    invalid_nested = Thing.objects.create(**{**VALID, "nested": {"foo": "1", "bar": {"fizz": "2", "buzz": "x"}}})
+    invalid_array = Thing.objects.create(**{**VALID, "required": [{"fizz": "a", "buzz": "b"}, {"fizz": "raise"}]})
+
+    output = tmp_path / "report.jsonl"
+    call_command(
+        "revalidate_subforms",
+        "example_project.app.admin.ThingForm",
+        "--chunk-size=2",
+        f"--workers={workers}",
+        f"--output={output}",
+    )
+
+    report = [json.loads(line) for line in output.read_text().splitlines()]
+    assert report == [
+        {"pk": invalid_nested.pk, "errors": {"nested.bar.buzz": ["Enter a whole number."]}},
+        {
+            "pk": invalid_array.pk,
+            "errors": {"required.1.buzz": ["This field is required."], "required.1.fizz": ["This value is not allowed"]},
+        },
+    ]
+    assert valid.pk not in {row["pk"] for row in report}
+    assert "Checked 3 rows of app.Thing, 2 invalid." in capsys.readouterr().err
+
+
+def test_revalidate_subforms__not_a_model_form():
+    with pytest.raises(CommandError, match="is not a model form"):
+        call_command("revalidate_subforms", "example_project.app.admin.ExampleForm")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_import_subforms(tmp_path, capsys, workers):
+    records = [
+        VALID,
+        {**VALID, "nested": {"foo": "1", "bar": {"fizz": "2", "buzz": "x"}}},
+        {**VALID, "array": [{"foo": "2", "bar": {"fizz": "3", "buzz": 4}}]},
+    ]
+    lines = [json.dumps(record) for record in records]
+    lines.insert(2, "")
+    lines.append("{not json")
+    lines.append("[]")
+
+    file = tmp_path / "things.ndjson"
+    file.write_text("\n".join(lines) + "\n")
+    rejects = tmp_path / "rejects.ndjson"
+
+    call_command(
+        "import_subforms",
+        "example_project.app.admin.ThingForm",
+        str(file),
+        "--chunk-size=2",
+        "--batch-size=1",
+        f"--workers={workers}",
+        f"--rejects={rejects}",
+    )
+
+    things = list(Thing.objects.order_by("pk"))
+    assert len(things) == 2
+    assert things[0].nested == VALID["nested"]
+    assert things[0].required == [{"fizz": "a!", "buzz": "b!"}]
+    assert things[1].array == [{"foo": "2", "bar": {"fizz": "3", "buzz": 4}}]
+
+    report = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert [(row["line"], row["errors"]) for row in report] == [
+        (2, {"nested.bar.buzz": ["Enter a whole number."]}),
+        (5, {"": [report[1]["errors"][""][0]]}),
+        (6, {"": ["Record must be a JSON object."]}),
+    ]
+    assert report[0]["record"] == lines[1]
+    assert report[1]["errors"][""][0].startswith("Invalid JSON:")
+    assert "Imported 2 records to app.Thing, rejected 3." in capsys.readouterr().err
+
+
+def test_generate_subforms(capsys):
+    call_command("generate_subforms", "example_project.app.admin.ThingForm", "--rows=5", "--workers=1", "--width=2")
+
+    things = list(Thing.objects.order_by("pk"))
+    assert len(things) == 5
+    assert all(len(thing.array) == 2 for thing in things)
+    assert all(thing.nested and thing.required for thing in things)
+    assert "Inserted 5 rows to app.Thing." in capsys.readouterr().err
+
+
+def test_generate_subforms__same_rows_regardless_of_workers():
+    def generate(workers):
+        call_command(
+            "generate_subforms",
+            "example_project.app.admin.ThingForm",
+            "--rows=7",
+            "--chunk-size=3",
+            "--batch-size=2",
+            "--seed=3",
+            f"--workers={workers}",
+        )
+        rows = list(Thing.objects.order_by("pk").values("nested", "array", "dict", "required"))
+        Thing.objects.all().delete()
+        return rows
+
+    assert generate(1) == generate(2)
+
+
+def test_generate_subforms__invalid():
+    call_command(
+        "generate_subforms",
+        "example_project.app.admin.ThingForm",
+        "--rows=10",
+        "--workers=1",
+        "--invalid=1",
+    )
+
+    fields = ThingForm.base_fields
+    for thing in Thing.objects.all():
+        values = {name: getattr(thing, name) for name in ["nested", "array", "dict", "required"]}
+        assert clean_fields(fields, values)[1]
+
+
+def test_generate_subforms__invalid_share():
+    with pytest.raises(CommandError, match="'--invalid' must be between 0 and 1."):
+        call_command("generate_subforms", "example_project.app.admin.ThingForm", "--invalid=2")
+
+
+def test_profile_subforms(capsys):
+    call_command("profile_subforms", "example_project.app.admin.ThingForm", "--width=3", "--top=3")
+
+    output = capsys.readouterr().out
+    assert output.startswith("Profiling example_project.app.admin.ThingForm with ")
+    for phase in ("instantiate", "parse", "clean", "render"):
+        assert f"\n{phase}: " in output
+    assert "peak memory" in output
+    assert "Ordered by: cumulative time" in output
+
+
+def test_profile_subforms__phase(capsys):
+    call_command("profile_subforms", "example_project.app.admin.ExampleForm", "--phase=clean", "--sort=tottime")
+
+    output = capsys.readouterr().out
+    assert "\nclean: " in output
+    assert "\nparse: " not in output
+    assert "Ordered by: internal time" in output
+
+
+@pytest.mark.parametrize("form_path", ["example_project.app.admin.missing", "example_project.app.models.Thing"])
+def test_profile_subforms__not_a_form(form_path):
+    with pytest.raises(CommandError):
+        call_command("profile_subforms", form_path)
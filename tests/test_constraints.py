@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from bs4 import BeautifulSoup
+from django import forms
+from django.test import override_settings
+
+from example_project.app.admin import ThingForm
+from subforms.constraints import describe_constraints, describe_field
+from subforms.fields import DynamicArrayField, NestedFormField
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+class ItemForm(forms.Form):
+    name = forms.CharField(max_length=10)
+    amount = forms.DecimalField(min_value=0, max_value=100, required=False)
+    kind = forms.ChoiceField(choices=[("", "---"), ("a", "A"), ("Group", [("b", "B")])])
+
+
+class TreeForm(forms.Form):
+    label = forms.CharField(min_length=2)
+    children = DynamicArrayField(subfield=NestedFormField(subform=lambda: TreeForm), required=False)
+
+
+class ListForm(forms.Form):
+    items = DynamicArrayField(subfield=NestedFormField(subform=ItemForm), max_length=3)
+    tags = DynamicArrayField(subfield=forms.CharField(), remove_empty_items=True)
+    extra = NestedFormField(subform=ItemForm, required=False)
+
+
+def test_describe_constraints__nested_form():
+    form = ListForm()
+
+    constraints = describe_constraints(form.fields["extra"].widget)
+
+    assert constraints == {
+        "root": {"form": 0},
+        "forms": [
+            {
+                "name": {
+                    "required": "This field is required.",
+                    "strip": True,
+                    "max_length": [10, "Ensure this value has at most 10 characters (it has %(show_value)s)."],
+                },
+                "amount": {
+                    "number": "Enter a number.",
+                    "max_value": [100, "Ensure this value is less than or equal to 100."],
+                    "min_value": [0, "Ensure this value is greater than or equal to 0."],
+                },
+                "kind": {
+                    "required": "This field is required.",
+                    "choices": [["a", "b"], "Select a valid choice. %(value)s is not one of the available choices."],
+                },
+            },
+        ],
+    }
+
+
+def test_describe_constraints__array():
+    form = ListForm()
+
+    items = describe_constraints(form.fields["items"].widget)
+    tags = describe_constraints(form.fields["tags"].widget)
+
+    assert items["root"] == {
+        "array": {"form": 0, "optional": True},
+        "required": "This field is required.",
+        "max_length": [3, "Ensure there are 3 or fewer items (currently %(items)s)."],
+    }
+    assert list(items["forms"][0]) == ["name", "amount", "kind"]
+    # Empty items, including items of nested forms without values, are removed, so they don't need to be filled.
+    assert tags == {"root": {"array": {"strip": True}, "required": "This field is required."}, "forms": []}
+
+
+def test_describe_constraints__optional_nested_form():
+    form = ListForm()
+
+    constraints = describe_constraints(form.fields["extra"].widget)
+    array_constraints = describe_constraints(DynamicArrayField(subfield=form.fields["extra"]).widget)
+
+    # The root of a nested form field is always filled, but nested forms in other fields can be left empty.
+    assert constraints["root"] == {"form": 0}
+    assert array_constraints["root"]["array"] == {"form": 0, "optional": True}
+
+
+def test_describe_constraints__not_subforms_widget():
+    form = ListForm()
+
+    assert describe_constraints(forms.TextInput()) is None
+    assert describe_constraints(form.fields["items"].widget.subwidget.subform.fields["name"].widget) is None
+
+
+def test_describe_constraints__recursive_form():
+    field = NestedFormField(subform=TreeForm)
+
+    constraints = describe_constraints(field.widget)
+
+    # The form refers to itself, so it's described only once.
+    assert constraints["root"] == {"form": 0}
+    assert len(constraints["forms"]) == 1
+    assert constraints["forms"][0]["children"] == {"array": {"form": 0, "optional": True}}
+    assert constraints["forms"][0]["label"]["min_length"][0] == 2
+
+
+def test_describe_constraints__thing_form():
+    form = ThingForm()
+
+    constraints = describe_constraints(form.fields["dict"].widget)
+
+    # SubArrayForm -> NestedArrayForm -> FizzBuzzForm
+    assert constraints["root"] == {"form": 0}
+    assert constraints["forms"][0]["bar"]["array"] == {"form": 1, "optional": True}
+    assert constraints["forms"][1]["bar"]["array"] == {"form": 2, "optional": True}
+    assert constraints["forms"][2] == {
+        "fizz": {"required": "This field is required.", "strip": True},
+        "buzz": {"required": "This field is required.", "integer": "Enter a whole number."},
+    }
+
+
+def test_describe_field__multiple_choice_and_disabled():
+    multiple = forms.MultipleChoiceField(choices=[(1, "One"), (2, "Two")])
+    disabled = forms.CharField(max_length=5, disabled=True)
+
+    assert describe_field(multiple)["choices"][0] == ["1", "2"]
+    assert describe_field(multiple)["multiple"] is True
+    assert describe_field(disabled) == {}
+
+
+def test_describe_constraints__array_widget_copied_with_form():
+    first = ListForm()
+    second = ListForm()
+
+    assert first.fields["items"].widget.array_field is first.fields["items"]
+    assert second.fields["items"].widget.array_field is second.fields["items"]
+
+
+@override_settings(SUBFORMS={"CLIENT_VALIDATION": True})
+def test_form__render__constraints():
+    html = ThingForm().as_p()
+
+    soup = BeautifulSoup(html, features="html.parser")
+    described = soup.find_all(attrs={"data-subforms-constraints": True})
+
+    # Only the widgets of the form fields describe their constraints, not the widgets nested inside them.
+    assert [element["data-subforms-name"] for element in described] == ["nested", "array", "dict", "required"]
+    constraints = json.loads(described[0]["data-subforms-constraints"])
+    assert constraints["root"] == {"form": 0}
+    assert constraints["forms"][0]["bar"] == {"form": 1}
+
+
+def test_form__render__constraints__disabled_by_default():
+    html = ThingForm().as_p()
+
+    soup = BeautifulSoup(html, features="html.parser")
+
+    assert soup.find_all(attrs={"data-subforms-constraints": True}) == []
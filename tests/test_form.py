@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+import array
 import dataclasses
+import json
+import pickle
+import sys
 from typing import TYPE_CHECKING, Any
 
 import pytest
 from bs4 import BeautifulSoup
 from django import forms
 from django.contrib.admin.helpers import AdminForm
+from django.core.exceptions import ImproperlyConfigured
 from django.http import HttpResponse, QueryDict
+from django.test import override_settings
 
 from example_project.app.admin import ThingForm
 from example_project.app.models import Thing
+from subforms.encoders import SubformsJSONEncoder
 from subforms.fields import DynamicArrayField, NestedFormField
+from subforms.widgets import DynamicArrayWidget, NestedFormWidget
 
 if TYPE_CHECKING:
     from bs4 import Tag
@@ -172,6 +180,26 @@ def test_admin_form_add(django_client):
     get_required_field(form)
 
 
+def test_admin_form__array_controls(django_client):
+    result: HttpResponse = django_client.get("/admin/app/thing/add/", follow=True)  # type: ignore[assignment]
+
+    soup = BeautifulSoup(result.content, features="html.parser")
+    form = soup.find(name="form", attrs={"id": "thing_form"})
+    assert form is not None
+
+    # Controls are handled by a delegated listener, not by inline handlers.
+    assert form.find(attrs={"onclick": True}) is None
+
+    arrays = form.find_all(name="div", attrs={"class": "dynamic-array"})
+    add_links = form.find_all(attrs={"data-subforms-add": True})
+    assert len(arrays) > 1
+    assert sorted(link["data-subforms-add"] for link in add_links) == sorted(array["id"] for array in arrays)
+
+    items = form.find_all(name="li", attrs={"class": "dynamic-array-item"})
+    for item in items:
+        assert item.find(attrs={"data-subforms-remove": True}, recursive=False) is not None
+
+
 def test_admin_form__edit(django_client):
     thing = Thing.objects.create(
         nested={
@@ -306,6 +334,150 @@ def test_form__missing__all():
     }
 
 
+def pack_form_data(data: dict[str, list[str]], *names: str) -> QueryDict:
+    """Pack the form data of the given fields the same way as 'subforms.js'."""
+    form_data = QueryDict(mutable=True)
+    packed: dict[str, dict[str, Any]] = {name: {} for name in names}
+
+    for key, values in data.items():
+        name = next((name for name in names if key.startswith(f"{name}__")), None)
+        if name is None:
+            form_data.setlist(key, values)
+            continue
+
+        *parts, last_part = key.removeprefix(f"{name}__").split("__")
+        container = packed[name]
+        for part in parts:
+            container = container.setdefault(part, {})
+        container[last_part] = values[0] if len(values) == 1 else values
+
+    for name, value in packed.items():
+        form_data[f"{name}:packed"] = json.dumps(value)
+    return form_data
+
+
+@override_settings(SUBFORMS={"PACK_DATA": True})
+def test_form__packed_data():
+    data = {
+        "nested__foo": ["1"],
+        "nested__bar__fizz": ["2"],
+        "nested__bar__buzz": ["3"],
+        "array__0__foo": ["4"],
+        "array__0__bar__fizz": ["5"],
+        "array__0__bar__buzz": ["6"],
+        "array__1__foo": ["4.1"],
+        "array__1__bar__fizz": ["5.1"],
+        "array__1__bar__buzz": ["61"],
+        "dict__foo": ["7"],
+        "dict__bar__0__foo": ["8"],
+        "dict__bar__0__bar__0__fizz": ["9"],
+        "dict__bar__0__bar__0__buzz": ["10"],
+        "required__0__fizz": ["11"],
+        "required__0__buzz": ["12"],
+    }
+
+    form_data = pack_form_data(data, "nested", "array", "dict", "required")
+    assert list(form_data) == ["nested:packed", "array:packed", "dict:packed", "required:packed"]
+
+    form = ThingForm(data=form_data)
+    assert form.is_valid(), form.errors
+
+    assert form.cleaned_data == {
+        "nested": {"foo": "1", "bar": {"buzz": 3, "fizz": "2"}},
+        "array": [
+            {"foo": "4", "bar": {"buzz": 6, "fizz": "5"}},
+            {"foo": "4.1", "bar": {"buzz": 61, "fizz": "5.1"}},
+        ],
+        "dict": {"foo": 7, "bar": [{"foo": 8, "bar": [{"buzz": 10, "fizz": "9"}]}]},
+        "required": [{"buzz": "12!", "fizz": "11!"}],
+    }
+
+
+@override_settings(SUBFORMS={"PACK_DATA": True})
+def test_form__packed_data__missing():
+    form = ThingForm(data=pack_form_data({}, "nested", "array", "dict", "required"))
+
+    assert form.errors == {
+        "array": ["This field is required."],
+        "nested": [
+            "foo: This field is required.",
+            "bar: fizz: This field is required.",
+            "bar: buzz: This field is required.",
+        ],
+        "dict": [
+            "foo: This field is required.",
+            "bar: This field is required.",
+        ],
+        "required": ["This field is required."],
+    }
+
+
+@pytest.mark.parametrize("packed", ["{", "[]", ""])
+@override_settings(SUBFORMS={"PACK_DATA": True})
+def test_form__packed_data__invalid(packed):
+    form_data = QueryDict(mutable=True)
+    form_data["nested:packed"] = packed
+    form_data["nested__foo"] = "1"
+    form_data["nested__bar__fizz"] = "2"
+    form_data["nested__bar__buzz"] = "3"
+
+    # Data that can't be unpacked is read from the separate keys.
+    assert ThingForm.base_fields["nested"].widget.value_from_datadict(form_data, {}, "nested") == {
+        "foo": "1",
+        "bar": {"fizz": "2", "buzz": "3"},
+    }
+
+
+def test_form__packed_data__not_enabled():
+    form_data = pack_form_data({"nested__foo": ["1"]}, "nested")
+    form_data["nested__foo"] = "2"
+
+    assert ThingForm.base_fields["nested"].widget.value_from_datadict(form_data, {}, "nested")["foo"] == "2"
+
+
+def test_form__packed_data__render():
+    assert "data-subforms-packed" not in str(ThingForm()["dict"])
+
+    with override_settings(SUBFORMS={"PACK_DATA": True}):
+        soup = BeautifulSoup(str(ThingForm()["dict"]), features="html.parser")
+
+    packed = soup.find_all(attrs={"data-subforms-packed": True})
+    assert packed[0]["data-subforms-packed"] == "dict"
+    # Subforms fields inside the field are packed with it.
+    assert all(element["data-subforms-packed"].startswith("dict__") for element in packed[1:])
+
+
+class PackedInnerForm(forms.Form):
+    fizz = forms.CharField()
+
+
+class PackedItemForm(forms.Form):
+    inner = NestedFormField(subform=PackedInnerForm, widget=NestedFormWidget(PackedInnerForm, pack_data=True))
+
+
+class PackedItemsForm(forms.Form):
+    items = DynamicArrayField(subfield=NestedFormField(subform=PackedItemForm))
+    packed_items = DynamicArrayField(
+        subfield=NestedFormField(subform=PackedInnerForm, widget=NestedFormWidget(PackedInnerForm, pack_data=True)),
+    )
+
+
+def test_form__packed_data__nested_widget():
+    html = str(PackedItemsForm(initial={"items": [{"inner": {"fizz": "x"}}], "packed_items": [{"fizz": "y"}]}))
+
+    # Nested widgets packed on their own are packed by 'subforms.js', even if their field is not.
+    soup = BeautifulSoup(html, features="html.parser")
+    names = [element["data-subforms-packed"] for element in soup.find_all(attrs={"data-subforms-packed": True})]
+    assert names == ["items__0__inner", "packed_items__0"]
+
+    form_data = pack_form_data(_submitted_data(html), *names)
+    assert list(form_data) == ["items__0__inner:packed", "packed_items__0:packed"]
+
+    form = PackedItemsForm(data=form_data)
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data == {"items": [{"inner": {"fizz": "x"}}], "packed_items": [{"fizz": "y"}]}
+
+
 def test_form__missing__nested_bar_buzz():
     data = {
         #
@@ -402,12 +574,8 @@ def test_form__missing__required():
 
     form = ThingForm(data=form_data)
 
-    assert form.errors == {
-        "required": [
-            "index 0: fizz: This field is required.",
-            "index 0: buzz: This field is required.",
-        ],
-    }
+    # The item has no values, so it's removed, and the required array is empty.
+    assert form.errors == {"required": ["This field is required."]}
 
 
 def test_form__missing__required__raise_error():
@@ -521,6 +689,23 @@ class ExampleForm(forms.Form):
     assert form.errors == {"bar": ["Ensure there are 1 or fewer items (currently 2)."]}
 
 
+def test_form__array__virtualize():
+    class ExampleForm(forms.Form):
+        foo = DynamicArrayField(widget=DynamicArrayWidget(subwidget=forms.NumberInput, virtualize=True))
+        bar = DynamicArrayField()
+
+    form = ExampleForm(initial={"foo": list(range(100)), "bar": [1, 2]})
+    soup = BeautifulSoup(str(form), features="html.parser")
+
+    foo = soup.find(name="div", attrs={"id": "id_foo"})
+    assert foo.has_attr("data-subforms-virtual")
+    # All items are rendered, so that they are sent even without JavaScript.
+    assert len(foo.find_all(name="input")) == 100
+
+    bar = soup.find(name="div", attrs={"id": "id_bar"})
+    assert not bar.has_attr("data-subforms-virtual")
+
+
 def test_form__array_nested():
     class FizzBuzzForm(forms.Form):
         fizz = forms.CharField()
@@ -619,3 +804,491 @@ def test_admin_form():
         "dict": {"foo": "7", "bar": [{"foo": "8", "bar": [{"buzz": "10", "fizz": "9"}]}]},
         "required": [{"buzz": "12", "fizz": "11"}],
     }
+
+
+class MenuForm(forms.Form):
+    label = forms.CharField()
+    children = DynamicArrayField(
+        subfield=NestedFormField(subform="tests.test_form.MenuForm", max_depth=3),
+        required=False,
+    )
+
+
+def test_form__recursive():
+    data = {
+        "label": ["1"],
+        "children__0__label": ["2"],
+        "children__0__children__0__label": ["3"],
+        "children__1__label": ["4"],
+    }
+
+    form_data = QueryDict(mutable=True)
+    for key, value in data.items():
+        form_data.setlist(key, value)
+
+    form = MenuForm(data=form_data)
+    assert form.is_valid(), form.errors
+
+    assert form.cleaned_data == {
+        "label": "1",
+        "children": [
+            {"label": "2", "children": [{"label": "3", "children": []}]},
+            {"label": "4", "children": []},
+        ],
+    }
+
+
+def test_form__recursive__lazy():
+    form = MenuForm()
+
+    widget = form.fields["children"].widget.subwidget
+    assert "widget_map" not in widget.__dict__
+
+    # Widgets are built one level at a time as they are needed.
+    child_widget = widget.widget_map["children"].subwidget
+    assert child_widget.depth == 1
+    assert "widget_map" not in child_widget.__dict__
+
+
+def test_form__recursive__max_depth():
+    form = MenuForm(
+        data={
+            "label": "1",
+            "children": [
+                {
+                    "label": "2",
+                    "children": [
+                        {
+                            "label": "3",
+                            "children": [
+                                {
+                                    "label": "4",
+                                    "children": [{"label": "5", "children": []}],
+                                },
+                            ],
+                        },
+                    ],
+                },
+            ],
+        },
+    )
+
+    assert form.errors == {
+        "children": [
+            "index 0: children: index 0: children: index 0: children: index 0: "
+            "Ensure this value is nested at most 3 levels deep.",
+        ],
+    }
+
+
+def test_form__recursive__render():
+    class TreeForm(forms.Form):
+        name = forms.CharField()
+        child = NestedFormField(subform=lambda: TreeForm, max_depth=2, required=False)
+
+    html = str(TreeForm())
+
+    soup = BeautifulSoup(html, features="html.parser")
+    assert soup.find(name="input", attrs={"name": "name"}) is not None
+    assert soup.find(name="input", attrs={"name": "child__name"}) is not None
+    # Optional nested forms are not rendered deeper than the first level without data.
+    assert soup.find(name="input", attrs={"name": "child__child__name"}) is None
+    assert soup.find(attrs={"data-subforms-placeholder": "child__child"}) is not None
+
+
+def test_form__array__deduplicate():
+    calls: list[str] = []
+
+    def validator(value):
+        calls.append(value)
+        if value == "3":
+            msg = "Value 3 is not allowed"
+            raise forms.ValidationError(msg)
+
+    class ExampleForm(forms.Form):
+        bar = DynamicArrayField(subfield=forms.CharField(validators=[validator]), deduplicate=True)
+
+    form = ExampleForm(data={"bar": ["1", "2", "1", "1", "2"]})
+    assert form.is_valid(), form.errors
+
+    assert form.cleaned_data == {"bar": ["1", "2", "1", "1", "2"]}
+    assert calls == ["1", "2"]
+
+    form = ExampleForm(data={"bar": ["3", "1", "3"]})
+
+    assert form.errors == {"bar": ["index 0: Value 3 is not allowed", "index 2: Value 3 is not allowed"]}
+
+
+def test_form__array__deduplicate__nested():
+    class FizzBuzzForm(forms.Form):
+        fizz = forms.CharField()
+        buzz = forms.IntegerField()
+
+    class ExampleForm(forms.Form):
+        bar = DynamicArrayField(subfield=NestedFormField(subform=FizzBuzzForm), deduplicate=True)
+
+    form = ExampleForm(
+        data={
+            "bar": [
+                {"fizz": "1", "buzz": "2"},
+                {"buzz": "2", "fizz": "1"},
+                {"fizz": "1", "buzz": "x"},
+                {"fizz": "1", "buzz": "x"},
+            ],
+        },
+    )
+
+    assert form.errors == {"bar": ["index 2: buzz: Enter a whole number.", "index 3: buzz: Enter a whole number."]}
+
+    form = ExampleForm(data={"bar": [{"fizz": "1", "buzz": "2"}, {"buzz": "2", "fizz": "1"}]})
+    assert form.is_valid(), form.errors
+
+    # Duplicates are separate objects.
+    assert form.cleaned_data["bar"] == [{"fizz": "1", "buzz": 2}, {"fizz": "1", "buzz": 2}]
+    assert form.cleaned_data["bar"][0] is not form.cleaned_data["bar"][1]
+
+
+def test_form__array__unique_by():
+    class FizzBuzzForm(forms.Form):
+        fizz = forms.CharField()
+        buzz = forms.IntegerField()
+
+    class ExampleForm(forms.Form):
+        bar = DynamicArrayField(subfield=NestedFormField(subform=FizzBuzzForm), unique_by="fizz")
+
+    form = ExampleForm(
+        data={
+            "bar": [
+                {"fizz": "1", "buzz": "2"},
+                {"fizz": "2", "buzz": "2"},
+                {"fizz": "1", "buzz": "3"},
+                {"fizz": "1", "buzz": "4"},
+            ],
+        },
+    )
+
+    assert form.errors == {
+        "bar": [
+            "index 2: Item has the same fizz as the item at index 0.",
+            "index 3: Item has the same fizz as the item at index 0.",
+        ],
+    }
+
+
+def test_form__array__unique_by__multiple_fields():
+    class FizzBuzzForm(forms.Form):
+        fizz = forms.CharField()
+        buzz = forms.IntegerField()
+
+    class ExampleForm(forms.Form):
+        bar = DynamicArrayField(subfield=NestedFormField(subform=FizzBuzzForm), unique_by=("fizz", "buzz"))
+
+    form = ExampleForm(data={"bar": [{"fizz": "1", "buzz": "2"}, {"fizz": "1", "buzz": "3"}]})
+    assert form.is_valid(), form.errors
+
+    form = ExampleForm(data={"bar": [{"fizz": "1", "buzz": "2"}, {"fizz": "1", "buzz": "02"}]})
+    assert form.errors == {"bar": ["index 1: Item has the same fizz, buzz as the item at index 0."]}
+
+
+def test_form__array__unique_by__function():
+    class ExampleForm(forms.Form):
+        bar = DynamicArrayField(unique_by=str.lower)
+
+    form = ExampleForm(data={"bar": ["foo", "bar", "FOO"]})
+
+    assert form.errors == {"bar": ["index 2: Item is a duplicate of the item at index 0."]}
+
+
+def test_form__array__unique_by__not_nested():
+    with pytest.raises(ValueError, match="only be unique by fields for 'NestedFormField' subfields"):
+        DynamicArrayField(subfield=forms.CharField, unique_by="x")
+
+
+def test_form__array__unique_by__unknown_field():
+    class FizzBuzzForm(forms.Form):
+        fizz = forms.CharField()
+
+    with pytest.raises(ValueError, match="Items can't be unique by 'buzz', since 'FizzBuzzForm' has no such fields."):
+        DynamicArrayField(subfield=NestedFormField(subform=FizzBuzzForm), unique_by=("fizz", "buzz"))
+
+
+def test_form__array__unique_by__unknown_field__lazy_form():
+    field = DynamicArrayField(subfield=NestedFormField(subform="tests.test_form.TreeForm"), unique_by="title")
+
+    with pytest.raises(ValueError, match="Items can't be unique by 'title', since 'TreeForm' has no such fields."):
+        field.clean([{"name": "foo"}])
+
+
+class TreeForm(forms.Form):
+    name = forms.CharField()
+    child = NestedFormField(subform="tests.test_form.TreeForm", required=False)
+
+
+@override_settings(SUBFORMS={"MAX_DEPTH": 5000})
+def test_form__deeply_nested():
+    # Deeper than the recursion limit, so this only works if parsing and cleaning are not recursive.
+    depth = sys.getrecursionlimit() + 500
+
+    data: dict[str, Any] = {}
+    value: dict[str, Any] = {"name": str(depth), "child": None}
+    for level in range(depth):
+        data["__".join(["child"] * level + ["name"])] = str(level)
+        value = {"name": str(depth - level - 1), "child": value}
+
+    form = TreeForm(data=data)
+    assert form.is_valid(), form.errors
+
+    cleaned_data = form.cleaned_data
+    for level in range(depth - 1):
+        assert cleaned_data["name"] == str(level)
+        cleaned_data = cleaned_data["child"]
+
+    field = NestedFormField(subform=TreeForm)
+    cleaned_data = field.clean(value)
+    for level in range(depth):
+        assert cleaned_data["name"] == str(level)
+        cleaned_data = cleaned_data["child"]
+
+
+def _submitted_data(html: str) -> dict[str, str]:
+    soup = BeautifulSoup(html, features="html.parser")
+    return {element["name"]: element.get("value", "") for element in soup.find_all("input")}
+
+
+def test_form__recursive__render_and_submit():
+    html = str(TreeForm())
+
+    data = _submitted_data(html)
+    assert set(data) == {"name", "child__name"}
+
+    # The rendered form can be submitted with only the first level filled.
+    form = TreeForm(data={**data, "name": "a"})
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data == {"name": "a", "child": None}
+
+
+def test_form__recursive__render_and_submit__with_data():
+    initial = {"name": "a", "child": {"name": "b", "child": {"name": "c", "child": None}}}
+
+    html = str(TreeForm(initial=initial))
+
+    # Rendered one level deeper than the data, so that another level can be filled in.
+    data = _submitted_data(html)
+    assert set(data) == {"name", "child__name", "child__child__name", "child__child__child__name"}
+    soup = BeautifulSoup(html, features="html.parser")
+    assert soup.find(attrs={"data-subforms-placeholder": "child__child__child__child"}) is not None
+
+    form = TreeForm(data=data)
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data == initial
+
+    form = TreeForm(data={**data, "child__child__child__name": "d"})
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data["child"]["child"]["child"] == {"name": "d", "child": None}
+
+
+class NavigationForm(forms.Form):
+    label = forms.CharField()
+    children = DynamicArrayField(subfield=NestedFormField(subform="tests.test_form.NavigationForm"), required=False)
+
+
+def test_form__recursive_array__render_and_submit():
+    html = str(NavigationForm())
+
+    # Arrays of the form inside an empty item are rendered without items, not down to the depth limit.
+    data = _submitted_data(html)
+    assert set(data) == {"label", "children__0__label"}
+    soup = BeautifulSoup(html, features="html.parser")
+    assert soup.find(id="id_children__0__children").find_all("li") == []
+
+    # The empty item is removed, so the rendered form can be submitted with only the first level filled.
+    form = NavigationForm(data={**data, "label": "a"})
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data == {"label": "a", "children": []}
+
+
+def test_form__recursive_array__render_and_submit__with_data():
+    initial = {"label": "a", "children": [{"label": "b", "children": []}]}
+
+    html = str(NavigationForm(initial=initial))
+
+    data = _submitted_data(html)
+    assert set(data) == {"label", "children__0__label", "children__0__children__0__label"}
+
+    form = NavigationForm(data=data)
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data == initial
+
+    form = NavigationForm(data={**data, "children__0__children__0__label": "c"})
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data["children"][0]["children"] == [{"label": "c", "children": []}]
+
+
+def test_form__array__optional_nested_items():
+    class ItemForm(forms.Form):
+        a = forms.CharField()
+        b = forms.IntegerField(required=False)
+
+    class ListForm(forms.Form):
+        arr = DynamicArrayField(subfield=NestedFormField(subform=ItemForm, required=False))
+
+    form = ListForm(data={"arr__0__a": "x", "arr__0__b": "1", "arr__1__a": "y"})
+
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data == {"arr": [{"a": "x", "b": 1}, {"a": "y", "b": None}]}
+
+
+def test_form__optional_nested__without_data():
+    class ParentForm(forms.Form):
+        name = forms.CharField(required=False)
+        child = NestedFormField(subform=TreeForm, required=False)
+
+    form = ParentForm(data={"name": "x"})
+
+    # Only optional nested forms inside the field are left empty, the field itself is parsed as before.
+    assert form["child"].data == {"name": None, "child": None}
+    # Optional nested forms without any filled values are empty when cleaned.
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data == {"name": "x", "child": None}
+
+    form = ParentForm(data={"child__child__name": "y"})
+    assert form.errors == {"child": ["name: This field is required."]}
+
+
+def test_form__as_dataclass():
+    class ItemForm(forms.Form):
+        name = forms.CharField()
+        count = forms.IntegerField()
+
+    class ListForm(forms.Form):
+        items = DynamicArrayField(subfield=NestedFormField(subform=ItemForm, as_dataclass=True), unique_by="name")
+
+    data = {
+        "items__0__name": "foo",
+        "items__0__count": "1",
+        "items__1__name": "bar",
+        "items__1__count": "2",
+    }
+
+    form = ListForm(data=data)
+    assert form.is_valid(), form.errors
+
+    first, second = form.cleaned_data["items"]
+    assert type(first) is type(second)
+    assert type(first).__name__ == "ItemFormData"
+    assert not hasattr(first, "__dict__")
+    assert (first.name, first.count) == ("foo", 1)
+    assert (second.name, second.count) == ("bar", 2)
+
+    # Saved the same way as dictionaries.
+    assert json.dumps(form.cleaned_data, cls=SubformsJSONEncoder) == json.dumps(
+        {"items": [{"name": "foo", "count": 1}, {"name": "bar", "count": 2}]},
+    )
+
+    # Cleaned values can be used as initial values.
+    html = str(ListForm(initial=form.cleaned_data))
+    assert 'value="foo"' in html
+    assert 'value="2"' in html
+
+
+def test_form__as_dataclass__unique_by():
+    class ItemForm(forms.Form):
+        name = forms.CharField()
+
+    field = DynamicArrayField(subfield=NestedFormField(subform=ItemForm, as_dataclass=True), unique_by="name")
+
+    with pytest.raises(forms.ValidationError) as error:
+        field.clean([{"name": "foo"}, {"name": "foo"}])
+
+    assert error.value.messages == ["index 1: Item has the same name as the item at index 0."]
+
+
+def test_form__as_dataclass__keyword_field_name():
+    # Fields named like keywords can't be declared in a class body.
+    form_class = type("RouteForm", (forms.Form,), {"from": forms.CharField(), "to": forms.CharField()})
+    field = NestedFormField(subform=form_class, as_dataclass=True)
+
+    with pytest.raises(ImproperlyConfigured, match="'from' can't be used as dataclass field names"):
+        field.clean({"from": "a", "to": "b"})
+
+
+def test_form__as_dataclass__key_added_in_clean():
+    class ItemForm(forms.Form):
+        name = forms.CharField()
+
+        def clean(self):
+            cleaned_data = super().clean()
+            cleaned_data["extra-key"] = cleaned_data["name"].upper()
+            return cleaned_data
+
+    value = NestedFormField(subform=ItemForm, as_dataclass=True).clean({"name": "foo"})
+
+    # Keys that can't be dataclass fields are kept in a dictionary.
+    assert value == {"name": "foo", "extra-key": "FOO"}
+
+
+def test_form__as_dataclass__pickle():
+    value = NestedFormField(subform=TreeForm, as_dataclass=True).clean({"name": "foo", "child": None})
+    assert pickle.loads(pickle.dumps(value)) == value
+
+
+def test_form__array__compact():
+    class SeriesForm(forms.Form):
+        ints = DynamicArrayField(subfield=forms.IntegerField, compact=True)
+        floats = DynamicArrayField(subfield=forms.FloatField, compact=True)
+
+    data = {
+        "ints__0": "1",
+        "ints__1": " 2 ",
+        "ints__2": "3",
+        "floats__0": "1.5",
+        "floats__1": "2",
+    }
+
+    form = SeriesForm(data=data)
+    assert form.is_valid(), form.errors
+
+    assert form.cleaned_data["ints"] == array.array("q", [1, 2, 3])
+    assert form.cleaned_data["floats"] == array.array("d", [1.5, 2.0])
+
+    # Saved the same way as lists.
+    assert json.dumps(form.cleaned_data, cls=SubformsJSONEncoder) == json.dumps(
+        {"ints": [1, 2, 3], "floats": [1.5, 2.0]},
+    )
+
+    # Cleaned values can be used as initial values.
+    html = str(SeriesForm(initial=form.cleaned_data))
+    assert 'value="3"' in html
+    assert 'value="1.5"' in html
+
+
+def test_form__array__compact__item_by_item():
+    field = DynamicArrayField(subfield=forms.IntegerField(min_value=0), compact=True)
+    assert field.clean(["1.0", 2]) == array.array("q", [1, 2])
+
+    with pytest.raises(forms.ValidationError) as error:
+        field.clean(["1", "-1", "x"])
+
+    assert error.value.messages == [
+        "index 1: Ensure this value is greater than or equal to 0.",
+        "index 2: Enter a whole number.",
+    ]
+
+    field = DynamicArrayField(subfield=forms.FloatField, compact=True)
+
+    with pytest.raises(forms.ValidationError) as error:
+        field.clean(["1", "nan"])
+
+    assert error.value.messages == ["index 1: Enter a number."]
+
+    field = DynamicArrayField(subfield=forms.IntegerField, compact=True)
+
+    with pytest.raises(forms.ValidationError) as error:
+        field.clean([1, 2**64])
+
+    assert error.value.messages == ["Ensure all items fit in a 64-bit integer."]
+
+
+def test_form__array__compact__unsupported_subfield():
+    with pytest.raises(ValueError, match="Compact arrays are only supported"):
+        DynamicArrayField(subfield=forms.CharField, compact=True)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import django
+import pytest
+from django.db import connection, models
+from django.test.utils import isolate_apps
+
+from example_project.app.models import Thing
+from subforms.checks import check_model_key_paths
+from subforms.indexes import SubformKeyIndex
+from subforms.model_fields import NestedJSONField
+
+
+def test_subform_key_index():
+    index = SubformKeyIndex("nested", "bar__fizz")
+    index.set_name_with_model(Thing)
+    assert index.name.startswith("app_thing_nested_")
+    assert index.name.endswith("_idx")
+    assert len(index.name) <= SubformKeyIndex.max_name_length
+
+    path, args, kwargs = index.deconstruct()
+    assert path == "subforms.indexes.SubformKeyIndex"
+    assert args == ("nested", "bar__fizz")
+    assert kwargs == {"name": index.name}
+    assert index.clone().expressions == index.expressions
+
+    index = SubformKeyIndex("nested", "bar__fizz", name="nested_fizz_gin", gin=True)
+    assert index.deconstruct()[2] == {"name": "nested_fizz_gin", "gin": True}
+
+    sql = str(index.create_sql(Thing, connection.schema_editor()))
+
+    # GIN indexes are only used on PostgreSQL.
+    assert sql.startswith('CREATE INDEX "nested_fizz_gin" ON "app_thing"')
+    assert '$."bar"."fizz"' in sql
+
+
+@pytest.mark.django_db(transaction=True)
+@isolate_apps("example_project.app")
+def test_subform_key_index__query_plan():
+    class Item(models.Model):
+        nested = NestedJSONField(subform="example_project.app.admin.ExampleForm")
+
+        class Meta:
+            app_label = "app"
+            indexes = [SubformKeyIndex("nested", "bar__fizz", name="item_fizz_idx")]
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Item)
+
+    try:
+        Item.objects.create(nested={"foo": "1", "bar": {"fizz": "x", "buzz": 1}})
+
+        if connection.vendor == "postgresql":
+            # The table is tiny, so the planner would scan it anyway unless told not to.
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+            try:
+                assert "item_fizz_idx" in Item.objects.filter(nested__bar__fizz="x").explain()
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute("RESET enable_seqscan")
+        elif connection.vendor == "sqlite":
+            # SQLite gets the key path as a query parameter, so it can't match it to the index.
+            plan = Item.objects.filter(nested__bar__fizz="x").explain()
+            assert "item_fizz_idx" not in plan
+            assert "SCAN" in plan
+
+    finally:
+        with connection.schema_editor() as editor:
+            editor.delete_model(Item)
+
+
+@isolate_apps("example_project.app")
+def test_check_key_paths():
+    class Item(models.Model):
+        nested = NestedJSONField(subform="example_project.app.admin.SubArrayForm")
+        other = NestedJSONField()
+
+        class Meta:
+            app_label = "app"
+            indexes = [
+                SubformKeyIndex("nested", "bar__0__bar__0__fizz", name="valid"),
+                SubformKeyIndex("nested", "bar__0__foo__x", name="too_deep"),
+                SubformKeyIndex("nested", "bar__first__foo", name="not_an_index"),
+                SubformKeyIndex("nested", "fizz", name="missing"),
+                SubformKeyIndex("missing", "fizz", name="missing_field"),
+                SubformKeyIndex("other", "fizz", name="no_subform"),
+            ]
+
+    assert [error.msg for error in check_model_key_paths(Item)] == [
+        "'too_deep' refers to the key path 'bar__0__foo__x', which doesn't exist in 'nested'.",
+        "'not_an_index' refers to the key path 'bar__first__foo', which doesn't exist in 'nested'.",
+        "'missing' refers to the key path 'fizz', which doesn't exist in 'nested'.",
+        "'missing_field' refers to the nonexistent field 'missing'.",
+    ]
+
+
+@pytest.mark.skipif(django.VERSION < (5, 0), reason="Generated fields require Django 5.0+")
+@pytest.mark.django_db(transaction=True)
+@isolate_apps("example_project.app")
+def test_subform_key_field():
+    from subforms.model_fields import SubformKeyField
+
+    class Item(models.Model):
+        nested = NestedJSONField(subform="example_project.app.admin.ExampleForm")
+        fizz = SubformKeyField("nested", "bar__fizz", output_field=models.CharField(max_length=255), db_index=True)
+        buzz = SubformKeyField("nested", "bar__buzz", output_field=models.IntegerField())
+
+        class Meta:
+            app_label = "app"
+
+    assert check_model_key_paths(Item) == []
+
+    _, _, args, kwargs = Item._meta.get_field("fizz").deconstruct()
+    assert args == ()
+    assert kwargs["field_name"] == "nested"
+    assert kwargs["path"] == "bar__fizz"
+    assert "expression" not in kwargs
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Item)
+
+    try:
+        Item.objects.create(nested={"foo": "1", "bar": {"fizz": "x", "buzz": 1}})
+        Item.objects.create(nested={"foo": "2", "bar": {"fizz": "y", "buzz": 2}})
+
+        item = Item.objects.get(fizz="y")
+        assert (item.fizz, item.buzz) == ("y", 2)
+        assert list(Item.objects.filter(buzz__gte=1).order_by("-buzz").values_list("fizz", flat=True)) == ["y", "x"]
+
+        if connection.vendor == "sqlite":
+            assert "USING INDEX" in Item.objects.filter(fizz="y").explain()
+
+    finally:
+        with connection.schema_editor() as editor:
+            editor.delete_model(Item)
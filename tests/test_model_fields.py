@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pytest
+from bs4 import BeautifulSoup
+from django.db.models import F
+from django.forms import modelform_factory
+
+from example_project.app.admin import ThingForm
+from example_project.app.models import Thing
+from subforms.fields import DynamicArrayField, NestedFormField
+from subforms.model_fields import ArrayJSONField, JSONArrayLength, LazyJSON, NestedJSONField
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+def create_thing() -> Thing:
+    return Thing.objects.create(
+        nested={"foo": "1", "bar": {"fizz": "2", "buzz": 3}},
+        array=[{"foo": "4", "bar": {"fizz": "5", "buzz": 6}}, {"foo": "7", "bar": {"fizz": "8", "buzz": 9}}],
+        dict={"foo": 10, "bar": []},
+        required=[{"fizz": "a", "buzz": "b"}],
+    )
+
+
+def test_lazy_json():
+    create_thing()
+
+    thing = Thing.objects.get()
+    assert str(thing)
+
+    assert isinstance(thing.array, LazyJSON)
+    assert not thing.array.is_decoded
+    assert thing.array.raw.startswith("[")
+
+    assert isinstance(thing.array, list)
+    assert len(thing.array) == 2
+    assert thing.array.is_decoded
+    assert thing.array[1]["bar"]["buzz"] == 9
+    assert thing.nested == {"foo": "1", "bar": {"fizz": "2", "buzz": 3}}
+
+
+def test_lazy_json__save():
+    create_thing()
+
+    thing = Thing.objects.get()
+    thing.save()
+
+    thing = Thing.objects.get()
+    assert thing.required == [{"fizz": "a", "buzz": "b"}]
+    assert thing.dict == {"foo": 10, "bar": []}
+
+
+def test_lazy_json__model_form():
+    create_thing()
+
+    thing = Thing.objects.get()
+    form = ThingForm(instance=thing)
+    assert form.initial["nested"] == {"foo": "1", "bar": {"fizz": "2", "buzz": 3}}
+    assert not isinstance(form.initial["nested"], LazyJSON)
+    assert 'value="5"' in str(form)
+
+
+def test_lazy_json__partial_access():
+    create_thing()
+
+    assert list(Thing.objects.values_list("array__1__bar__buzz", flat=True)) == [9]
+    assert list(Thing.objects.annotate(length=JSONArrayLength("array")).values_list("length", flat=True)) == [2]
+    assert list(Thing.objects.annotate(length=JSONArrayLength(F("dict__bar"))).values_list("length", flat=True)) == [0]
+
+
+def test_formfield():
+    field = NestedJSONField(subform=ThingForm).formfield()
+    assert isinstance(field, NestedFormField)
+    assert field.subform is ThingForm
+
+    field = ArrayJSONField(subfield=NestedFormField(subform=ThingForm)).formfield()
+    assert isinstance(field, DynamicArrayField)
+    assert field.subfield.subform is ThingForm
+
+    # Subforms don't affect the database, so they are left out of migrations.
+    _, _, _, kwargs = NestedJSONField(subform=ThingForm, default=dict).deconstruct()
+    assert "subform" not in kwargs
+
+
+def test_formfield__no_hidden_initial():
+    field = NestedJSONField(subform=ThingForm, default=dict).formfield()
+    array_field = ArrayJSONField(subfield=NestedFormField(subform=ThingForm), default=list).formfield()
+
+    assert field.show_hidden_initial is False
+    assert array_field.show_hidden_initial is False
+    assert field.initial is dict
+
+
+def test_formfield__model_form__round_trip():
+    thing = create_thing()
+    thing.dict = {"foo": 10, "bar": [{"foo": 11, "bar": [{"fizz": "c", "buzz": 12}]}]}
+    thing.save()
+    form_class = modelform_factory(Thing, fields=["nested", "array", "dict", "required"])
+
+    soup = BeautifulSoup(str(form_class(instance=thing)), features="html.parser")
+    data = {element["name"]: element.get("value", "") for element in soup.find_all("input")}
+    assert not any(name.startswith("initial-") for name in data)
+
+    form = form_class(data=data, instance=thing)
+    assert form.is_valid(), form.errors
+    assert form.changed_data == []
+
+    # Cleaning the first form updated the instance, so compare to the stored values again.
+    form = form_class(data={**data, "array__1__bar__fizz": "x"}, instance=Thing.objects.get(pk=thing.pk))
+    assert form.changed_data == ["array"]
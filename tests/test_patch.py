@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import collections
+
+import pytest
+from django import forms
+from django.core.exceptions import ValidationError
+
+from subforms.fields import DynamicArrayField, NestedFormField
+from subforms.patch import SubformsDocument, apply_json_patch, apply_merge_patch
+
+# Number of times each form has been cleaned.
+clean_calls: collections.Counter[str] = collections.Counter()
+
+
+class ItemForm(forms.Form):
+    name = forms.CharField()
+    quantity = forms.IntegerField(min_value=1)
+
+    def clean(self):
+        clean_calls["item"] += 1
+        return super().clean()
+
+
+class GroupForm(forms.Form):
+    title = forms.CharField()
+    items = DynamicArrayField(NestedFormField(subform=ItemForm), required=False)
+
+    def clean(self):
+        clean_calls["group"] += 1
+        cleaned_data = super().clean()
+        if sum(item["quantity"] for item in cleaned_data.get("items", [])) > 100:
+            msg = "Too many items in the group."
+            raise ValidationError(msg)
+        return cleaned_data
+
+
+def order_field() -> NestedFormField:
+    class OrderForm(forms.Form):
+        groups = DynamicArrayField(NestedFormField(subform=GroupForm))
+
+    return NestedFormField(subform=OrderForm)
+
+
+def order_value(groups: int, items: int) -> dict:
+    return {
+        "groups": [
+            {"title": f"group {i}", "items": [{"name": f"item {j}", "quantity": 1} for j in range(items)]}
+            for i in range(groups)
+        ],
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_clean_calls():
+    clean_calls.clear()
+
+
+def test_patch__only_changed_parts_are_cleaned():
+    document = SubformsDocument(order_field(), order_value(groups=10, items=10))
+    document.clean()
+    assert clean_calls == {"group": 10, "item": 100}
+
+    clean_calls.clear()
+    cleaned = document.patch([{"op": "replace", "path": "/groups/3/items/5/quantity", "value": 7}])
+
+    # The changed item, and the group around it, since its 'clean()' depends on its items.
+    assert clean_calls == {"group": 1, "item": 1}
+    assert cleaned["groups"][3]["items"][5] == {"name": "item 5", "quantity": 7}
+    assert document.value["groups"][3]["items"][5]["quantity"] == 7
+    assert document.cleaned_data is cleaned
+
+
+def test_patch__value_not_changed():
+    value = order_value(groups=2, items=2)
+    document = SubformsDocument(order_field(), value)
+    document.patch([{"op": "remove", "path": "/groups/0/items/1"}])
+
+    assert value == order_value(groups=2, items=2)
+    assert len(document.value["groups"][0]["items"]) == 1
+    # Parts that didn't change are shared.
+    assert document.value["groups"][1] is value["groups"][1]
+
+
+def test_patch__add_and_move():
+    document = SubformsDocument(order_field(), order_value(groups=2, items=2))
+    document.clean()
+
+    clean_calls.clear()
+    cleaned = document.patch(
+        [
+            {"op": "add", "path": "/groups/1/items/-", "value": {"name": "new", "quantity": 2}},
+            {"op": "move", "from": "/groups/0/items/0", "path": "/groups/1/items/0"},
+        ],
+    )
+
+    assert clean_calls == {"group": 2, "item": 2}
+    assert [item["name"] for item in cleaned["groups"][0]["items"]] == ["item 1"]
+    assert [item["name"] for item in cleaned["groups"][1]["items"]] == ["item 0", "item 0", "item 1", "new"]
+
+
+def test_patch__invalid():
+    value = order_value(groups=2, items=2)
+    document = SubformsDocument(order_field(), value)
+    cleaned = document.clean()
+
+    with pytest.raises(ValidationError) as error:
+        document.patch([{"op": "replace", "path": "/groups/1/items/0/quantity", "value": 0}])
+
+    assert "Ensure this value is greater than or equal to 1." in str(error.value)
+
+    # The document is left unchanged.
+    assert document.value is value
+    assert document.cleaned_data is cleaned
+
+    clean_calls.clear()
+    document.patch([{"op": "replace", "path": "/groups/1/items/0/quantity", "value": 99}])
+    assert clean_calls == {"group": 1, "item": 1}
+
+
+def test_patch__subform_clean_depends_on_changed_part():
+    document = SubformsDocument(order_field(), order_value(groups=2, items=2))
+    document.clean()
+
+    with pytest.raises(ValidationError) as error:
+        document.patch([{"op": "replace", "path": "/groups/0/items/0/quantity", "value": 100}])
+
+    assert "Too many items in the group." in str(error.value)
+
+
+def test_patch__test_operation():
+    document = SubformsDocument(order_field(), order_value(groups=1, items=1))
+
+    with pytest.raises(ValueError, match=r"Test failed for '/groups/0/title'\."):
+        document.patch(
+            [
+                {"op": "remove", "path": "/groups/0/items/0"},
+                {"op": "test", "path": "/groups/0/title", "value": "other"},
+            ],
+        )
+
+    assert len(document.value["groups"][0]["items"]) == 1
+
+
+@pytest.mark.parametrize(
+    ("operation", "message"),
+    [
+        ({"op": "remove", "path": "/groups/5"}, r"Path '/groups/5' does not exist\."),
+        ({"op": "replace", "path": "/missing", "value": 1}, r"Path '/missing' does not exist\."),
+        ({"op": "add", "path": "/groups/01", "value": {}}, r"Path '/groups/01' does not exist\."),
+        ({"op": "add", "path": "/groups/0/title/x", "value": 1}, r"Cannot patch inside a value of type 'str'\."),
+        ({"op": "add", "path": "/groups"}, r"Patch operation 'add' requires a 'value'\."),
+        ({"op": "add", "path": "groups", "value": 1}, r"Invalid JSON Pointer: 'groups'\."),
+        ({"op": "move", "from": "/groups", "path": "/groups/0"}, r"Cannot move '/groups' inside itself\."),
+        ({"op": "frobnicate", "path": ""}, r"Unknown patch operation: 'frobnicate'\."),
+    ],
+)
+def test_patch__malformed(operation, message):
+    with pytest.raises(ValueError, match=message):
+        SubformsDocument(order_field(), order_value(groups=1, items=1)).patch([operation])
+
+
+def test_merge_patch():
+    document = SubformsDocument(order_field(), {"groups": [{"title": "a", "items": []}], "extra": {"x": 1}})
+    document.clean()
+
+    clean_calls.clear()
+    cleaned = document.merge_patch({"groups": [{"title": "b"}], "extra": None})
+
+    assert clean_calls == {"group": 1}
+    assert cleaned == {"groups": [{"title": "b", "items": []}]}
+    assert document.value == {"groups": [{"title": "b"}]}
+
+
+def test_apply_json_patch():
+    value = {"a": {"b": [1, 2]}, "c": {"d": 1}, "e~f/g": 1}
+    patched = apply_json_patch(
+        value,
+        [
+            {"op": "add", "path": "/a/b/1", "value": 3},
+            {"op": "copy", "from": "/a/b", "path": "/h"},
+            {"op": "remove", "path": "/e~0f~1g"},
+        ],
+    )
+
+    assert patched == {"a": {"b": [1, 3, 2]}, "c": {"d": 1}, "h": [1, 3, 2]}
+    assert patched["c"] is value["c"]
+    assert patched["h"] is not patched["a"]["b"]
+    assert value == {"a": {"b": [1, 2]}, "c": {"d": 1}, "e~f/g": 1}
+
+
+def test_apply_merge_patch():
+    value = {"a": "b", "c": {"d": "e", "f": "g"}, "h": {"i": 1}}
+    patched = apply_merge_patch(value, {"a": "z", "c": {"f": None}, "j": {"k": None, "l": 1}})
+
+    assert patched == {"a": "z", "c": {"d": "e"}, "h": {"i": 1}, "j": {"l": 1}}
+    assert patched["h"] is value["h"]
+    assert value == {"a": "b", "c": {"d": "e", "f": "g"}, "h": {"i": 1}}
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import datetime
+import decimal
+
+import pytest
+from django import forms
+
+from example_project.app.admin import SubArrayForm, ThingForm
+from subforms.fields import DynamicArrayField, NestedFormField
+from subforms.synthetic import SyntheticData, form_data, invalid_value
+from subforms.validation import clean_fields
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+
+class TypesForm(forms.Form):
+    count = forms.IntegerField(min_value=5, max_value=7)
+    price = forms.DecimalField(max_digits=4, decimal_places=2, min_value=-1)
+    ratio = forms.FloatField(max_value=1)
+    name = forms.CharField(min_length=3, max_length=5)
+    email = forms.EmailField()
+    kind = forms.ChoiceField(choices=[("a", "A"), ("b", "B")])
+    tags = forms.MultipleChoiceField(choices=[("x", "X"), ("y", "Y"), ("z", "Z")])
+    accepted = forms.BooleanField()
+    day = forms.DateField()
+    at = forms.DateTimeField()
+    items = DynamicArrayField(subfield=forms.IntegerField(), max_length=2)
+
+
+class TreeForm(forms.Form):
+    name = forms.CharField()
+    children = DynamicArrayField(subfield=NestedFormField(subform=lambda: TreeForm, max_depth=3), required=False)
+    parent = NestedFormField(subform=lambda: TreeForm, required=False, max_depth=3)
+
+
+def test_synthetic_data__types():
+    values = SyntheticData(width=5).form_values(TypesForm)
+
+    assert 5 <= values["count"] <= 7
+    assert isinstance(values["price"], decimal.Decimal)
+    assert -1 <= values["price"] <= decimal.Decimal("99.99")
+    assert values["ratio"] <= 1
+    assert 3 <= len(values["name"]) <= 5
+    assert values["kind"] in {"a", "b"}
+    assert len(values["tags"]) == 2
+    assert values["accepted"] is True
+    assert isinstance(values["day"], datetime.date)
+    assert len(values["items"]) == 2
+
+    form = TypesForm(data=form_data(TypesForm, values))
+    assert form.is_valid(), form.errors
+
+
+def test_synthetic_data__seed():
+    assert SyntheticData(seed=1).form_values(TypesForm) == SyntheticData(seed=1).form_values(TypesForm)
+    assert SyntheticData(seed=1).form_values(TypesForm) != SyntheticData(seed=2).form_values(TypesForm)
+
+
+def test_synthetic_data__width_and_array_length():
+    values = SyntheticData(width=4, array_length=2).form_values(ThingForm)
+
+    assert len(values["array"]) == 4
+    assert len(values["dict"]["bar"]) == 2
+    assert len(values["dict"]["bar"][0]["bar"]) == 2
+
+    form = ThingForm(data=form_data(ThingForm, values))
+    assert form.is_valid(), form.errors
+
+
+def test_synthetic_data__depth():
+    values = SyntheticData(width=2, array_length=2, depth=2).value(NestedFormField(subform=TreeForm))
+
+    assert len(values["children"]) == 2
+    assert values["parent"]["children"] == []
+    assert values["parent"]["parent"] is None
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_synthetic_data__invalid(seed):
+    generator = SyntheticData(width=3, seed=seed)
+
+    types = generator.form_values(TypesForm, invalid=True)
+    things = generator.form_values(ThingForm, invalid=True)
+
+    # Exactly one value is invalid.
+    assert len(TypesForm(data=form_data(TypesForm, types)).errors) == 1
+    assert len(clean_fields(ThingForm.base_fields, things)[1]) == 1
+
+
+def test_synthetic_data__invalid__nothing_to_invalidate():
+    field = forms.CharField(required=False)
+
+    assert SyntheticData().value(field, invalid=True) is not None
+    assert invalid_value(forms.IntegerField(max_value=3)) == 4
+    assert invalid_value(forms.CharField(max_length=2)) == "xxx"
+    assert invalid_value(forms.ChoiceField(choices=[("a", "A")])) == "not a choice"
+
+
+def test_synthetic_data__rows():
+    rows = list(SyntheticData(width=2, seed=1).rows(ThingForm, 20, field_names=["nested", "array"], invalid=0.5))
+
+    assert rows == list(SyntheticData(width=2, seed=1).rows(ThingForm, 20, field_names=["nested", "array"], invalid=0.5))
+    assert all(list(row) == ["nested", "array"] for row in rows)
+    fields = {name: ThingForm.base_fields[name] for name in ["nested", "array"]}
+    invalid = [row for row in rows if clean_fields(fields, row)[1]]
+    assert 0 < len(invalid) < 20
+
+
+def test_form_data():
+    values = {"foo": 1, "bar": [{"foo": 2, "bar": [{"fizz": "x", "buzz": 3}]}]}
+
+    data = form_data(SubArrayForm, values)
+
+    assert dict(data.lists()) == {
+        "foo": ["1"],
+        "bar__0__foo": ["2"],
+        "bar__0__bar__0__fizz": ["x"],
+        "bar__0__bar__0__buzz": ["3"],
+    }
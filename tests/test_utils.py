@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+from django.core.exceptions import ValidationError
+
+from subforms.utils import prefix_validation_error
+
+
+def test_prefix_validation_error():
+    error = ValidationError("Value %(value)s is invalid.", code="invalid", params={"value": "foo"})
+
+    prefixed = prefix_validation_error(error, prefix="index %(index)s:", code="item_invalid", params={"index": 1})
+
+    assert prefixed.messages == ["index 1: Value foo is invalid."]
+    assert prefixed.code == "item_invalid"
+    assert prefixed.params == {"value": "foo", "index": 1}
+
+
+def test_prefix_validation_error__list():
+    error = ValidationError([ValidationError("foo"), ValidationError("bar")])
+
+    prefixed = prefix_validation_error(error, prefix="index %(index)s:", code="item_invalid", params={"index": 0})
+
+    assert prefixed.messages == ["index 0: foo", "index 0: bar"]
+
+
+def test_import_does_not_load_postgres():
+    code = (
+        "import sys\n"
+        "import django\n"
+        "from django.conf import settings\n"
+        "settings.configure()\n"
+        "django.setup()\n"
+        "import subforms.fields\n"
+        "assert 'django.contrib.postgres' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=False)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from bs4 import BeautifulSoup
+from django import forms
+from django.http import QueryDict
+from django.test import RequestFactory
+
+from example_project.app.admin import ThingForm
+from subforms.validation import validate_subtree
+from subforms.views import SubformsValidationView
+
+if TYPE_CHECKING:
+    from django.http import HttpResponse
+    from django.test import Client
+
+pytestmark = [
+    pytest.mark.django_db,
+]
+
+URL = "/admin/app/thing/validate-subforms/"
+
+
+def test_validate_subtree__array_item():
+    data = QueryDict("array__1__foo=x&array__1__bar__fizz=&array__1__bar__buzz=y")
+
+    errors = validate_subtree(ThingForm(), "array__1", data)
+
+    assert errors == {
+        "array__1__bar__fizz": ["This field is required."],
+        "array__1__bar__buzz": ["Enter a whole number."],
+    }
+
+
+def test_validate_subtree__nested_array_item():
+    data = QueryDict("dict__bar__2__foo=1&dict__bar__2__bar__0__fizz=x&dict__bar__2__bar__0__buzz=1")
+
+    assert validate_subtree(ThingForm(), "dict__bar__2", data) == {}
+    assert validate_subtree(ThingForm(), "dict__bar__2__bar__0", data) == {}
+    assert validate_subtree(ThingForm(), "dict__bar__3", data) == {
+        "dict__bar__3__foo": ["This field is required."],
+        "dict__bar__3__bar": ["This field is required."],
+    }
+
+
+def test_validate_subtree__form_errors():
+    data = QueryDict("required__0__fizz=error&required__0__buzz=x")
+
+    assert validate_subtree(ThingForm(), "required__0", data) == {"required__0": ["This value is not allowed"]}
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "",
+        "missing__0",
+        "array__x",
+        "array__0__missing",
+        "array__0__foo__0",
+        "arrayx__0",
+    ],
+)
+def test_validate_subtree__invalid_path(name):
+    with pytest.raises(ValueError, match="Invalid subforms path"):
+        validate_subtree(ThingForm(), name, QueryDict())
+
+
+def test_validate_subtree__not_subforms_field():
+    class Form(forms.Form):
+        name = forms.CharField()
+
+    with pytest.raises(ValueError, match="Invalid subforms path"):
+        validate_subtree(Form(), "name", QueryDict())
+
+
+def test_validation_view():
+    view = SubformsValidationView.as_view(form_class=ThingForm)
+    request = RequestFactory().post("/", data={"subforms:path": "array__0", "array__0__foo": "x"})
+
+    response: HttpResponse = view(request)
+
+    assert response.status_code == 200
+    assert json.loads(response.content) == {
+        "valid": False,
+        "errors": {
+            "array__0__bar__fizz": ["This field is required."],
+            "array__0__bar__buzz": ["This field is required."],
+        },
+    }
+
+
+def test_validation_view__html():
+    view = SubformsValidationView.as_view(form_class=ThingForm)
+    data = {"subforms:path": "array__0", "subforms:format": "html", "array__0__bar__fizz": "x"}
+    request = RequestFactory().post("/", data=data)
+
+    response: HttpResponse = view(request)
+    response.render()
+
+    soup = BeautifulSoup(response.content, features="html.parser")
+    error_lists = soup.find_all("ul", class_="subforms-errorlist")
+    assert {error_list["data-subforms-errors-for"] for error_list in error_lists} == {
+        "array__0__foo",
+        "array__0__bar__buzz",
+    }
+
+
+def test_validation_view__get_not_allowed():
+    view = SubformsValidationView.as_view(form_class=ThingForm)
+
+    response: HttpResponse = view(RequestFactory().get("/"))
+
+    assert response.status_code == 405
+
+
+def test_admin_validation(django_client: Client):
+    data = {"subforms:path": "array__0", "array__0__foo": "x", "array__0__bar__fizz": "y", "array__0__bar__buzz": "1"}
+
+    response: HttpResponse = django_client.post(URL, data=data)  # type: ignore[assignment]
+
+    assert response.status_code == 200
+    assert response.json() == {"valid": True, "errors": {}}
+
+
+def test_admin_validation__invalid_path(django_client: Client):
+    response: HttpResponse = django_client.post(URL, data={"subforms:path": "foo"})  # type: ignore[assignment]
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "Invalid subforms path: 'foo'."}
+
+
+def test_admin_validation__not_logged_in(client: Client):
+    response: HttpResponse = client.post(URL, data={"subforms:path": "array__0"})  # type: ignore[assignment]
+
+    assert response.status_code == 302
+
+
+def test_admin_form__validate_url(django_client: Client):
+    response: HttpResponse = django_client.get("/admin/app/thing/add/", follow=True)  # type: ignore[assignment]
+
+    soup = BeautifulSoup(response.content, features="html.parser")
+    elements = soup.find_all(attrs={"data-subforms-validate-url": True})
+
+    assert [element["data-subforms-name"] for element in elements] == ["nested", "array", "dict", "required"]
+    assert {element["data-subforms-validate-url"] for element in elements} == {URL}
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import logging
+
+from django.apps import apps
+from django.test import override_settings
+
+from example_project.app.admin import ThingForm
+from subforms.warmup import iter_form_classes, warm_up
+
+
+def test_warm_up():
+    assert ThingForm in set(iter_form_classes())
+
+    count = warm_up()
+
+    # All four fields on 'ThingForm', plus the nested subforms fields on the example subforms.
+    assert count >= 4
+    assert "media" in ThingForm.base_fields["nested"].widget.__dict__
+    assert "media" in ThingForm.base_fields["array"].widget.__dict__
+
+
+def test_warm_up__app_ready(caplog):
+    config = apps.get_app_config("subforms")
+
+    with caplog.at_level(logging.INFO, logger="subforms.apps"):
+        config.ready()
+
+    assert caplog.messages == []
+
+    with override_settings(SUBFORMS={"WARMUP": True}), caplog.at_level(logging.INFO, logger="subforms.apps"):
+        config.ready()
+
+    assert len(caplog.messages) == 1
+    assert caplog.messages[0].startswith("Subforms warm-up precompiled")